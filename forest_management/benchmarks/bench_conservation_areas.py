@@ -0,0 +1,64 @@
+"""保护区识别性能测试：链状森林（河岸走廊）
+
+用法: python -m forest_management.benchmarks.bench_conservation_areas [--nodes 1000000]
+"""
+import argparse
+import time
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.tasks.conservation_areas import label_conservation_areas
+
+
+def build_chain_snapshot(n: int, infected_every: int) -> CSRSnapshot:
+    """直接以数组构建链状森林的快照"""
+    health = np.full(n, HealthStatus.HEALTHY.value, dtype=np.int8)
+    if infected_every:
+        health[infected_every - 1::infected_every] = HealthStatus.INFECTED.value
+    return CSRSnapshot(
+        tree_ids=np.arange(n), species_codes=np.zeros(n), species_names=["Willow"],
+        ages=np.full(n, 10), health=health,
+        edge_u=np.arange(n - 1), edge_v=np.arange(1, n), edge_weight=np.ones(n - 1),
+        nodes=[None] * n,
+    )
+
+
+def build_chain_forest(n: int) -> ForestGraph:
+    forest = ForestGraph()
+    trees = [TreeNode(i, "Willow", 10, HealthStatus.HEALTHY) for i in range(n)]
+    for tree in trees:
+        forest.add_tree(tree)
+    for a, b in zip(trees, trees[1:]):
+        forest.add_path(TreePath(a, b, 1.0))
+    return forest
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=1_000_000)
+    parser.add_argument('--infected-every', type=int, default=0,
+                        help="每隔多少棵树放置一棵感染树（0 表示整条链健康）")
+    parser.add_argument('--with-graph', action='store_true',
+                        help="同时测试从 ForestGraph 构建快照的完整流程")
+    args = parser.parse_args()
+
+    snapshot = timed("build chain snapshot", lambda: build_chain_snapshot(args.nodes, args.infected_every))
+    result = timed("label_conservation_areas (snapshot)",
+                   lambda: label_conservation_areas(None, snapshot=snapshot))
+    print(f"areas: {len(result)}  largest: {result.sizes.max() if len(result) else 0}")
+
+    if args.with_graph:
+        forest = timed("build ForestGraph", lambda: build_chain_forest(args.nodes))
+        result = timed("label_conservation_areas (ForestGraph)", lambda: label_conservation_areas(forest))
+        print(f"areas: {len(result)}  largest: {result.sizes.max() if len(result) else 0}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""森林图表构建性能测试：轨迹数量、构建时间和序列化后的数据量
+
+用法: python -m forest_management.benchmarks.bench_figure [--trees 5000 --paths 10000 --legacy]
+"""
+import argparse
+import json
+import time
+import numpy as np
+import plotly.graph_objects as go
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.visualization.interactive_visualize import generate_figure, generate_lod_figure
+from forest_management.visualization.layout import get_forest_layout
+from forest_management.dashboard.figure_updates import IncrementalFigure
+from forest_management.visualization.figure_cache import FigureCache, generate_figure_json
+
+SPECIES = ['Oak', 'Pine', 'Maple', 'Birch', 'Willow']
+
+
+def build_random_forest(num_trees: int, num_paths: int, seed: int = 0) -> ForestGraph:
+    rng = np.random.default_rng(seed)
+    statuses = list(HealthStatus)
+    trees = [TreeNode(i, SPECIES[s], int(age), statuses[h])
+             for i, s, age, h in zip(range(num_trees), rng.integers(0, len(SPECIES), num_trees).tolist(),
+                                     rng.integers(1, 300, num_trees), rng.integers(0, len(statuses), num_trees))]
+    tree_1 = rng.integers(0, num_trees, num_paths)
+    tree_2 = (tree_1 + rng.integers(1, num_trees, num_paths)) % num_trees
+    pairs = {(min(a, b), max(a, b)) for a, b in zip(tree_1.tolist(), tree_2.tolist())}
+    paths = [TreePath(trees[a], trees[b], float(d))
+             for (a, b), d in zip(sorted(pairs), rng.uniform(0.1, 100.0, len(pairs)).round(2))]
+    forest = ForestGraph()
+    forest.bulk_insert(trees, paths, validated=True)
+    return forest
+
+
+def legacy_figure(forest: ForestGraph) -> go.Figure:
+    """旧的实现方式：每条边两条轨迹（线和标签），每棵树一条轨迹"""
+    fig = go.Figure()
+    seen = set()
+    for edges in forest.adjacency.values():
+        for path in edges:
+            eid = tuple(sorted([path.tree1.tree_id, path.tree2.tree_id]))
+            if eid in seen:
+                continue
+            seen.add(eid)
+            x0, y0 = path.tree1.tree_id * 10, path.tree1.age
+            x1, y1 = path.tree2.tree_id * 10, path.tree2.age
+            fig.add_trace(go.Scatter(x=[x0, x1], y=[y0, y1], mode='lines', line=dict(color='gray', width=3)))
+            fig.add_trace(go.Scatter(x=[(x0 + x1) / 2], y=[(y0 + y1) / 2], mode='text',
+                                     text=[f"{path.distance:.1f}"]))
+    for tree in forest.adjacency:
+        fig.add_trace(go.Scatter(x=[tree.tree_id * 10], y=[tree.age], mode='markers+text',
+                                 text=[f"ID:{tree.tree_id}"]))
+    return fig
+
+
+def measure(label, func):
+    start = time.perf_counter()
+    fig = func()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    payload = fig.to_json()
+    serialized = time.perf_counter() - start
+    print(f"{label:<28} traces: {len(fig.data):>7}  build: {built:8.3f} s  "
+          f"to_json: {serialized:8.3f} s  payload: {len(payload) / 1024:10.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trees', type=int, default=5000)
+    parser.add_argument('--paths', type=int, default=10000)
+    parser.add_argument('--legacy', action='store_true', help="同时测试旧的逐元素轨迹实现（较慢）")
+    args = parser.parse_args()
+
+    forest = build_random_forest(args.trees, args.paths)
+    highlight = list(forest.adjacency)[:args.trees // 10]
+    # 布局按森林版本缓存，单独计时，之后的图表构建不再包含布局时间
+    start = time.perf_counter()
+    get_forest_layout(forest).update()
+    print(f"{'force-directed layout':<28} {time.perf_counter() - start:8.3f} s")
+    measure("generate_figure", lambda: generate_figure(forest, use_webgl=False))
+    measure("generate_figure (webgl)", lambda: generate_figure(forest, use_webgl=True))
+    measure("generate_figure (highlight)", lambda: generate_figure(forest, highlight_nodes=highlight))
+    measure("generate_lod_figure", lambda: generate_lod_figure(forest))
+    x0, y0 = get_forest_layout(forest).coordinates().min(axis=0)
+    measure("generate_lod_figure (zoomed)", lambda: generate_lod_figure(forest, viewport=(x0, x0 + 10, y0, y0 + 10)))
+
+    # 图表缓存：第二次请求同一视图直接返回序列化后的 JSON
+    cache = FigureCache()
+    for label in ("generate_figure_json (miss)", "generate_figure_json (hit)"):
+        start = time.perf_counter()
+        payload = generate_figure_json(forest, highlight_nodes=highlight, cache=cache)
+        print(f"{label:<28} {time.perf_counter() - start:8.3f} s  payload: {len(payload) / 1024:10.1f} KiB")
+
+    # 增量更新：首次发送完整图表，之后新增一棵树只发送变化的部分
+    figure = IncrementalFigure()
+    fig, revision = figure.render(forest, max_nodes=2 * args.trees)
+    print(f"{'incremental (first render)':<28} payload: {len(json.dumps(fig)) / 1024:10.1f} KiB")
+    # 另一个页面请求同一视图：完整图表直接取自缓存
+    start = time.perf_counter()
+    IncrementalFigure().render(forest, max_nodes=2 * args.trees)
+    print(f"{'incremental (cached view)':<28} build: {time.perf_counter() - start:8.3f} s")
+    tree = TreeNode(args.trees, 'Oak', 10)
+    forest.add_tree(tree)
+    forest.add_path(TreePath(tree, next(iter(forest.adjacency)), 1.0))
+    start = time.perf_counter()
+    patch, revision = figure.render(forest, revision, max_nodes=2 * args.trees)
+    print(f"{'incremental (add one tree)':<28} build: {time.perf_counter() - start:8.3f} s  "
+          f"payload: {len(json.dumps(patch.to_plotly_json())):10d} bytes")
+    if args.legacy:
+        measure("legacy per-element traces", lambda: legacy_figure(forest))
+
+
+if __name__ == '__main__':
+    main()
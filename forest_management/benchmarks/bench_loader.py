@@ -0,0 +1,73 @@
+"""CSV 加载性能测试：随机森林
+
+用法: python -m forest_management.benchmarks.bench_loader [--trees 1000000 --paths 5000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from forest_management.utils.data_loader import load_forest_data, load_forest_data_chunked, load_forest_data_parallel
+
+SPECIES = ['Oak', 'Pine', 'Maple', 'Birch', 'Willow']
+STATUSES = ['HEALTHY', 'INFECTED', 'AT_RISK']
+
+
+def write_random_forest(directory: str, num_trees: int, num_paths: int, seed: int = 0) -> tuple[str, str]:
+    """生成随机的树木和路径CSV文件，路径端点不重复、无自环"""
+    rng = np.random.default_rng(seed)
+    tree_file = os.path.join(directory, 'trees.csv')
+    path_file = os.path.join(directory, 'paths.csv')
+    pd.DataFrame({
+        'tree_id': np.arange(num_trees),
+        'species': np.array(SPECIES)[rng.integers(0, len(SPECIES), num_trees)],
+        'age': rng.integers(1, 300, num_trees),
+        'health_status': np.array(STATUSES)[rng.integers(0, len(STATUSES), num_trees)],
+    }).to_csv(tree_file, index=False)
+
+    # 端点 (u, u + offset) 保证无自环；随机距离使重复的端点对几乎不会同时距离相同
+    tree_1 = rng.integers(0, num_trees, num_paths)
+    tree_2 = (tree_1 + rng.integers(1, num_trees, num_paths)) % num_trees
+    pd.DataFrame({
+        'tree_1': tree_1,
+        'tree_2': tree_2,
+        'distance': np.round(rng.uniform(0.1, 100.0, num_paths), 6),
+    }).drop_duplicates().to_csv(path_file, index=False)
+    return tree_file, path_file
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trees', type=int, default=1_000_000)
+    parser.add_argument('--paths', type=int, default=5_000_000)
+    parser.add_argument('--chunk-memory', type=int, default=0,
+                        help="以分块模式加载，每块内存上限（MB，0 表示一次性加载）")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="按字节范围切分文件并用多个进程并行解析（0 表示单进程）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        tree_file, path_file = timed("write CSV files",
+                                     lambda: write_random_forest(directory, args.trees, args.paths))
+        if args.chunk_memory:
+            forest = timed("load_forest_data_chunked", lambda: load_forest_data_chunked(
+                tree_file, path_file, max_memory=args.chunk_memory * 1024 * 1024))
+        elif args.workers:
+            forest = timed("load_forest_data_parallel", lambda: load_forest_data_parallel(
+                tree_file, path_file, workers=args.workers))
+        else:
+            forest = timed("load_forest_data", lambda: load_forest_data(tree_file, path_file))
+        edges = sum(len(paths) for paths in forest.adjacency.values()) // 2
+        print(f"trees: {len(forest.adjacency)}  paths: {edges}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+import numpy as np
+from forest_management.core.tree_node import HealthStatus
+
+
+class CSRSnapshot:
+    """森林图的只读CSR快照
+
+    节点按下标 0..n-1 编号，边按下标 0..m-1 编号。邻接关系以CSR形式存储：
+    节点 i 的邻居为 indices[indptr[i]:indptr[i+1]]，对应的距离和边编号
+    分别在 weights 和 edge_ids 的同一区间中。快照只保存数组，可以安全地
+    传给子进程；原始的 TreeNode / TreePath 对象只保留在主进程中。
+    """
+
+    def __init__(self, tree_ids, species_codes, species_names, ages, health,
+                 edge_u, edge_v, edge_weight, nodes=None, paths=None, csr=None):
+        self.tree_ids = np.asarray(tree_ids)
+        self.species_codes = np.asarray(species_codes, dtype=np.int32)
+        self.species_names = list(species_names)
+        self.ages = np.asarray(ages)
+        self.health = np.asarray(health, dtype=np.int8)
+        self.edge_u = np.asarray(edge_u, dtype=np.int64)
+        self.edge_v = np.asarray(edge_v, dtype=np.int64)
+        self.edge_weight = np.asarray(edge_weight, dtype=np.float64)
+        self.nodes = nodes
+        self.paths = paths
+        if csr is None:
+            self._build_csr()
+        else:
+            # 已有的CSR数组（如从快照文件映射而来）直接使用，不再排序重建
+            indptr, indices, edge_ids, weights = csr
+            self.indptr = np.asarray(indptr, dtype=np.int64)
+            self.indices = np.asarray(indices, dtype=np.int64)
+            self.edge_ids = np.asarray(edge_ids, dtype=np.int64)
+            self.weights = np.asarray(weights, dtype=np.float64)
+        self._lists = None
+        self._index = None
+
+    @classmethod
+    def from_forest(cls, forest) -> "CSRSnapshot":
+        """从 ForestGraph 构建快照"""
+        nodes = list(forest.adjacency)
+        index = {tree: i for i, tree in enumerate(nodes)}
+        species_lookup = {}
+        species_codes = np.empty(len(nodes), dtype=np.int32)
+        for i, tree in enumerate(nodes):
+            species_codes[i] = species_lookup.setdefault(tree.species, len(species_lookup))
+
+        # 每条路径在两个端点的列表中各出现一次，只在 tree1 一侧记录
+        paths = [path for tree, edges in forest.adjacency.items()
+                 for path in edges if path.tree1 == tree]
+        return cls(
+            tree_ids=[tree.tree_id for tree in nodes],
+            species_codes=species_codes,
+            species_names=list(species_lookup),
+            ages=[tree.age for tree in nodes],
+            health=[tree.health_status.value for tree in nodes],
+            edge_u=[index[path.tree1] for path in paths],
+            edge_v=[index[path.tree2] for path in paths],
+            edge_weight=[path.distance for path in paths],
+            nodes=nodes,
+            paths=paths,
+        )
+
+    def _build_csr(self):
+        n = len(self.tree_ids)
+        m = len(self.edge_u)
+        src = np.concatenate([self.edge_u, self.edge_v])
+        dst = np.concatenate([self.edge_v, self.edge_u])
+        eid = np.concatenate([np.arange(m), np.arange(m)])
+        order = np.argsort(src, kind='stable')
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+        self.indices = dst[order]
+        self.edge_ids = eid[order]
+        self.weights = self.edge_weight[self.edge_ids]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.tree_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_u)
+
+    def degrees(self) -> np.ndarray:
+        """每个节点的度数"""
+        return np.diff(self.indptr)
+
+    def healthy_mask(self) -> np.ndarray:
+        return self.health == HealthStatus.HEALTHY.value
+
+    def infected_mask(self) -> np.ndarray:
+        return self.health == HealthStatus.INFECTED.value
+
+    def index_of(self, tree_id) -> int:
+        """树ID对应的节点下标"""
+        if self._index is None:
+            self._index = {tid: i for i, tid in enumerate(self.tree_ids.tolist())}
+        if tree_id not in self._index:
+            raise ValueError(f"Tree ID {tree_id} not found in snapshot")
+        return self._index[tree_id]
+
+    def as_lists(self) -> tuple[list, list, list, list, list]:
+        """返回 (indptr, indices, weights, edge_ids, health) 的Python列表形式
+
+        纯Python的逐元素循环里访问列表远快于访问NumPy数组，结果会被缓存。
+        """
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(),
+                           self.weights.tolist(), self.edge_ids.tolist(),
+                           self.health.tolist())
+        return self._lists
+
+    def __getstate__(self):
+        # 只序列化数组，TreeNode / TreePath 对象留在主进程
+        state = self.__dict__.copy()
+        state['nodes'] = None
+        state['paths'] = None
+        state['_lists'] = None
+        state['_index'] = None
+        return state
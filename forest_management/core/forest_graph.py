@@ -5,25 +5,73 @@ from forest_management.core.tree_node import HealthStatus, TreeNode
 from forest_management.core.tree_path import TreePath
 from collections import defaultdict
 
+class ForestListener:
+    """森林变更监听器基类
+
+    通过 ForestGraph.add_listener 注册后，森林的每次修改都会调用对应的方法。
+    子类只需要覆盖关心的事件。
+    """
+    def on_tree_added(self, tree):
+        pass
+
+    def on_tree_removed(self, tree, paths):
+        pass
+
+    def on_path_added(self, path):
+        pass
+
+    def on_path_removed(self, path):
+        pass
+
+    def on_health_changed(self, tree, old_status):
+        pass
+
+    def on_tree_updated(self, tree, old_species, old_age):
+        pass
+
+    def on_path_distance_changed(self, path, old_distance):
+        pass
+
+    def on_reset(self):
+        pass
+
 class ForestGraph:
     def __init__(self):
         self.adjacency = defaultdict(list)  # 邻接表 {TreeNode: list[TreePath]}
+        self.listeners = []
+        self.version = 0  # 变更计数器，每次修改森林时递增
+
+    def add_listener(self, listener):
+        """注册森林变更监听器"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """注销森林变更监听器"""
+        self.listeners.remove(listener)
+
+    def _notify(self, event, *args):
+        self.version += 1
+        for listener in self.listeners:
+            getattr(listener, event)(*args)
 
     def add_tree(self, tree):
         """添加一棵树到森林中"""
         if tree in self.adjacency:
             raise ValueError("树已存在于森林中")
         self.adjacency[tree] = []
+        self._notify('on_tree_added', tree)
 
     def remove_tree(self, tree):
         """从森林中移除一棵树"""
         if tree not in self.adjacency:
             raise ValueError("树不存在于森林中")
         # 删除与该树相关的所有路径
-        for path in self.adjacency[tree]:
+        paths = self.adjacency[tree]
+        for path in paths:
             other_tree = path.tree1 if path.tree2 == tree else path.tree2
             self.adjacency[other_tree].remove(path)
         del self.adjacency[tree]
+        self._notify('on_tree_removed', tree, paths)
 
     def add_path(self, path):
         """添加一条路径到森林中"""
@@ -33,6 +81,7 @@ class ForestGraph:
             raise ValueError("路径已存在")
         self.adjacency[path.tree1].append(path)
         self.adjacency[path.tree2].append(path)
+        self._notify('on_path_added', path)
 
     def remove_path(self, path):
         """从森林中移除一条路径"""
@@ -40,27 +89,87 @@ class ForestGraph:
             raise ValueError("路径不存在")
         self.adjacency[path.tree1].remove(path)
         self.adjacency[path.tree2].remove(path)
+        self._notify('on_path_removed', path)
 
     def update_tree_health(self, tree, new_health_status):
         """更新树的健康状态"""
         if tree not in self.adjacency:
             raise ValueError("树不存在于森林中")
+        old_status = tree.health_status
         tree.health_status = new_health_status
+        if old_status != new_health_status:
+            self._notify('on_health_changed', tree, old_status)
+
+    def update_tree_attributes(self, tree, species, age):
+        """更新树的树种和年龄"""
+        if tree not in self.adjacency:
+            raise ValueError("树不存在于森林中")
+        old_species, old_age = tree.species, tree.age
+        tree.species, tree.age = species, age
+        if (old_species, old_age) != (species, age):
+            self._notify('on_tree_updated', tree, old_species, old_age)
 
     def update_path_distance(self, path, new_distance):
         """更新路径的距离"""
         if path not in self.adjacency[path.tree1] or path not in self.adjacency[path.tree2]:
             raise ValueError("路径不存在")
+        old_distance = path.distance
         path.distance = new_distance
+        if old_distance != new_distance:
+            self._notify('on_path_distance_changed', path, old_distance)
+
+    def bulk_insert(self, trees, paths=(), validated=False):
+        """批量添加树木和路径
+
+        与逐个调用 add_tree/add_path 的检查相同，但直接构建邻接表，
+        结束后只发出一次 on_reset 通知，监听器据此整体重建。
+        所有树木和路径都先检查完毕再修改森林，任何一项不合法时森林保持不变。
+        调用方已经完成端点和重复检查时（如CSV加载器）可传入 validated=True 跳过逐条检查。
+        """
+        trees = list(trees)
+        paths = list(paths)
+        if not validated:
+            new_trees = set(trees)
+            if len(new_trees) != len(trees) or any(tree in self.adjacency for tree in trees):
+                raise ValueError("树已存在于森林中")
+            seen = set()
+            for path in paths:
+                for tree in (path.tree1, path.tree2):
+                    if tree not in new_trees and tree not in self.adjacency:
+                        raise ValueError("路径连接的两棵树都必须存在于森林中")
+                if path in seen or path in self.adjacency.get(path.tree1, ()):
+                    raise ValueError("路径已存在")
+                seen.add(path)
+        for tree in trees:
+            self.adjacency[tree] = []
+        for path in paths:
+            self.adjacency[path.tree1].append(path)
+            self.adjacency[path.tree2].append(path)
+        self._notify('on_reset')
+
+    def reset(self, adjacency=None):
+        """清空森林，或用给定的邻接表整体替换森林内容"""
+        if adjacency is None:
+            self.adjacency.clear()
+        else:
+            self.adjacency = adjacency
+        self._notify('on_reset')
+
+    def __getstate__(self):
+        # 监听器属于当前进程中的对象，不随森林一起复制或序列化
+        state = self.__dict__.copy()
+        state['listeners'] = []
+        return state
 
     def __repr__(self):
         nodes_str = "\n".join(repr(node) for node in self.adjacency.keys())
         seen = set()
-        edges_str = ""
+        edge_lines = []
         for edges in self.adjacency.values():
             for edge in edges:
                 eid = tuple(sorted([edge.tree1.tree_id, edge.tree2.tree_id]))
                 if eid not in seen:
                     seen.add(eid)
-                    edges_str += repr(edge) + "\n"
-        return f"Nodes:\n{nodes_str}\nEdges:\n{edges_str.strip()}"
\ No newline at end of file
+                    edge_lines.append(repr(edge))
+        edges_str = "\n".join(edge_lines)
+        return f"Nodes:\n{nodes_str}\nEdges:\n{edges_str.strip()}"
\ No newline at end of file
@@ -1,8 +1,10 @@
+import os
 import dash
 from dash import dcc, html
 from forest_management.dashboard.layout import layout
 from forest_management.dashboard.callbacks import register_callbacks
 from forest_management.core.forest_graph import ForestGraph
+from forest_management.utils.sqlite_store import open_persistent_forest
 
 app = dash.Dash(
     __name__,
@@ -13,8 +15,12 @@ server = app.server
 
 app.layout = layout
 
-# 初始化森林图并注册回调
-forest = ForestGraph()
+# 初始化森林图并注册回调；设置 FOREST_DB_PATH 时森林保存在 SQLite 数据库中，重启后自动恢复
+FOREST_DB_PATH = os.environ.get('FOREST_DB_PATH')
+if FOREST_DB_PATH:
+    forest, forest_store = open_persistent_forest(FOREST_DB_PATH)
+else:
+    forest = ForestGraph()
 register_callbacks(app, forest)
 
 if __name__ == '__main__':
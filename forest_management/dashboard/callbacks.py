@@ -1,28 +1,64 @@
 import dash
-from dash import Input, Output, State
+from dash import Input, Output, State, html
+from flask import Response, stream_with_context
 from dash.exceptions import PreventUpdate
 from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
 from forest_management.tasks.infection_spread import simulate_infection_spread
 from forest_management.tasks.path_finding import find_shortest_path
-from forest_management.tasks.conservation_areas import find_conservation_areas
-from forest_management.visualization.interactive_visualize import generate_figure
-from forest_management.tasks.extra_features import get_health_stats, get_species_distribution
+from forest_management.tasks.conservation_areas import top_conservation_areas
+from forest_management.tasks.buffer_zones import mark_at_risk
+from forest_management.visualization.interactive_visualize import viewport_from_relayout, LOD_MAX_NODES
+from forest_management.tasks.extra_features import get_largest_conservation_area
+from forest_management.tasks.forest_statistics import compute_forest_statistics
 from forest_management.utils.data_loader import load_forest_data
+from forest_management.utils.delta_import import import_forest_delta
+from forest_management.utils.data_export import iter_csv_bytes, iter_forest_trees
+from forest_management.utils.sketches import get_forest_sketches
 from forest_management.dashboard.utils import save_initial_state, restore_initial_state
+from forest_management.dashboard.figure_updates import IncrementalFigure
 import plotly.graph_objs as go
 
 def register_callbacks(app, forest: ForestGraph):
+    # 最近一次绘图的高亮参数和可见范围；缩放时按新的范围重新绘制，并沿用当前的高亮
+    view = {'highlights': {}, 'viewport': None}
+    # 浏览器中的图表与服务器同步时只发送变化的部分，'figure-revision' 记录浏览器中图表的修订号
+    figure = IncrementalFigure()
+
+    def render(revision, **highlights):
+        view['highlights'] = highlights
+        # 小型森林始终完整绘制，缩放由浏览器完成
+        viewport = view['viewport'] if len(forest.adjacency) > LOD_MAX_NODES else None
+        return figure.render(forest, revision, viewport, **highlights)
+
+    # 缩放/平移：大型森林只发送可见范围内的树木，缩小时显示聚合的簇
+    @app.callback(
+        Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
+        Input('forest-graph', 'relayoutData'),
+        State('figure-revision', 'data'),
+        prevent_initial_call=True
+    )
+    def update_viewport(relayout_data, revision):
+        if not relayout_data or not any(key.startswith(('xaxis', 'yaxis')) for key in relayout_data):
+            raise PreventUpdate
+        view['viewport'] = viewport_from_relayout(relayout_data)
+        if len(forest.adjacency) <= LOD_MAX_NODES:
+            raise PreventUpdate
+        return render(revision, **view['highlights'])
+
     # 添加树
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Input('add-tree-btn', 'n_clicks'),
         State('tree-id', 'value'),
         State('species', 'value'),
         State('age', 'value'),
         State('status', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def add_tree(n_clicks, tree_id, species, age, status):
+    def add_tree(n_clicks, tree_id, species, age, status, revision):
         if not n_clicks or not tree_id or not species or not age or not status:
             raise PreventUpdate
         try:
@@ -31,35 +67,37 @@ def register_callbacks(app, forest: ForestGraph):
             forest.add_tree(new_tree)
         except Exception as e:
             print(f"Error adding tree: {e}")
-        fig = generate_figure(forest)
-        return fig
+        return render(revision)
 
     # 删除树
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Input('remove-tree-btn', 'n_clicks'),
         State('remove-tree-id', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def remove_tree(n_clicks, remove_tree_id):
+    def remove_tree(n_clicks, remove_tree_id, revision):
         if not n_clicks or not remove_tree_id:
             raise PreventUpdate
         tree = next((t for t in forest.adjacency if t.tree_id == int(remove_tree_id)), None)
         if tree:
             forest.remove_tree(tree)
-        fig = generate_figure(forest)
-        return fig
+        return render(revision)
 
     # 添加路径
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Input('add-path-btn', 'n_clicks'),
         State('start-id', 'value'),
         State('end-id', 'value'),
         State('distance', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def add_path(n_clicks, start_id, end_id, distance):
+    def add_path(n_clicks, start_id, end_id, distance, revision):
         if not n_clicks or not start_id or not end_id or not distance:
             raise PreventUpdate
         start_tree = next((t for t in forest.adjacency if t.tree_id == int(start_id)), None)
@@ -67,18 +105,19 @@ def register_callbacks(app, forest: ForestGraph):
         if start_tree and end_tree:
             new_path = TreePath(start_tree, end_tree, float(distance))
             forest.add_path(new_path)
-        fig = generate_figure(forest)
-        return fig
+        return render(revision)
 
     # 删除路径
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Input('remove-path-btn', 'n_clicks'),
         State('del-start-id', 'value'),
         State('del-end-id', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def remove_path(n_clicks, del_start_id, del_end_id):
+    def remove_path(n_clicks, del_start_id, del_end_id, revision):
         if not n_clicks or not del_start_id or not del_end_id:
             raise PreventUpdate
         start_tree = next((t for t in forest.adjacency if t.tree_id == int(del_start_id)), None)
@@ -98,19 +137,20 @@ def register_callbacks(app, forest: ForestGraph):
             path_to_remove = find_edge(start_tree, end_tree)
             if path_to_remove:
                 forest.remove_path(path_to_remove)
-        fig = generate_figure(forest)
-        return fig
+        return render(revision)
 
     # 感染模拟
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Output('result-text', 'children', allow_duplicate=True),
         Input('simulate-btn', 'n_clicks'),
         State('infect-id', 'value'),
         State('spread-speed', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def simulate_infection(n_clicks, infect_id, speed):
+    def simulate_infection(n_clicks, infect_id, speed, revision):
         if not n_clicks or not infect_id:
             raise PreventUpdate
         try:
@@ -125,21 +165,23 @@ def register_callbacks(app, forest: ForestGraph):
             else:
                 feedback = "Invalid starting tree ID."
                 infected_trees = []
-            fig = generate_figure(forest, highlight_nodes=[t[0] for t in infected_trees], highlight_color='red')
-            return fig, feedback
+            fig, revision = render(revision, highlight_nodes=[t[0] for t in infected_trees], highlight_color='red')
+            return fig, revision, feedback
         except Exception as e:
-            return dash.no_update, f"Infection simulation error: {e}"
+            return dash.no_update, dash.no_update, f"Infection simulation error: {e}"
 
     # 最短路径
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Output('result-text', 'children', allow_duplicate=True),
         Input('shortest-btn', 'n_clicks'),
         State('shortest-start', 'value'),
         State('shortest-end', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def find_shortest_path_callback(n_clicks, shortest_start, shortest_end):
+    def find_shortest_path_callback(n_clicks, shortest_start, shortest_end, revision):
         if not n_clicks or not shortest_start or not shortest_end:
             raise PreventUpdate
         start_tree = next((t for t in forest.adjacency if t.tree_id == int(shortest_start)), None)
@@ -150,40 +192,68 @@ def register_callbacks(app, forest: ForestGraph):
             feedback = f"Shortest path: {path_ids} with distance: {distance:.2f}"
         else:
             feedback = "Invalid tree IDs."
-        fig = generate_figure(forest, path_nodes=path)
-        return fig, feedback
+        fig, revision = render(revision, path_nodes=path)
+        return fig, revision, feedback
 
     # 保护区
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Output('result-text', 'children', allow_duplicate=True),
         Input('conserve-btn', 'n_clicks'),
+        State('buffer-distance', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def find_conservation_areas_callback(n_clicks):
+    def find_conservation_areas_callback(n_clicks, buffer_distance, revision):
         if not n_clicks:
             raise PreventUpdate
-        areas = find_conservation_areas(forest)
-        if areas:
-            largest = max(areas, key=len)
-            fig = generate_figure(forest, highlight_nodes=largest, highlight_color='#90ee90')
+        if buffer_distance:
+            # 带缓冲区的保护区随缓冲距离变化，不走增量索引
+            top = top_conservation_areas(forest, k=1, buffer_distance=float(buffer_distance))
+            area = top[0] if top else None
+        else:
+            area = get_largest_conservation_area(forest)
+        if area:
+            largest = area['trees']
+            fig, revision = render(revision, highlight_nodes=largest, highlight_color='#90ee90')
             ids = [tree.tree_id for tree in largest]
             feedback = f"The largest conservation area: {ids}"
-            return fig, feedback
-        return dash.no_update, "No healthy areas found"
+            return fig, revision, feedback
+        return dash.no_update, dash.no_update, "No healthy areas found"
+
+    # 缓冲区内的健康树标记为AT_RISK
+    @app.callback(
+        Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
+        Output('result-text', 'children', allow_duplicate=True),
+        Input('mark-risk-btn', 'n_clicks'),
+        State('buffer-distance', 'value'),
+        State('figure-revision', 'data'),
+        prevent_initial_call=True
+    )
+    def mark_at_risk_callback(n_clicks, buffer_distance, revision):
+        if not n_clicks or not buffer_distance:
+            raise PreventUpdate
+        changed = mark_at_risk(forest, float(buffer_distance))
+        fig, revision = render(revision)
+        return fig, revision, f"{len(changed)} trees within {float(buffer_distance):.1f} of an infection marked AT_RISK"
 
     # 统计图表
     @app.callback(
         Output('health-stats', 'figure'),
         Output('species-stats', 'figure'),
+        Output('age-stats', 'figure'),
+        Output('distance-stats', 'figure'),
         Input('stat-btn', 'n_clicks'),
         prevent_initial_call=True
     )
     def show_stats(n):
         if not n:
             raise PreventUpdate
-        stats = get_health_stats(forest)
-        species_distribution = get_species_distribution(forest)
+        statistics = compute_forest_statistics(forest)
+        stats = statistics['health']
+        species_distribution = statistics['species']
         labels = ['HEALTHY', 'AT_RISK', 'INFECTED']
         values = [stats['healthy'], stats['at_risk'], stats['infected']]
         colors = ['green', 'orange', 'red']
@@ -194,8 +264,24 @@ def register_callbacks(app, forest: ForestGraph):
             y=list(species_distribution.values()),
             marker_color='lightblue'
         )])
-        bar_fig.update_layout(title="Species Distribution", xaxis_title="Species", yaxis_title="Count")
-        return pie_fig, bar_fig
+        bar_fig.update_layout(title=f"Species Distribution (average age {statistics['average_age']:.1f})",
+                              xaxis_title="Species", yaxis_title="Count")
+        # 分位数和距离分布来自随森林维护的草图，不需要扫描全部记录
+        sketches = get_forest_sketches(forest)
+        age_summary = sketches.age_summary((0.5, 0.95))
+        age_fig = go.Figure(data=[
+            go.Bar(name='Median', x=list(age_summary), y=[q[0.5] for q in age_summary.values()]),
+            go.Bar(name='P95', x=list(age_summary), y=[q[0.95] for q in age_summary.values()]),
+        ])
+        age_fig.update_layout(title="Age by Species (median / p95)", barmode='group', yaxis_title="Age")
+        histogram = sketches.distance_histogram
+        distance_fig = go.Figure(data=[go.Bar(
+            x=((histogram.edges[:-1] + histogram.edges[1:]) / 2).tolist(),
+            y=histogram.bin_counts.tolist(),
+            marker_color='tan'
+        )])
+        distance_fig.update_layout(title="Path Distance Distribution", xaxis_title="Distance", yaxis_title="Count")
+        return pie_fig, bar_fig, age_fig, distance_fig
 
     # 在文件顶部添加全局变量
     initial_forest_state = None
@@ -216,53 +302,93 @@ def register_callbacks(app, forest: ForestGraph):
     # 恢复初始状态
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Output('action-feedback', 'children', allow_duplicate=True),
         Input('restore-init-btn', 'n_clicks'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def restore_initial_state_callback(n_clicks):
+    def restore_initial_state_callback(n_clicks, revision):
         if not n_clicks:
             raise PreventUpdate
         global initial_forest_state
         if initial_forest_state:
             restore_initial_state(forest, initial_forest_state)
-            fig = generate_figure(forest)
-            return fig, "Initial state restored."
-        return dash.no_update, "No saved state found"
+            fig, revision = render(revision)
+            return fig, revision, "Initial state restored."
+        return dash.no_update, dash.no_update, "No saved state found"
 
     # 清空森林
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Output('action-feedback', 'children', allow_duplicate=True),
         Input('clear-forest-btn', 'n_clicks'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def clear_forest(n_clicks):
+    def clear_forest(n_clicks, revision):
         if not n_clicks:
             raise PreventUpdate
-        forest.adjacency.clear()
-        fig = generate_figure(forest)
-        return fig, "Forest cleared."
+        forest.reset()
+        fig, revision = render(revision)
+        return fig, revision, "Forest cleared."
 
-    # 导入CSV数据
+    # 导入CSV数据：整体替换，或把增量文件应用到当前森林
     @app.callback(
         Output('forest-graph', 'figure', allow_duplicate=True),
+        Output('figure-revision', 'data', allow_duplicate=True),
         Output('action-feedback', 'children', allow_duplicate=True),
         Input('import-csv-btn', 'n_clicks'),
         State('tree-csv-path', 'value'),
         State('path-csv-path', 'value'),
+        State('import-mode', 'value'),
+        State('figure-revision', 'data'),
         prevent_initial_call=True
     )
-    def import_csv_data(n_clicks, tree_path, path_path):
-        if not n_clicks or not tree_path or not path_path:
+    def import_csv_data(n_clicks, tree_path, path_path, mode, revision):
+        tree_path = tree_path.strip().strip('"\'') if tree_path else None
+        path_path = path_path.strip().strip('"\'') if path_path else None
+        # 增量模式下两个文件都是可选的，整体替换时两个文件都必须提供
+        if not n_clicks or not (tree_path or path_path) or (mode != 'delta' and not (tree_path and path_path)):
             raise PreventUpdate
         try:
-            tree_path = tree_path.strip().strip('"\'')
-            path_path = path_path.strip().strip('"\'')
-            forest_new = load_forest_data(tree_path, path_path)
-            forest.adjacency.clear()
-            forest.adjacency.update(forest_new.adjacency)  # 使用update方法替换内容
-            fig = generate_figure(forest)
-            return fig, "✅ Data imported successfully, graph updated"
+            if mode == 'delta':
+                summary = import_forest_delta(forest, tree_path, path_path)
+                fig, revision = render(revision)
+                changes = ", ".join(f"{key.replace('_', ' ')}: {value}" for key, value in summary.items())
+                return fig, revision, f"✅ Changes applied ({changes})"
+            # 重复导入未改变的大文件时直接读取解析缓存（目录见 FOREST_PARSE_CACHE_DIR）
+            forest_new = load_forest_data(tree_path, path_path, use_cache=True)
+            forest.reset(forest_new.adjacency)  # 整体替换内容并通知监听器
+            fig, revision = render(revision)
+            return fig, revision, "✅ Data imported successfully, graph updated"
         except Exception as e:
-            return dash.no_update, f"❌ Failed to import: {str(e)}"
\ No newline at end of file
+            return dash.no_update, dash.no_update, f"❌ Failed to import: {str(e)}"
+    # 导出数据：由服务器路由流式输出CSV，不在内存中构建整个文件
+    @app.server.route('/export/<filename>')
+    def export_csv_stream(filename):
+        kind, _, ext = filename.partition('.')
+        if kind not in ('trees', 'paths') or ext not in ('csv', 'csv.gz'):
+            return Response("Not found", status=404)
+        compress = ext == 'csv.gz'
+        trees = iter_forest_trees(forest)  # 逐块遍历树，不复制整个树列表；导出过程中森林被修改也不会中断
+        return Response(
+            stream_with_context(iter_csv_bytes(forest, kind, compress=compress, trees=trees)),
+            mimetype='application/gzip' if compress else 'text/csv',
+            headers={'Content-Disposition': f'attachment; filename={filename}'},
+        )
+
+    @app.callback(
+        Output('action-feedback', 'children', allow_duplicate=True),
+        Input('export-csv-btn', 'n_clicks'),
+        prevent_initial_call=True
+    )
+    def export_csv_data(n_clicks):
+        if not n_clicks:
+            raise PreventUpdate
+        links = []
+        for kind in ('trees', 'paths'):
+            for ext in ('csv', 'csv.gz'):
+                links += [html.A(f"{kind}.{ext}", href=f"/export/{kind}.{ext}", download=f"{kind}.{ext}"), " "]
+        return ["⬇️ Download: ", *links]
@@ -0,0 +1,158 @@
+import threading
+from collections import OrderedDict
+from dash import Patch
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.visualization.interactive_visualize import (detail_view, model_figure, generate_lod_figure,
+                                                                    trace_columns, color_codes, node_palette,
+                                                                    palette_scale)
+from forest_management.visualization.figure_cache import FigureCache, figure_cache, figure_key, approximate_size
+
+PATCH_MAX_CHANGES = 500  # 变化的元素（树木或边）超过此数量时发送完整图表
+PATCH_MAX_CLIENTS = 16  # 保留最近发送的多少个图表模型（每个页面至少需要一个）
+
+
+def _location(patch: Patch, trace: int, path: tuple):
+    location = patch['data'][trace]
+    for key in path:
+        location = location[key]
+    return location
+
+
+class IncrementalFigure:
+    """为浏览器中的森林图表生成增量更新
+
+    按修订号记录最近发送给浏览器的图表模型（各轨迹中元素的键和顺序），之后的绘图与浏览器所持
+    修订号对应的模型比较，只把新增、修改和删除的元素作为 dash.Patch 发送：新增一棵树只需要几百
+    字节，而不是整个图表。每次发送都分配一个新的修订号，多个页面各自持有自己的修订号，互不干扰；
+    只保留最近 max_clients 个模型。修订号未知（例如页面刷新或模型已被淘汰）、可见范围或轨迹类型
+    改变、处于聚合的簇视图或变化过多时发送完整图表。完整图表的字典连同其模型缓存在 FigureCache 中，
+    多个页面查看同一视图时直接返回缓存的字典，不再构建模型和 plotly 图表。
+    Dash 在多个线程中执行回调，修订号和模型表的读写都在锁内完成；已记录的模型不会再被修改。
+    """
+
+    def __init__(self, max_changes: int = PATCH_MAX_CHANGES, cache: FigureCache = None,
+                 max_clients: int = PATCH_MAX_CLIENTS):
+        self.max_changes = max_changes
+        self.cache = cache if cache is not None else figure_cache
+        self.max_clients = max_clients
+        self.revision = 0  # 最近分配的修订号
+        # 修订号 -> (浏览器中的图表模型 {轨迹名: {键: 行}}，按浏览器中的顺序, (高亮色, 可见范围, 是否使用 WebGL))
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, forest: ForestGraph, client_revision=None, viewport: tuple = None, **highlights) -> tuple:
+        """生成图表或增量更新，返回 (图表字典或 Patch, 新的修订号)
+
+        Args:
+            forest: 森林图对象
+            client_revision: 浏览器当前图表的修订号
+            viewport: 可见范围，同 generate_lod_figure
+            highlights: 高亮参数，同 generate_lod_figure
+        """
+        highlight_color = highlights.get('highlight_color', '#90ee90')
+        key = figure_key(forest, highlights.get('highlight_nodes'), highlights.get('path_nodes'),
+                         highlights.get('highlight_paths'), highlight_color, 'lod', viewport,
+                         highlights.get('max_nodes'), highlights.get('max_edges'), highlights.get('grid'))
+        with self._lock:
+            self.revision += 1
+            revision = self.revision
+            state = self._states.get(client_revision) if client_revision is not None else None
+
+        detail = None
+        if state is not None:
+            # 需要新的模型才能与浏览器中的图表比较
+            old_model, old_view = state
+            detail = detail_view(forest, viewport, **highlights)
+            model, use_webgl = detail
+            if model is not None and old_view[1:] == (viewport, use_webgl):
+                diff = self._diff(old_model, old_view[0], model, highlight_color)
+                if diff is not None:
+                    patch, new_model = diff
+                    self._remember(revision, new_model, (highlight_color, viewport, use_webgl))
+                    return patch, revision
+
+        # 完整图表：先查缓存，命中时不再构建模型和图表
+        figure, model, view = self.cache.get_or_build(
+            key, forest, lambda: self._full(forest, viewport, highlights, detail), size=self._entry_size)
+        if model is not None:
+            self._remember(revision, model, view)
+        return figure, revision
+
+    def _remember(self, revision: int, model: dict, view: tuple):
+        with self._lock:
+            self._states[revision] = (model, view)
+            while len(self._states) > self.max_clients:
+                self._states.popitem(last=False)
+
+    @staticmethod
+    def _full(forest: ForestGraph, viewport: tuple, highlights: dict, detail: tuple = None) -> tuple:
+        """完整图表的缓存条目 (Dash 回调返回的图表字典, 模型, 视图参数)，聚合的簇视图没有模型"""
+        model, use_webgl = detail if detail is not None else detail_view(forest, viewport, **highlights)
+        if model is None:
+            return generate_lod_figure(forest, viewport, **highlights).to_plotly_json(), None, None
+        highlight_color = highlights.get('highlight_color', '#90ee90')
+        figure = model_figure(model, highlight_color, viewport, use_webgl, patchable=True)
+        return figure.to_plotly_json(), model, (highlight_color, viewport, use_webgl)
+
+    @staticmethod
+    def _entry_size(entry: tuple) -> int:
+        # 模型与图表包含相同的数据，按图表大小的两倍估算
+        figure, model, _ = entry
+        size = approximate_size(figure)
+        return size * 2 if model is not None else size
+
+    def _diff(self, client_model: dict, client_color: str, model: dict, highlight_color: str):
+        """把浏览器中的模型 client_model 更新为 model 的 (Patch, 更新后浏览器中的模型)，变化过多时返回 None
+
+        不修改 client_model（它可能来自缓存或仍被其他页面使用），更新后的模型是新建的字典。
+        """
+        changes = 0
+        for name, rows in model.items():
+            old = client_model[name]
+            changes += sum(1 for key in old if old[key] != rows.get(key)) + sum(1 for key in rows if key not in old)
+        if changes > self.max_changes:
+            return None
+
+        patch = Patch()
+        old_codes = color_codes(node_palette(client_color))
+        new_codes = color_codes(node_palette(highlight_color))
+        new_model = dict(client_model)
+        for trace, (name, rows) in enumerate(model.items()):
+            old = client_model[name]
+            keys = list(old)
+            width = 3 if name.startswith('edges-') else 1
+
+            # 保留的元素原位修改
+            for position, key in enumerate(keys):
+                row = rows.get(key)
+                if row is None or row == old[key]:
+                    continue
+                before = trace_columns(name, [old[key]], old_codes)
+                after = trace_columns(name, [row], new_codes)
+                for path, values in after.items():
+                    for offset, (a, b) in enumerate(zip(before[path], values)):
+                        if a != b:
+                            _location(patch, trace, path)[position * width + offset] = b
+
+            # 从后向前删除，前面元素的位置不受影响
+            removed = [position for position, key in enumerate(keys) if key not in rows]
+            if removed:
+                paths = list(trace_columns(name, [], new_codes))
+                for position in reversed(removed):
+                    for path in paths:
+                        for _ in range(width):
+                            del _location(patch, trace, path)[position * width]
+
+            added = [key for key in rows if key not in old]
+            if added:
+                for path, values in trace_columns(name, [rows[key] for key in added], new_codes).items():
+                    _location(patch, trace, path).extend(values)
+
+            # 浏览器中的顺序：保留的元素在前，新增的元素追加在后
+            kept = {key: rows[key] for key in keys if key in rows}
+            kept.update((key, rows[key]) for key in added)
+            new_model[name] = kept
+
+        if highlight_color != client_color:
+            patch['data'][len(model) - 1]['marker']['colorscale'] = palette_scale(node_palette(highlight_color))
+        return patch, new_model
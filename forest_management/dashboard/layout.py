@@ -18,6 +18,8 @@ layout = html.Div(style={
         'padding': '10px',
         'backgroundColor': 'white'
     }),
+    # 浏览器中森林图表的修订号，服务器据此判断能否只发送增量更新
+    dcc.Store(id='figure-revision'),
 
     html.Div([
         # 树节点添加部分
@@ -75,7 +77,9 @@ layout = html.Div(style={
 
         html.Div([
             html.H4("🛡️ Identify Conservation Area"),
-            html.Button("Highlight Conservation Area", id='conserve-btn', className="button")
+            html.Label("Safety Buffer Distance"), dcc.Input(id='buffer-distance', type='number', value=0, min=0, className="input-box"),
+            html.Button("Highlight Conservation Area", id='conserve-btn', className="button"),
+            html.Button("Mark Buffer Trees At Risk", id='mark-risk-btn', className="button")
         ], className="section"),
     ], style={'display': 'flex', 'justifyContent': 'space-between'}),
 
@@ -97,6 +101,11 @@ layout = html.Div(style={
                     # 树种统计图
                     dcc.Graph(id='species-stats', figure={}, style={'height': '300px', 'flex': '1', 'paddingLeft': '10px'})
                 ], style={'display': 'flex', 'width': '100%', 'gap': '10px'}),
+                # 年龄分位数和路径距离分布
+                html.Div([
+                    dcc.Graph(id='age-stats', figure={}, style={'height': '300px', 'flex': '1', 'paddingRight': '10px'}),
+                    dcc.Graph(id='distance-stats', figure={}, style={'height': '300px', 'flex': '1', 'paddingLeft': '10px'})
+                ], style={'display': 'flex', 'width': '100%', 'gap': '10px'}),
                 html.Button("Show Statistics", id='stat-btn', className="button", style={'marginTop': '10px'}),
             ], style={'flex': '2', 'paddingRight': '20px'}),
 
@@ -110,6 +119,16 @@ layout = html.Div(style={
                         dcc.Input(id='tree-csv-path', type='text', placeholder='e.g. D:/data/trees.csv', style={'width': '100%', 'marginBottom': '10px'}, className="input-box"),
                         html.Label("Path Data File Path (.csv):"),
                         dcc.Input(id='path-csv-path', type='text', placeholder='e.g. D:/data/paths.csv', style={'width': '100%', 'marginBottom': '10px'}, className="input-box"),
+                        dcc.RadioItems(
+                            id='import-mode',
+                            options=[
+                                {'label': 'Replace forest', 'value': 'replace'},
+                                {'label': 'Apply changes (delta)', 'value': 'delta'},
+                            ],
+                            value='replace',
+                            inline=True,
+                            style={'marginBottom': '10px'}
+                        ),
                         html.Button("Import Data", id='import-csv-btn', className="button"),
                     ], style={'marginBottom': '20px'}),
 
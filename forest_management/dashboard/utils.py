@@ -5,4 +5,4 @@ def save_initial_state(forest):
     return copy.deepcopy(forest)
 
 def restore_initial_state(forest, initial_state):
-    forest.adjacency = initial_state.adjacency
\ No newline at end of file
+    forest.reset(initial_state.adjacency)
\ No newline at end of file
@@ -0,0 +1,162 @@
+import functools
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.csr_snapshot import CSRSnapshot
+
+DEFAULT_MAX_ITEMS = 2_000_000  # 缓存结果中元素（对象引用或数组元素）总数的上限
+
+
+def result_size(value, top: bool = True) -> int:
+    """估算结果占用的元素数：容器按其中的元素递归计算，数组按元素个数计算
+
+    顶层的结果对象（如保护区标记、CSR快照）按其属性计算，嵌套的其他对象（如树木）
+    只是引用，计为 1。
+    """
+    if isinstance(value, dict):
+        return sum(result_size(key, False) + result_size(item, False) for key, item in value.items()) + 1
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(result_size(item, False) for item in value) + 1
+    if isinstance(value, np.ndarray):
+        return int(value.size) + 1
+    if top and hasattr(value, '__dict__'):
+        return result_size(vars(value), False)
+    return 1
+
+
+def copy_result(value):
+    """复制结果中的列表、字典和集合（不复制其中的树木等对象），调用方修改副本不影响缓存"""
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, set):
+        return {copy_result(item) for item in value}
+    return value
+
+
+class AnalyticsCache:
+    """有容量上限的LRU分析结果缓存
+
+    键由函数、森林对象、森林的变更计数器和其余参数组成，即
+    (模块, 函数名, id(森林), 变更计数器, 位置参数, 关键字参数)。森林发生修改后旧结果不会再被命中，
+    因此缓存同一函数在同一森林上的新结果时，直接丢弃该函数在旧版本上的所有结果。
+    条目数超过 maxsize 或结果的元素总数超过 max_items 时淘汰最久未使用的结果，单个超过
+    max_items 的结果不缓存。
+    """
+
+    def __init__(self, maxsize: int = 256, max_items: int = DEFAULT_MAX_ITEMS):
+        self.maxsize = maxsize
+        self.max_items = max_items
+        self._entries = OrderedDict()
+        self._families = {}  # (模块, 函数名, id(森林)) -> 该函数在该森林上缓存的键
+        self._lock = threading.Lock()
+        self.items = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, forest):
+        with self._lock:
+            entry = self._entries.get(key)
+            # id 可能被回收后复用，用弱引用确认仍是同一片森林
+            if entry is not None and entry[0]() is forest:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, forest, value, size: int = None):
+        """缓存 value，size 为其元素数（默认由 result_size 估算）"""
+        size = result_size(value) if size is None else size
+        family, version = key[:3], key[3]
+        with self._lock:
+            # 旧版本的结果（以及 id 被复用前那片森林的结果）不会再被命中
+            for old in list(self._families.get(family, ())):
+                ref = self._entries[old][0]
+                if old[3] < version or ref() is not forest:
+                    self._remove(old)
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_items:
+                return
+            self._entries[key] = (weakref.ref(forest), value, size)
+            self._families.setdefault(family, set()).add(key)
+            self.items += size
+            while len(self._entries) > self.maxsize or self.items > self.max_items:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self.items -= size
+        family = key[:3]
+        keys = self._families[family]
+        keys.discard(key)
+        if not keys:
+            del self._families[family]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._families.clear()
+            self.items = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> dict:
+        """缓存的命中、未命中、淘汰次数、当前条目数和元素总数"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'items': self.items,
+                'max_items': self.max_items,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+analytics_cache = AnalyticsCache()
+
+
+def memoize_analytics(func=None, *, cache: AnalyticsCache = None):
+    """为以森林为第一个参数的分析函数添加结果缓存
+
+    只有通过 ForestGraph 方法进行的修改才会递增变更计数器；参数不可哈希时
+    直接调用原函数，不经过缓存。结果中的列表、字典和集合每次返回副本，其余对象
+    （如保护区标记、CSR快照）被所有调用方共享，不应修改。
+    """
+    if func is None:
+        return functools.partial(memoize_analytics, cache=cache)
+
+    @functools.wraps(func)
+    def wrapper(forest, *args, **kwargs):
+        target = cache if cache is not None else analytics_cache
+        if not isinstance(forest, ForestGraph):
+            return func(forest, *args, **kwargs)
+        key = (func.__module__, func.__qualname__, id(forest), forest.version,
+               args, tuple(sorted(kwargs.items())))
+        try:
+            hit, value = target.get(key, forest)
+        except TypeError:
+            return func(forest, *args, **kwargs)
+        if hit:
+            return copy_result(value)
+        value = func(forest, *args, **kwargs)
+        target.put(key, forest, value)
+        return copy_result(value)
+
+    wrapper.uncached = func
+    return wrapper
+
+
+@memoize_analytics
+def forest_snapshot(forest: ForestGraph) -> CSRSnapshot:
+    """森林当前版本的CSR快照，多个分析共享同一个快照，调用方不应修改它"""
+    return CSRSnapshot.from_forest(forest)
@@ -0,0 +1,84 @@
+import heapq
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.tree_node import HealthStatus, TreeNode
+from forest_management.core.csr_snapshot import CSRSnapshot
+
+
+def compute_infection_distances(
+    forest: ForestGraph,
+    max_distance: float = float('inf'),
+    snapshot: CSRSnapshot = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """计算每棵树到最近感染树的路径距离
+
+    以所有感染树为起点做一次多源 Dijkstra 搜索，并在超过 max_distance 后停止，
+    总开销与一次单源搜索相同，而不是每棵感染树各搜索一次。
+
+    Args:
+        forest: 森林图对象
+        max_distance: 距离上限，更远的树视为不受影响
+        snapshot: 已构建好的CSR快照（可选）
+
+    Returns:
+        (nearest, distance) 两个数组：nearest[i] 为最近感染树的节点下标
+        （超出范围时为 -1），distance[i] 为对应的距离（超出范围时为 inf）
+    """
+    if snapshot is None:
+        snapshot = CSRSnapshot.from_forest(forest)
+    indptr, indices, weights, _, _ = snapshot.as_lists()
+    n = snapshot.num_nodes
+    distance = [float('inf')] * n
+    nearest = [-1] * n
+
+    heap = []
+    for source in np.flatnonzero(snapshot.infected_mask()).tolist():
+        distance[source] = 0.0
+        nearest[source] = source
+        heap.append((0.0, source))
+    heapq.heapify(heap)
+
+    while heap:
+        current, node = heapq.heappop(heap)
+        if current > distance[node]:
+            continue
+        source = nearest[node]
+        for slot in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[slot]
+            total = current + weights[slot]
+            if total <= max_distance and total < distance[neighbor]:
+                distance[neighbor] = total
+                nearest[neighbor] = source
+                heapq.heappush(heap, (total, neighbor))
+
+    return np.array(nearest, dtype=np.int64), np.array(distance, dtype=np.float64)
+
+
+def find_unsafe_trees(
+    forest: ForestGraph,
+    buffer_distance: float,
+    snapshot: CSRSnapshot = None
+) -> list[tuple[TreeNode, TreeNode, float]]:
+    """查找距离感染树不超过 buffer_distance 的健康树
+
+    Returns:
+        (健康树, 最近的感染树, 距离) 列表，按距离升序排列
+    """
+    if snapshot is None:
+        snapshot = CSRSnapshot.from_forest(forest)
+    nearest, distance = compute_infection_distances(forest, buffer_distance, snapshot)
+    unsafe = np.flatnonzero(snapshot.healthy_mask() & (distance <= buffer_distance))
+    unsafe = unsafe[np.argsort(distance[unsafe], kind='stable')]
+    return [(snapshot.nodes[i], snapshot.nodes[nearest[i]], float(distance[i])) for i in unsafe.tolist()]
+
+
+def mark_at_risk(forest: ForestGraph, buffer_distance: float) -> list[TreeNode]:
+    """把距离感染树不超过 buffer_distance 的健康树批量标记为 AT_RISK
+
+    Returns:
+        状态被修改的树木列表
+    """
+    changed = [tree for tree, _, _ in find_unsafe_trees(forest, buffer_distance)]
+    for tree in changed:
+        forest.update_tree_health(tree, HealthStatus.AT_RISK)
+    return changed
@@ -0,0 +1,134 @@
+import heapq
+import math
+import os
+import random
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.utils.parallel import map_over_snapshot, split_chunks
+
+
+def _accumulate(snapshot: CSRSnapshot, sources) -> tuple[np.ndarray, np.ndarray]:
+    """对一组起点执行加权 Brandes 算法
+
+    Returns:
+        (依赖度之和, 距离倒数之和) 两个数组
+    """
+    indptr, indices, weights, _, _ = snapshot.as_lists()
+    n = snapshot.num_nodes
+    dependency_sum = np.zeros(n)
+    harmonic_sum = np.zeros(n)
+
+    for source in sources:
+        distance = {source: 0.0}
+        sigma = {source: 1}
+        predecessors = {source: []}
+        order = []
+        heap = [(0.0, source)]
+        done = set()
+        while heap:
+            current, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            order.append(node)
+            for slot in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[slot]
+                total = current + weights[slot]
+                known = distance.get(neighbor)
+                if known is None or total < known:
+                    distance[neighbor] = total
+                    sigma[neighbor] = sigma[node]
+                    predecessors[neighbor] = [node]
+                    heapq.heappush(heap, (total, neighbor))
+                elif total == known and neighbor not in done:
+                    sigma[neighbor] += sigma[node]
+                    predecessors[neighbor].append(node)
+
+        # 按距离从远到近回传依赖度
+        delta = dict.fromkeys(order, 0.0)
+        for node in reversed(order):
+            coefficient = (1.0 + delta[node]) / sigma[node]
+            for predecessor in predecessors[node]:
+                delta[predecessor] += sigma[predecessor] * coefficient
+            if node != source:
+                dependency_sum[node] += delta[node]
+                harmonic_sum[node] += 1.0 / distance[node]
+
+    return dependency_sum, harmonic_sum
+
+
+def compute_centrality(
+    forest: ForestGraph,
+    samples: int = None,
+    exact_threshold: int = 2000,
+    confidence: float = 0.95,
+    workers: int = None,
+    seed: int = None
+) -> dict:
+    """计算树木的介数中心性和（调和）接近中心性
+
+    以路径距离为权重。不超过 exact_threshold 棵树时默认精确计算（以每棵树为起点）；
+    更大的森林随机抽取 samples 个起点，在进程池中并行计算后按比例放大。路径是无向的，
+    因此从抽样起点出发的距离同样可以估计每棵树到所有其他树的距离。
+
+    两个指标都归一化到 [0, 1] 附近：介数为经过该树的最短路径比例，接近中心性为
+    到其他所有树的距离倒数的平均值（不连通的树贡献 0）。误差界由 Hoeffding 不等式给出：
+    在给定置信度下，每个估计值与真实值的偏差不超过对应的 error_bound。
+
+    Args:
+        forest: 森林图对象
+        samples: 抽样的起点数量（None 表示按 exact_threshold 自动选择）
+        exact_threshold: 自动选择时精确计算的最大树木数量
+        confidence: 误差界的置信度
+        workers: 进程数（默认使用CPU核数，1 表示不使用进程池）
+        seed: 抽样使用的随机种子
+
+    Returns:
+        包含 'betweenness'、'closeness'（{树: 值}）、'samples'、'exact' 和 'error_bound' 的字典
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("置信度必须在0到1之间")
+    snapshot = CSRSnapshot.from_forest(forest)
+    n = snapshot.num_nodes
+    if n < 2:
+        return {
+            'betweenness': {tree: 0.0 for tree in snapshot.nodes},
+            'closeness': {tree: 0.0 for tree in snapshot.nodes},
+            'samples': n, 'exact': True,
+            'error_bound': {'betweenness': 0.0, 'closeness': 0.0},
+        }
+    if samples is None:
+        samples = n if n <= exact_threshold else 256
+    if samples <= 0:
+        raise ValueError("采样数量必须大于0")
+    exact = samples >= n
+    sources = list(range(n)) if exact else random.Random(seed).sample(range(n), samples)
+    samples = len(sources)
+
+    workers = workers or os.cpu_count() or 1
+    results = map_over_snapshot(_accumulate, snapshot, split_chunks(sources, workers * 4), workers)
+    dependency_sum = sum(result[0] for result in results)
+    harmonic_sum = sum(result[1] for result in results)
+
+    # 每个抽样起点的贡献是总体平均值的无偏估计，乘以 n / samples 放大到全部起点
+    scale = n / samples
+    betweenness = dependency_sum * scale / ((n - 1) * (n - 2)) if n > 2 else np.zeros(n)
+    closeness = harmonic_sum * scale / (n - 1)
+
+    if exact:
+        bounds = {'betweenness': 0.0, 'closeness': 0.0}
+    else:
+        hoeffding = math.sqrt(math.log(2 / (1 - confidence)) / (2 * samples))
+        min_weight = float(snapshot.edge_weight.min()) if snapshot.num_edges else 1.0
+        bounds = {
+            'betweenness': n / (n - 1) * hoeffding,
+            'closeness': n / (n - 1) / min_weight * hoeffding,
+        }
+    return {
+        'betweenness': dict(zip(snapshot.nodes, betweenness.tolist())),
+        'closeness': dict(zip(snapshot.nodes, closeness.tolist())),
+        'samples': samples,
+        'exact': exact,
+        'error_bound': bounds,
+    }
@@ -1,24 +1,184 @@
+import numpy as np
 from forest_management.core.forest_graph import ForestGraph
 from forest_management.core.tree_node import HealthStatus, TreeNode
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.tasks.buffer_zones import compute_infection_distances
+from forest_management.tasks.analytics_cache import memoize_analytics, forest_snapshot
 
-def find_conservation_areas(forest: ForestGraph, min_size: int = 1) -> list[list[TreeNode]]:
-    """查找森林中的健康树木保护区"""
-    visited = set()
-    conservation_areas = []
-
-    def dfs(node, area):
-        visited.add(node)
-        area.append(node)
-        for path in forest.adjacency[node]:
-            neighbor = path.tree2 if path.tree1 == node else path.tree1
-            if neighbor.health_status == HealthStatus.HEALTHY and neighbor not in visited:
-                dfs(neighbor, area)
-
-    for tree in forest.adjacency:
-        if tree.health_status == HealthStatus.HEALTHY and tree not in visited:
-            area = []
-            dfs(tree, area)
-            if len(area) >= min_size:
-                conservation_areas.append(area)
-
-    return conservation_areas
\ No newline at end of file
+# 取出的保护区超过此数量时先整体排序建立成员索引，否则逐个扫描标签数组
+SCAN_MAX_AREAS = 8
+
+
+class ConservationLabels:
+    """保护区标记结果
+
+    labels[i] 为第 i 个节点所属保护区的编号（非健康树为 -1），sizes[k] 为
+    第 k 个保护区的大小。保护区按其第一棵树在森林中的顺序编号，成员列表只在
+    调用 members() 时才会生成。
+    """
+
+    def __init__(self, labels: np.ndarray, sizes: np.ndarray, nodes: list):
+        self.labels = labels
+        self.sizes = sizes
+        self.nodes = nodes
+        self._order = None
+        self._starts = None
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def members(self, label: int) -> list[TreeNode]:
+        """返回编号为 label 的保护区中的树木"""
+        if not 0 <= label < len(self.sizes):
+            raise IndexError("保护区编号超出范围")
+        if self._order is None:
+            # 只取少数保护区时，一次向量化扫描比整体排序更省
+            return [self.nodes[i] for i in np.flatnonzero(self.labels == label).tolist()]
+        start, end = self._starts[label], self._starts[label + 1]
+        return [self.nodes[i] for i in self._order[start:end].tolist()]
+
+    def index_members(self):
+        """建立成员索引，之后每次 members() 只需切片"""
+        if self._order is None:
+            # 按标签稳定排序后，每个保护区的成员是一段连续区间
+            in_area = np.flatnonzero(self.labels >= 0)
+            self._order = in_area[np.argsort(self.labels[in_area], kind='stable')]
+            self._starts = np.concatenate([[0], np.cumsum(self.sizes)])
+
+    def areas(self):
+        """逐个生成每个保护区的成员列表"""
+        self.index_members()
+        for label in range(len(self.sizes)):
+            yield self.members(label)
+
+    def top(self, k: int = None) -> list[tuple[int, int]]:
+        """按大小降序返回前 k 个保护区的 (编号, 大小)，k 为 None 时返回全部
+
+        大小相同时编号小的在前。只对前 k 个做排序，不生成任何成员列表。
+        """
+        count = len(self.sizes)
+        if k is None or k >= count:
+            candidates = np.arange(count)
+        elif k <= 0:
+            return []
+        else:
+            # argpartition 找出第 k 大的大小，再补上与它相同大小的保护区以保证顺序稳定
+            kth = -np.partition(-self.sizes, k - 1)[k - 1]
+            candidates = np.flatnonzero(self.sizes >= kth)
+        order = candidates[np.lexsort((candidates, -self.sizes[candidates]))][:k]
+        return [(label, int(self.sizes[label])) for label in order.tolist()]
+
+
+def _union_find_roots(n: int, edge_u: np.ndarray, edge_v: np.ndarray) -> np.ndarray:
+    """数组化的并查集，返回每个节点所在连通分量的根（分量内最小的下标）
+
+    每一轮把每条边两端的根挂到较小的根上，再做指针跳跃压缩路径，直到所有边
+    两端的根都相同。全部操作都是NumPy数组运算，没有递归，也没有逐节点的Python循环。
+    """
+    parent = np.arange(n, dtype=np.int64)
+    while len(edge_u):
+        root_u = parent[edge_u]
+        root_v = parent[edge_v]
+        pending = root_u != root_v
+        if not pending.any():
+            break
+        edge_u, edge_v = edge_u[pending], edge_v[pending]
+        root_u, root_v = root_u[pending], root_v[pending]
+        smaller = np.minimum(root_u, root_v)
+        np.minimum.at(parent, root_u, smaller)
+        np.minimum.at(parent, root_v, smaller)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return parent
+
+
+def label_conservation_areas(
+    forest: ForestGraph,
+    min_size: int = 1,
+    snapshot: CSRSnapshot = None,
+    buffer_distance: float = 0
+) -> ConservationLabels:
+    """以数组形式标记森林中的健康树木保护区
+
+    小于 min_size 的保护区在压缩编号时直接丢弃（标记为 -1），
+    不会为它们生成编号或成员列表。
+
+    Args:
+        forest: 森林图对象
+        min_size: 保护区的最小树木数量，更小的保护区标记为 -1
+        snapshot: 已构建好的CSR快照（可选，省去重新构建）
+        buffer_distance: 安全缓冲距离，与感染树的路径距离不超过该值的健康树不计入保护区
+
+    Returns:
+        ConservationLabels 对象
+    """
+    if snapshot is None:
+        snapshot = CSRSnapshot.from_forest(forest)
+    n = snapshot.num_nodes
+    healthy = snapshot.healthy_mask()
+    if buffer_distance > 0:
+        _, distance = compute_infection_distances(forest, buffer_distance, snapshot)
+        healthy &= distance > buffer_distance
+    both_healthy = healthy[snapshot.edge_u] & healthy[snapshot.edge_v]
+    roots = _union_find_roots(n, snapshot.edge_u[both_healthy], snapshot.edge_v[both_healthy])
+
+    labels = np.full(n, -1, dtype=np.int64)
+    if healthy.any():
+        # 根是分量内最小的下标，因此按根排序即按保护区第一棵树的顺序编号
+        area_roots, inverse = np.unique(roots[healthy], return_inverse=True)
+        sizes = np.bincount(inverse)
+        keep = sizes >= min_size
+        remap = np.full(len(area_roots), -1, dtype=np.int64)
+        remap[keep] = np.arange(keep.sum())
+        labels[healthy] = remap[inverse]
+        sizes = sizes[keep]
+    else:
+        sizes = np.zeros(0, dtype=np.int64)
+    return ConservationLabels(labels, sizes, snapshot.nodes)
+
+
+def top_conservation_areas(
+    forest: ForestGraph,
+    k: int = 1,
+    min_size: int = 1,
+    snapshot: CSRSnapshot = None,
+    buffer_distance: float = 0
+) -> list[dict]:
+    """获取最大的 k 个健康保护区
+
+    只为返回的 k 个保护区生成树木列表，其余保护区只以标签和大小的形式存在。
+
+    Args:
+        forest: 森林图对象
+        k: 返回的保护区数量（None 表示所有不小于 min_size 的保护区）
+        min_size: 保护区的最小树木数量
+        snapshot: 已构建好的CSR快照（可选）
+        buffer_distance: 安全缓冲距离
+
+    Returns:
+        按大小降序排列的字典列表，每项包含保护区编号、大小和树木列表
+    """
+    labels = label_conservation_areas(forest, min_size, snapshot, buffer_distance)
+    top = labels.top(k)
+    if len(top) > SCAN_MAX_AREAS:
+        labels.index_members()
+    return [{'label': label, 'size': size, 'trees': labels.members(label)} for label, size in top]
+
+
+@memoize_analytics
+def conservation_labels(forest: ForestGraph, min_size: int = 1, buffer_distance: float = 0) -> ConservationLabels:
+    """带缓存的 label_conservation_areas，使用共享的快照，调用方不应修改返回的标记"""
+    return label_conservation_areas(forest, min_size, forest_snapshot(forest), buffer_distance)
+
+
+@memoize_analytics
+def find_conservation_areas(
+    forest: ForestGraph,
+    min_size: int = 1,
+    buffer_distance: float = 0
+) -> list[list[TreeNode]]:
+    """查找森林中的健康树木保护区（可选地排除感染树缓冲区内的树）"""
+    return list(conservation_labels(forest, min_size, buffer_distance).areas())
@@ -0,0 +1,226 @@
+import heapq
+from collections import deque
+from forest_management.core.forest_graph import ForestGraph, ForestListener
+from forest_management.core.tree_node import HealthStatus, TreeNode
+from forest_management.tasks.conservation_areas import label_conservation_areas
+
+
+class ConservationAreaIndex(ForestListener):
+    """随森林变更增量维护的保护区结构
+
+    注册为森林的监听器后：
+    - 树变为健康或新增路径时，合并相邻保护区（小的并入大的）；
+    - 树变为非健康、被移除或路径被删除时，只在受影响的保护区内从断点两侧
+      交替做广度优先搜索，较小的一侧先搜索完毕，因此开销与被分出的部分成正比。
+    最大保护区通过带惰性删除的大顶堆维护，查询为均摊 O(log n)。
+
+    注意：只有通过 ForestGraph 方法进行的修改才能被感知，直接修改
+    tree.health_status 会使索引过期。
+    """
+
+    def __init__(self, forest: ForestGraph):
+        self.forest = forest
+        self._rebuild()
+        forest.add_listener(self)
+
+    def _rebuild(self):
+        self._area_of = {}
+        self._members = {}
+        self._heap = []
+        self._next_id = 0
+        labels = label_conservation_areas(self.forest)
+        for members in labels.areas():
+            self._new_area(members)
+
+    # ---- 查询 ----
+
+    def __len__(self):
+        return len(self._members)
+
+    def area_of(self, tree: TreeNode):
+        """树所在保护区的编号（非健康树返回 None）"""
+        return self._area_of.get(tree)
+
+    def size_of(self, area_id: int) -> int:
+        return len(self._members[area_id])
+
+    def members(self, area_id: int) -> list[TreeNode]:
+        """保护区中的树木（按树ID排序）"""
+        return sorted(self._members[area_id])
+
+    def sizes(self) -> dict[int, int]:
+        """{保护区编号: 大小}"""
+        return {area_id: len(members) for area_id, members in self._members.items()}
+
+    def areas(self) -> list[list[TreeNode]]:
+        return [self.members(area_id) for area_id in self._members]
+
+    def top(self, k: int = 1, min_size: int = 1) -> list[tuple[int, int]]:
+        """按大小降序返回前 k 个保护区的 (编号, 大小)，不生成成员列表"""
+        sizes = ((area_id, len(members)) for area_id, members in self._members.items()
+                 if len(members) >= min_size)
+        if k is None:
+            return sorted(sizes, key=lambda x: (-x[1], x[0]))
+        return heapq.nsmallest(k, sizes, key=lambda x: (-x[1], x[0]))
+
+    def largest(self):
+        """最大保护区的编号（没有保护区时返回 None）"""
+        heap = self._heap
+        while heap:
+            neg_size, area_id = heap[0]
+            members = self._members.get(area_id)
+            if members is not None and len(members) == -neg_size:
+                return area_id
+            heapq.heappop(heap)
+        return None
+
+    # ---- 内部维护 ----
+
+    def _push(self, area_id):
+        heapq.heappush(self._heap, (-len(self._members[area_id]), area_id))
+        # 过期条目过多时重建堆
+        if len(self._heap) > 2 * len(self._members) + 64:
+            self._heap = [(-len(m), a) for a, m in self._members.items()]
+            heapq.heapify(self._heap)
+
+    def _new_area(self, trees) -> int:
+        area_id = self._next_id
+        self._next_id += 1
+        members = set(trees)
+        self._members[area_id] = members
+        for tree in members:
+            self._area_of[tree] = area_id
+        self._push(area_id)
+        return area_id
+
+    def _merge(self, a: int, b: int) -> int:
+        if a == b:
+            return a
+        if len(self._members[a]) < len(self._members[b]):
+            a, b = b, a
+        moved = self._members.pop(b)
+        for tree in moved:
+            self._area_of[tree] = a
+        self._members[a] |= moved
+        self._push(a)
+        return a
+
+    def _healthy_neighbors(self, tree, paths=None):
+        for path in self.forest.adjacency[tree] if paths is None else paths:
+            neighbor = path.tree2 if path.tree1 == tree else path.tree1
+            if neighbor in self._area_of:
+                yield neighbor
+
+    def _detach(self, tree):
+        """把树从所在保护区中移除，返回原保护区编号"""
+        area_id = self._area_of.pop(tree)
+        members = self._members[area_id]
+        members.discard(tree)
+        if not members:
+            del self._members[area_id]
+        return area_id
+
+    def _split(self, area_id, seeds):
+        """保护区失去一棵树或一条路径后，检查 seeds 是否仍然连通"""
+        members = self._members.get(area_id)
+        if members is None:
+            return
+        seeds = [s for s in dict.fromkeys(seeds) if s in members]
+        if len(seeds) <= 1:
+            self._push(area_id)
+            return
+
+        # 每个种子一组搜索；两组相遇时合并为一组
+        group = list(range(len(seeds)))
+
+        def find(g):
+            while group[g] != g:
+                group[g] = group[group[g]]
+                g = group[g]
+            return g
+
+        owner = {seed: i for i, seed in enumerate(seeds)}
+        frontiers = {i: deque([seed]) for i, seed in enumerate(seeds)}
+        finished = []
+        while len(frontiers) > 1:
+            for g in list(frontiers):
+                if g not in frontiers:
+                    continue
+                frontier = frontiers[g]
+                node = frontier.popleft()
+                for path in self.forest.adjacency[node]:
+                    neighbor = path.tree2 if path.tree1 == node else path.tree1
+                    if neighbor not in members:
+                        continue
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = g
+                        frontier.append(neighbor)
+                    elif find(other) != g:
+                        # 两组搜索相遇，属于同一块
+                        loser = find(other)
+                        group[loser] = g
+                        frontier.extend(frontiers.pop(loser))
+                if not frontier:
+                    del frontiers[g]
+                    finished.append(g)
+        if not finished:
+            self._push(area_id)
+            return
+
+        pieces = {g: [] for g in finished}
+        for node, g in owner.items():
+            root = find(g)
+            if root in pieces:
+                pieces[root].append(node)
+        if not frontiers:
+            # 所有搜索都已结束，保留最大的一块使用原编号
+            keep = max(pieces, key=lambda g: len(pieces[g]))
+            del pieces[keep]
+        for nodes in pieces.values():
+            members.difference_update(nodes)
+            self._new_area(nodes)
+        self._push(area_id)
+
+    # ---- 森林事件 ----
+
+    def on_tree_added(self, tree):
+        if tree.health_status == HealthStatus.HEALTHY:
+            self._new_area([tree])
+
+    def on_tree_removed(self, tree, paths):
+        if tree in self._area_of:
+            area_id = self._detach(tree)
+            self._split(area_id, list(self._healthy_neighbors(tree, paths)))
+
+    def on_path_added(self, path):
+        a = self._area_of.get(path.tree1)
+        b = self._area_of.get(path.tree2)
+        if a is not None and b is not None:
+            self._merge(a, b)
+
+    def on_path_removed(self, path):
+        a = self._area_of.get(path.tree1)
+        if a is not None and a == self._area_of.get(path.tree2):
+            self._split(a, [path.tree1, path.tree2])
+
+    def on_health_changed(self, tree, old_status):
+        healthy = tree.health_status == HealthStatus.HEALTHY
+        if healthy and tree not in self._area_of:
+            area_id = self._new_area([tree])
+            for neighbor in list(self._healthy_neighbors(tree)):
+                area_id = self._merge(area_id, self._area_of[neighbor])
+        elif not healthy and tree in self._area_of:
+            area_id = self._detach(tree)
+            self._split(area_id, list(self._healthy_neighbors(tree)))
+
+    def on_reset(self):
+        self._rebuild()
+
+
+def get_conservation_index(forest: ForestGraph) -> ConservationAreaIndex:
+    """获取森林上已注册的保护区索引，不存在时创建并注册"""
+    for listener in forest.listeners:
+        if isinstance(listener, ConservationAreaIndex):
+            return listener
+    return ConservationAreaIndex(forest)
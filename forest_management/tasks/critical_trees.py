@@ -0,0 +1,97 @@
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.csr_snapshot import CSRSnapshot
+
+
+def find_critical_trees(forest: ForestGraph, snapshot: CSRSnapshot = None) -> dict:
+    """查找健康保护区中的关键树木（割点）和关键路径（桥）
+
+    在 find_conservation_areas 使用的健康子图上执行非递归的 Tarjan 算法，
+    一次线性时间的深度优先遍历即可得到所有割点和桥，以及移除它们后保护区
+    会被分成的各部分大小。impact 为与最大剩余部分分离的树木数量。
+
+    Args:
+        forest: 森林图对象
+        snapshot: 已构建好的CSR快照（可选）
+
+    Returns:
+        包含 'articulation_trees' 和 'bridges' 两个列表的字典，均按 impact 降序排列
+    """
+    if snapshot is None:
+        snapshot = CSRSnapshot.from_forest(forest)
+    indptr, indices, _, edge_ids, _ = snapshot.as_lists()
+    healthy = snapshot.healthy_mask().tolist()
+    n = snapshot.num_nodes
+
+    disc = [-1] * n
+    low = [0] * n
+    size = [0] * n
+    timer = 0
+    articulation_trees = []
+    bridges = []
+
+    for root in range(n):
+        if not healthy[root] or disc[root] != -1:
+            continue
+        disc[root] = low[root] = timer
+        timer += 1
+        size[root] = 1
+        # 栈元素: [节点, 进入该节点所用的边编号, 下一个待访问的邻接位置]
+        stack = [[root, -1, indptr[root]]]
+        separated = {}  # 节点 -> 被它分离出去的子树大小列表
+        bridge_parts = []  # (边编号, 子树大小)
+        root_children = []
+
+        while stack:
+            frame = stack[-1]
+            node, parent_edge, slot = frame
+            if slot < indptr[node + 1]:
+                frame[2] = slot + 1
+                neighbor = indices[slot]
+                if not healthy[neighbor] or edge_ids[slot] == parent_edge:
+                    continue
+                if disc[neighbor] == -1:
+                    disc[neighbor] = low[neighbor] = timer
+                    timer += 1
+                    size[neighbor] = 1
+                    stack.append([neighbor, edge_ids[slot], indptr[neighbor]])
+                elif disc[neighbor] < low[node]:
+                    low[node] = disc[neighbor]
+                continue
+
+            stack.pop()
+            if not stack:
+                break
+            parent = stack[-1][0]
+            size[parent] += size[node]
+            if low[node] < low[parent]:
+                low[parent] = low[node]
+            if parent == root:
+                root_children.append(size[node])
+            elif low[node] >= disc[parent]:
+                separated.setdefault(parent, []).append(size[node])
+            if low[node] > disc[parent]:
+                bridge_parts.append((parent_edge, size[node]))
+
+        area_size = size[root]
+        if len(root_children) > 1:
+            separated[root] = root_children
+        for node, parts in separated.items():
+            rest = area_size - 1 - sum(parts)
+            pieces = sorted(parts + ([rest] if node != root and rest > 0 else []), reverse=True)
+            articulation_trees.append({
+                'tree': snapshot.nodes[node],
+                'area_size': area_size,
+                'pieces': pieces,
+                'impact': area_size - 1 - pieces[0],
+            })
+        for edge, part in bridge_parts:
+            bridges.append({
+                'path': snapshot.paths[edge],
+                'area_size': area_size,
+                'pieces': tuple(sorted((part, area_size - part), reverse=True)),
+                'impact': min(part, area_size - part),
+            })
+
+    articulation_trees.sort(key=lambda x: (-x['impact'], x['tree'].tree_id))
+    bridges.sort(key=lambda x: -x['impact'])
+    return {'articulation_trees': articulation_trees, 'bridges': bridges}
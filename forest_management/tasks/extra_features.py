@@ -1,8 +1,11 @@
 from collections import defaultdict
 from forest_management.core.forest_graph import ForestGraph
-from forest_management.tasks.conservation_areas import find_conservation_areas
+from forest_management.tasks.conservation_index import get_conservation_index
+from forest_management.tasks.analytics_cache import memoize_analytics
+from forest_management.tasks.centrality import compute_centrality
 from forest_management.core.tree_node import HealthStatus, TreeNode
 
+@memoize_analytics
 def get_health_stats(forest: ForestGraph) -> dict:
     """获取森林健康状态统计
     
@@ -27,6 +30,7 @@ def get_health_stats(forest: ForestGraph) -> dict:
         'at_risk_percent': at_risk / total * 100 if total else 0,
     }
 
+@memoize_analytics
 def get_species_distribution(forest: ForestGraph) -> dict:
     """获取树种分布统计
     
@@ -41,8 +45,12 @@ def get_species_distribution(forest: ForestGraph) -> dict:
         species_count[tree.species] += 1
     return dict(sorted(species_count.items(), key=lambda x: x[1], reverse=True))
 
+@memoize_analytics
 def get_largest_conservation_area(forest: ForestGraph) -> dict:
     """获取最大健康保护区信息
+
+    保护区由注册在森林上的 ConservationAreaIndex 增量维护，
+    查询不会重新计算整片森林的连通分量。
     
     Args:
         forest: 森林图对象
@@ -50,11 +58,12 @@ def get_largest_conservation_area(forest: ForestGraph) -> dict:
     Returns:
         包含保护区大小、树木列表和树种分布的字典
     """
-    areas = find_conservation_areas(forest)
-    if not areas:
+    index = get_conservation_index(forest)
+    area_id = index.largest()
+    if area_id is None:
         return None
     
-    largest = max(areas, key=len)
+    largest = index.members(area_id)
     species_dist = defaultdict(int)
     for tree in largest:
         species_dist[tree.species] += 1
@@ -76,4 +85,21 @@ def get_average_age(forest: ForestGraph) -> float:
     """
     if not forest.adjacency:
         return 0.0
-    return sum(tree.age for tree in forest.adjacency) / len(forest.adjacency)
\ No newline at end of file
+    return sum(tree.age for tree in forest.adjacency) / len(forest.adjacency)
+
+def get_hub_trees(forest: ForestGraph, top: int = 10, samples: int = None, workers: int = None) -> list[dict]:
+    """获取介数中心性最高的枢纽树木，用于安排巡检优先级
+    
+    Args:
+        forest: 森林图对象
+        top: 返回的树木数量
+        samples: 抽样起点数量（None 表示小森林精确计算、大森林自动抽样）
+        workers: 并行进程数
+    
+    Returns:
+        按介数降序排列的字典列表，包含树木、介数和接近中心性
+    """
+    result = compute_centrality(forest, samples=samples, workers=workers)
+    ranked = sorted(result['betweenness'].items(), key=lambda x: (-x[1], x[0].tree_id))[:top]
+    return [{'tree': tree, 'betweenness': value, 'closeness': result['closeness'][tree]}
+            for tree, value in ranked]
\ No newline at end of file
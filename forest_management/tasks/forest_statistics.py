@@ -0,0 +1,108 @@
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.tree_node import HealthStatus
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.tasks.conservation_areas import label_conservation_areas, conservation_labels
+from forest_management.tasks.analytics_cache import memoize_analytics, forest_snapshot
+
+AGE_QUANTILES = (0.0, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+@memoize_analytics
+def compute_forest_statistics(
+    forest: ForestGraph,
+    snapshot: CSRSnapshot = None,
+    top_areas: int = 10
+) -> dict:
+    """一次性计算森林的全部统计信息
+
+    未传入快照时使用分析缓存中当前版本共享的快照和保护区标记，查找保护区等
+    分析已经构建过的不会重新构建。之后所有统计都是对列数组的 NumPy 运算：
+    健康状态计数、树种分布、树种 × 健康状态交叉表、年龄分位数、度数分布
+    以及最大几个保护区的摘要。
+
+    Args:
+        forest: 森林图对象
+        snapshot: 已构建好的CSR快照（可选）
+        top_areas: 输出摘要的保护区数量
+
+    Returns:
+        统计结果字典，'health' 与 get_health_stats 的结果格式相同，
+        'species' 与 get_species_distribution 的结果格式相同
+    """
+    if snapshot is None:
+        snapshot = forest_snapshot(forest)
+        labels = conservation_labels(forest)
+    else:
+        labels = label_conservation_areas(forest, snapshot=snapshot)
+    total = snapshot.num_nodes
+    statuses = list(HealthStatus)
+    num_species = len(snapshot.species_names)
+
+    # 树种 × 健康状态交叉表，一次 bincount 完成
+    cells = snapshot.species_codes.astype(np.int64) * len(statuses) + (snapshot.health.astype(np.int64) - 1)
+    crosstab = np.bincount(cells, minlength=num_species * len(statuses)).reshape(num_species, len(statuses))
+    health_counts = crosstab.sum(axis=0)
+    species_counts = crosstab.sum(axis=1)
+
+    counts = {status: int(health_counts[status.value - 1]) for status in statuses}
+    health = {
+        'total_trees': total,
+        'healthy': counts[HealthStatus.HEALTHY],
+        'infected': counts[HealthStatus.INFECTED],
+        'at_risk': counts[HealthStatus.AT_RISK],
+        'healthy_percent': counts[HealthStatus.HEALTHY] / total * 100 if total else 0,
+        'infected_percent': counts[HealthStatus.INFECTED] / total * 100 if total else 0,
+        'at_risk_percent': counts[HealthStatus.AT_RISK] / total * 100 if total else 0,
+    }
+    # 与 get_species_distribution 一致：按数量降序，数量相同时保持首次出现的顺序
+    species_order = np.argsort(-species_counts, kind='stable')
+    species = {snapshot.species_names[i]: int(species_counts[i]) for i in species_order.tolist()}
+    crosstab_dict = {
+        snapshot.species_names[i]: {status.name: int(crosstab[i, status.value - 1]) for status in statuses}
+        for i in species_order.tolist()
+    }
+
+    ages = snapshot.ages.astype(np.float64)
+    if total:
+        quantiles = np.quantile(ages, AGE_QUANTILES)
+        age_quantiles = {q: float(v) for q, v in zip(AGE_QUANTILES, quantiles)}
+        average_age = float(ages.mean())
+    else:
+        age_quantiles = {}
+        average_age = 0.0
+
+    degree_counts = np.bincount(snapshot.degrees())
+    degree_distribution = {degree: int(count) for degree, count in enumerate(degree_counts.tolist()) if count}
+
+    areas = []
+    top = labels.top(top_areas)
+    if top:
+        # 只统计摘要中的保护区：把它们的编号映射为名次，一次 bincount 得到年龄和与树种分布
+        rank = np.full(len(labels), -1, dtype=np.int64)
+        rank[[label for label, _ in top]] = np.arange(len(top))
+        member = np.flatnonzero(labels.labels >= 0)
+        member_rank = rank[labels.labels[member]]
+        member = member[member_rank >= 0]
+        member_rank = member_rank[member_rank >= 0]
+        area_age = np.bincount(member_rank, weights=ages[member], minlength=len(top))
+        area_species = np.bincount(member_rank * num_species + snapshot.species_codes[member],
+                                   minlength=len(top) * num_species).reshape(len(top), num_species)
+        for position, (label, size) in enumerate(top):
+            areas.append({
+                'label': label,
+                'size': size,
+                'average_age': float(area_age[position] / size),
+                'dominant_species': snapshot.species_names[int(area_species[position].argmax())],
+            })
+
+    return {
+        'health': health,
+        'species': species,
+        'average_age': average_age,
+        'species_health_crosstab': crosstab_dict,
+        'age_quantiles': age_quantiles,
+        'degree_distribution': degree_distribution,
+        'area_count': len(labels),
+        'areas': areas,
+    }
@@ -1,6 +1,7 @@
 import heapq
 from forest_management.core.forest_graph import ForestGraph
 from forest_management.core.tree_node import HealthStatus, TreeNode
+from forest_management.core.csr_snapshot import CSRSnapshot
 
 def simulate_infection_spread(
     forest: ForestGraph, 
@@ -30,7 +31,7 @@ def simulate_infection_spread(
     start_node = node_map[start_tree.tree_id]
     heap = [(0.0, id(start_node), start_node)]
     infection_time[start_node.tree_id] = 0.0
-    start_node.health_status = HealthStatus.INFECTED
+    forest.update_tree_health(start_node, HealthStatus.INFECTED)
 
     while heap:
         current_time, _, current_node = heapq.heappop(heap)
@@ -48,11 +49,70 @@ def simulate_infection_spread(
 
             if total_time < infection_time[neighbor.tree_id]:
                 infection_time[neighbor.tree_id] = total_time
-                neighbor.health_status = HealthStatus.INFECTED
+                forest.update_tree_health(neighbor, HealthStatus.INFECTED)
                 heapq.heappush(heap, (total_time, id(neighbor), neighbor))
 
     return sorted(
         [(node_map[node_id], round(time, 2)) 
          for node_id, time in infection_time.items() if time < float('inf')],
         key=lambda x: x[1]
-    )
\ No newline at end of file
+    )
+
+def spread_within_horizon(
+    snapshot: CSRSnapshot,
+    sources,
+    speed: float = 1.0,
+    horizon: float = float('inf'),
+    removed_nodes=(),
+    removed_edges=()
+) -> dict[int, float]:
+    """在CSR快照上进行多源、限时的病害传播搜索
+
+    与 simulate_infection_spread 的规则一致：病害不会进入已感染的树（起点除外），
+    传播时间为 距离 / 速度。搜索在超过 horizon 后立即停止，因此开销只与
+    horizon 内可达的部分有关，而不是整片森林。
+
+    Args:
+        snapshot: 森林的CSR快照
+        sources: 起始节点下标
+        speed: 传播速度
+        horizon: 时间上限，感染时间超过该值的树不计入
+        removed_nodes: 被砍伐的节点下标，病害无法进入
+        removed_edges: 被切断的边编号
+
+    Returns:
+        {节点下标: 感染时间}
+    """
+    if speed <= 0:
+        raise ValueError("传播速度必须大于0")
+    indptr, indices, weights, edge_ids, health = snapshot.as_lists()
+    infected = HealthStatus.INFECTED.value
+    removed_nodes = set(removed_nodes)
+    removed_edges = set(removed_edges)
+
+    times = {}
+    heap = []
+    for source in sources:
+        if source not in removed_nodes and source not in times:
+            times[source] = 0.0
+            heap.append((0.0, source))
+    heapq.heapify(heap)
+    done = set()
+
+    while heap:
+        current_time, node = heapq.heappop(heap)
+        if node in done:
+            continue
+        done.add(node)
+        for slot in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[slot]
+            if neighbor in done or health[neighbor] == infected or neighbor in removed_nodes:
+                continue
+            if removed_edges and edge_ids[slot] in removed_edges:
+                continue
+            total_time = current_time + weights[slot] / speed
+            if total_time <= horizon and total_time < times.get(neighbor, float('inf')):
+                times[neighbor] = total_time
+                heapq.heappush(heap, (total_time, neighbor))
+
+    return times
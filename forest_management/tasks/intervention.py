@@ -0,0 +1,108 @@
+import heapq
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.tasks.infection_spread import spread_within_horizon
+
+
+def optimize_interventions(
+    forest: ForestGraph,
+    budget: int,
+    horizon: float,
+    speed: float = 1.0,
+    mode: str = 'trees',
+    candidates=None
+) -> dict:
+    """选择 budget 棵要砍伐的树（或要切断的路径），使 horizon 内的感染数量最少
+
+    以当前所有感染树为起点，使用与 spread_within_horizon 相同的确定性传播模型，
+    因此"期望感染数量"即该模型下 horizon 内被感染的树的数量。选择过程采用
+    CELF 惰性贪心：候选项按上一次计算的收益放在堆中，只有堆顶的过期候选项才会
+    被重新模拟，其余候选项的收益作为上界不再重新计算。
+
+    当剩余候选项中最大的单步收益不大于0时提前停止，即使预算尚未用完。该目标函数在一般的
+    图上不是严格次模的：单独砍伐一棵树或切断一条路径可能没有收益，而两处同时干预却能
+    切断传播路线，贪心选择无法发现这种组合。提前停止时结果中的 stopped_early 为 True。
+
+    Args:
+        forest: 森林图对象
+        budget: 最多选择的树或路径数量
+        horizon: 时间上限
+        speed: 传播速度
+        mode: 'trees' 表示砍伐树木，'paths' 表示切断路径
+        candidates: 候选的 TreeNode 或 TreePath 列表（默认为当前传播范围内的全部候选）
+
+    Returns:
+        包含所选对象、每一步收益、干预前后感染数量、模拟次数以及是否在预算用完前
+        提前停止（stopped_early）的字典
+    """
+    if mode not in ('trees', 'paths'):
+        raise ValueError("mode 必须是 'trees' 或 'paths'")
+    if budget < 0:
+        raise ValueError("预算不能为负数")
+
+    snapshot = CSRSnapshot.from_forest(forest)
+    sources = [i for i, infected in enumerate(snapshot.infected_mask().tolist()) if infected]
+    evaluations = 0
+
+    def infected_count(selected):
+        nonlocal evaluations
+        evaluations += 1
+        if mode == 'trees':
+            reached = spread_within_horizon(snapshot, sources, speed, horizon, removed_nodes=selected)
+        else:
+            reached = spread_within_horizon(snapshot, sources, speed, horizon, removed_edges=selected)
+        return len(reached)
+
+    baseline_reach = spread_within_horizon(snapshot, sources, speed, horizon)
+    baseline = len(baseline_reach)
+    evaluations += 1
+
+    if candidates is None:
+        # 传播范围之外的树或路径对结果没有影响
+        if mode == 'trees':
+            source_set = set(sources)
+            candidate_ids = sorted(i for i in baseline_reach if i not in source_set)
+        else:
+            candidate_ids = [e for e, (u, v) in enumerate(zip(snapshot.edge_u.tolist(), snapshot.edge_v.tolist()))
+                             if u in baseline_reach or v in baseline_reach]
+    elif mode == 'trees':
+        candidate_ids = [snapshot.index_of(tree.tree_id) for tree in candidates]
+    else:
+        # 按 TreePath 的相等性（两端的树和距离）匹配，由ID重新构建的路径也能找到
+        edge_index = {}
+        for e, path in enumerate(snapshot.paths):
+            edge_index.setdefault(path, e)
+        if any(path not in edge_index for path in candidates):
+            raise ValueError("路径不存在")
+        candidate_ids = [edge_index[path] for path in candidates]
+
+    selected, gains = [], []
+    stopped_early = False
+    current = baseline
+    heap = [(-(baseline - infected_count([c])), order, c, 0)
+            for order, c in enumerate(candidate_ids)]
+    heapq.heapify(heap)
+
+    while heap and len(selected) < budget:
+        neg_gain, order, candidate, evaluated_at = heapq.heappop(heap)
+        if evaluated_at == len(selected):
+            # 收益是在当前选择集合下计算的，惰性贪心保证它是最优的
+            if -neg_gain <= 0:
+                stopped_early = True
+                break
+            selected.append(candidate)
+            gains.append(-neg_gain)
+            current += neg_gain
+            continue
+        gain = current - infected_count(selected + [candidate])
+        heapq.heappush(heap, (-gain, order, candidate, len(selected)))
+
+    objects = snapshot.nodes if mode == 'trees' else snapshot.paths
+    return {
+        'selected': [objects[i] for i in selected],
+        'gains': gains,
+        'infected_before': baseline,
+        'infected_after': current,
+        'evaluations': evaluations,
+        'stopped_early': stopped_early,
+    }
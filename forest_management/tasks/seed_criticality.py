@@ -0,0 +1,85 @@
+import os
+import random
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.core.tree_node import TreeNode
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.tasks.infection_spread import spread_within_horizon
+from forest_management.utils.parallel import map_over_snapshot, split_chunks
+
+
+def _reach_counts(snapshot: CSRSnapshot, task) -> list[int]:
+    """对每个起点做一次限时搜索，返回可达树的数量"""
+    sources, speed, horizon = task
+    return [len(spread_within_horizon(snapshot, [s], speed, horizon)) for s in sources]
+
+
+def _reach_hits(snapshot: CSRSnapshot, task) -> dict[int, int]:
+    """对每个采样目标做一次限时搜索，统计每棵树被命中的次数"""
+    targets, speed, horizon = task
+    hits = {}
+    for target in targets:
+        for node in spread_within_horizon(snapshot, [target], speed, horizon):
+            hits[node] = hits.get(node, 0) + 1
+    return hits
+
+
+def rank_seed_criticality(
+    forest: ForestGraph,
+    horizon: float,
+    speed: float = 1.0,
+    sample_size: int = None,
+    workers: int = None,
+    seed: int = None
+) -> list[tuple[TreeNode, float]]:
+    """计算每棵未感染的树作为感染源时，horizon 小时内会感染多少棵树
+
+    每个起点的计数与 simulate_infection_spread 的传播规则一致（包含起点本身，
+    不进入已感染的树），但只搜索 horizon 之内的部分，并在进程池中并行执行。
+
+    指定 sample_size 时给出近似结果：由于路径是无向的，树 u 在 horizon 内能
+    到达 v 当且仅当 v 也能到达 u，因此只需从随机抽取的 sample_size 棵目标树
+    出发搜索，按命中次数 × 总数 / 样本数 估计每棵树的计数。
+
+    Args:
+        forest: 森林图对象
+        horizon: 时间上限（小时）
+        speed: 传播速度
+        sample_size: 采样的目标数量（None 表示精确计算）
+        workers: 进程数（默认使用CPU核数，1 表示不使用进程池）
+        seed: 采样使用的随机种子
+
+    Returns:
+        按危险程度降序排列的 (树, 感染数量) 列表
+    """
+    if horizon < 0:
+        raise ValueError("时间上限不能为负数")
+    if speed <= 0:
+        raise ValueError("传播速度必须大于0")
+
+    snapshot = CSRSnapshot.from_forest(forest)
+    candidates = [i for i, infected in enumerate(snapshot.infected_mask().tolist()) if not infected]
+    if not candidates:
+        return []
+    workers = workers or os.cpu_count() or 1
+    num_chunks = workers * 4
+
+    if sample_size is None or sample_size >= len(candidates):
+        chunks = split_chunks(candidates, num_chunks)
+        results = map_over_snapshot(_reach_counts, snapshot,
+                                    [(chunk, speed, horizon) for chunk in chunks], workers)
+        scores = dict(zip(candidates, (count for counts in results for count in counts)))
+    else:
+        if sample_size <= 0:
+            raise ValueError("采样数量必须大于0")
+        targets = random.Random(seed).sample(candidates, sample_size)
+        chunks = split_chunks(targets, num_chunks)
+        results = map_over_snapshot(_reach_hits, snapshot,
+                                    [(chunk, speed, horizon) for chunk in chunks], workers)
+        scale = len(candidates) / sample_size
+        scores = dict.fromkeys(candidates, 0.0)
+        for hits in results:
+            for node, count in hits.items():
+                scores[node] += count * scale
+
+    ranking = sorted(scores.items(), key=lambda x: (-x[1], snapshot.nodes[x[0]].tree_id))
+    return [(snapshot.nodes[i], score) for i, score in ranking]
@@ -0,0 +1,113 @@
+import gc
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.analytics_cache import AnalyticsCache, memoize_analytics, analytics_cache
+from forest_management.tasks.extra_features import get_health_stats
+
+class TestAnalyticsCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = AnalyticsCache(maxsize=2)
+        self.calls = 0
+
+        @memoize_analytics(cache=self.cache)
+        def count_trees(forest, status=None):
+            self.calls += 1
+            return sum(1 for t in forest.adjacency if status is None or t.health_status == status)
+
+        self.count_trees = count_trees
+        self.forest = ForestGraph()
+        self.tree1 = TreeNode(1, "Oak", 10, HealthStatus.HEALTHY)
+        self.forest.add_tree(self.tree1)
+
+    def test_hit_until_forest_changes(self):
+        self.assertEqual(self.count_trees(self.forest), 1)
+        self.assertEqual(self.count_trees(self.forest), 1)
+        self.assertEqual(self.calls, 1)
+        self.forest.add_tree(TreeNode(2, "Pine", 10, HealthStatus.HEALTHY))
+        self.assertEqual(self.count_trees(self.forest), 2)
+        self.assertEqual(self.calls, 2)
+        self.forest.update_tree_health(self.tree1, HealthStatus.INFECTED)
+        self.assertEqual(self.count_trees(self.forest, status=HealthStatus.HEALTHY), 1)
+        info = self.cache.info()
+        self.assertEqual((info['hits'], info['misses']), (1, 3))
+
+    def test_arguments_are_part_of_key(self):
+        self.count_trees(self.forest, status=HealthStatus.HEALTHY)
+        self.count_trees(self.forest, status=HealthStatus.INFECTED)
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction(self):
+        other = ForestGraph()
+        third = ForestGraph()
+        self.count_trees(self.forest)
+        self.count_trees(other)
+        self.count_trees(self.forest)
+        self.count_trees(third)
+        self.assertEqual(self.cache.info()['evictions'], 1)
+        self.count_trees(self.forest)
+        self.assertEqual(self.calls, 3)
+        self.count_trees(other)
+        self.assertEqual(self.calls, 4)
+
+    def test_older_versions_are_dropped(self):
+        self.count_trees(self.forest)
+        self.count_trees(self.forest, status=HealthStatus.HEALTHY)
+        self.cache.maxsize = 10
+        for i in range(2, 6):
+            self.forest.add_tree(TreeNode(i, "Pine", 10, HealthStatus.HEALTHY))
+            self.count_trees(self.forest)
+        self.assertEqual(self.cache.info()['size'], 1)
+        self.assertEqual(self.cache.info()['evictions'], 0)
+
+    def test_bounded_by_result_size(self):
+        cache = AnalyticsCache(max_items=25)
+
+        @memoize_analytics(cache=cache)
+        def ids(forest, count):
+            return list(range(count))
+
+        ids(self.forest, 10)
+        ids(self.forest, 10)
+        self.assertEqual(cache.info()['hits'], 1)
+        ids(self.forest, 15)
+        info = cache.info()
+        self.assertEqual((info['size'], info['evictions']), (1, 1))
+        self.assertLessEqual(info['items'], 25)
+        ids(self.forest, 100)  # 单个结果超过上限，不缓存
+        self.assertEqual(cache.info()['size'], 1)
+
+    def test_unhashable_arguments_bypass_cache(self):
+        @memoize_analytics(cache=self.cache)
+        def first(forest, ids):
+            self.calls += 1
+            return ids[0]
+        self.assertEqual(first(self.forest, [5]), 5)
+        self.assertEqual(first(self.forest, [5]), 5)
+        self.assertEqual(self.calls, 2)
+
+    def test_dead_forest_is_not_reused(self):
+        forest = ForestGraph()
+        self.count_trees(forest)
+        del forest
+        gc.collect()
+        self.count_trees(ForestGraph())
+        self.assertEqual(self.calls, 2)
+
+    def test_task_functions_are_memoized(self):
+        analytics_cache.clear()
+        first = get_health_stats(self.forest)
+        self.assertEqual(get_health_stats(self.forest), first)
+        self.assertEqual(analytics_cache.info()['hits'], 1)
+
+    def test_callers_get_copies(self):
+        @memoize_analytics(cache=self.cache)
+        def groups(forest):
+            return {'all': [list(forest.adjacency)]}
+        first = groups(self.forest)
+        first['all'][0].clear()
+        first['extra'] = []
+        self.assertEqual(groups(self.forest), {'all': [[self.tree1]]})
+        self.assertIs(groups(self.forest)['all'][0][0], self.tree1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.buffer_zones import compute_infection_distances, find_unsafe_trees, mark_at_risk
+from forest_management.tasks.conservation_areas import find_conservation_areas
+
+class TestBufferZones(unittest.TestCase):
+    def setUp(self):
+        # 感染树 1 和 6 位于链 1-2-3-4-5-6 的两端，每段距离 10
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(i, "Oak", 20, HealthStatus.HEALTHY) for i in range(1, 8)]
+        self.trees[0].health_status = HealthStatus.INFECTED
+        self.trees[5].health_status = HealthStatus.INFECTED
+        for tree in self.trees:
+            self.forest.add_tree(tree)
+        for a, b in zip(self.trees[:6], self.trees[1:6]):
+            self.forest.add_path(TreePath(a, b, 10.0))
+
+    def test_nearest_infection(self):
+        nearest, distance = compute_infection_distances(self.forest)
+        self.assertEqual(distance.tolist()[:6], [0.0, 10.0, 20.0, 20.0, 10.0, 0.0])
+        self.assertEqual(nearest.tolist()[:6], [0, 0, 0, 5, 5, 5])
+        self.assertEqual(nearest[6], -1)
+        self.assertEqual(distance[6], float('inf'))
+
+    def test_max_distance_bounds_search(self):
+        nearest, distance = compute_infection_distances(self.forest, max_distance=15)
+        self.assertEqual(nearest.tolist(), [0, 0, -1, -1, 5, 5, -1])
+
+    def test_unsafe_trees(self):
+        unsafe = find_unsafe_trees(self.forest, 10)
+        self.assertEqual([(t.tree_id, s.tree_id, d) for t, s, d in unsafe], [(2, 1, 10.0), (5, 6, 10.0)])
+
+    def test_conservation_areas_with_buffer(self):
+        self.assertEqual(sorted(len(a) for a in find_conservation_areas(self.forest)), [1, 4])
+        areas = find_conservation_areas(self.forest, buffer_distance=10)
+        self.assertEqual(sorted(len(a) for a in areas), [1, 2])
+        areas = find_conservation_areas(self.forest, buffer_distance=20)
+        self.assertEqual([[t.tree_id for t in a] for a in areas], [[7]])
+
+    def test_mark_at_risk(self):
+        changed = mark_at_risk(self.forest, 10)
+        self.assertEqual({t.tree_id for t in changed}, {2, 5})
+        self.assertEqual(self.trees[1].health_status, HealthStatus.AT_RISK)
+        self.assertEqual(self.trees[2].health_status, HealthStatus.HEALTHY)
+
+if __name__ == '__main__':
+    unittest.main()
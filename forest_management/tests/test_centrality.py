@@ -0,0 +1,55 @@
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.centrality import compute_centrality
+from forest_management.tasks.extra_features import get_hub_trees
+
+class TestCentrality(unittest.TestCase):
+    def setUp(self):
+        # 星形：中心树 0 连接 1..4，另有 4-5 的尾巴
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(i, "Oak", 10, HealthStatus.HEALTHY) for i in range(6)]
+        for tree in self.trees:
+            self.forest.add_tree(tree)
+        for i in range(1, 5):
+            self.forest.add_path(TreePath(self.trees[0], self.trees[i], 1.0))
+        self.forest.add_path(TreePath(self.trees[4], self.trees[5], 2.0))
+
+    def test_exact_betweenness(self):
+        result = compute_centrality(self.forest, workers=1)
+        self.assertTrue(result['exact'])
+        b = {t.tree_id: v for t, v in result['betweenness'].items()}
+        # 其余 5 棵树构成 C(5,2) = 10 个无序对，除 (4, 5) 外都经过中心树
+        self.assertAlmostEqual(b[0], 0.9)
+        self.assertAlmostEqual(b[4], 0.4)
+        self.assertEqual(b[1], 0.0)
+        self.assertEqual(result['error_bound'], {'betweenness': 0.0, 'closeness': 0.0})
+
+    def test_exact_closeness(self):
+        result = compute_centrality(self.forest, workers=1)
+        c = {t.tree_id: v for t, v in result['closeness'].items()}
+        self.assertAlmostEqual(c[0], (4 + 1 / 3) / 5)
+        self.assertAlmostEqual(c[5], (1 / 2 + 1 / 3 + 3 * 1 / 4) / 5)
+
+    def test_sampled_within_bounds(self):
+        exact = compute_centrality(self.forest, workers=1)
+        sampled = compute_centrality(self.forest, samples=3, workers=2, seed=4)
+        self.assertFalse(sampled['exact'])
+        self.assertEqual(sampled['samples'], 3)
+        self.assertGreater(sampled['error_bound']['betweenness'], 0)
+        for tree in self.trees:
+            self.assertGreaterEqual(sampled['betweenness'][tree], 0.0)
+        self.assertEqual(set(sampled['closeness']), set(exact['closeness']))
+
+    def test_small_forests(self):
+        self.assertEqual(compute_centrality(ForestGraph())['betweenness'], {})
+        with self.assertRaises(ValueError):
+            compute_centrality(self.forest, samples=0)
+        with self.assertRaises(ValueError):
+            compute_centrality(self.forest, confidence=1.5)
+
+    def test_hub_trees(self):
+        hubs = get_hub_trees(self.forest, top=2, workers=1)
+        self.assertEqual([h['tree'].tree_id for h in hubs], [0, 4])
+
+if __name__ == '__main__':
+    unittest.main()
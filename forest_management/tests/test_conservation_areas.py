@@ -1,6 +1,8 @@
 import unittest
+from unittest import mock
 from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
-from forest_management.tasks.conservation_areas import find_conservation_areas
+from forest_management.tasks.conservation_areas import (ConservationLabels, find_conservation_areas,
+                                                        label_conservation_areas, top_conservation_areas)
 
 class TestConservationAreas(unittest.TestCase):
     def setUp(self):
@@ -26,5 +28,77 @@ class TestConservationAreas(unittest.TestCase):
         self.assertIn(self.tree4, areas[0])
         self.assertNotIn(self.tree3, areas[0])
 
+    def test_min_size(self):
+        tree5 = TreeNode(5, "Birch", 10, HealthStatus.HEALTHY)
+        self.forest.add_tree(tree5)
+        self.assertEqual(len(find_conservation_areas(self.forest)), 2)
+        areas = find_conservation_areas(self.forest, min_size=2)
+        self.assertEqual(len(areas), 1)
+        self.assertNotIn(tree5, areas[0])
+
+    def test_labels(self):
+        result = label_conservation_areas(self.forest)
+        self.assertEqual(result.labels.tolist(), [0, 0, -1, 0])
+        self.assertEqual(result.sizes.tolist(), [3])
+        self.assertEqual(result.members(0), [self.tree1, self.tree2, self.tree4])
+        with self.assertRaises(IndexError):
+            result.members(1)
+
+    def test_top_areas(self):
+        forest = ForestGraph()
+        trees = [TreeNode(i, "Oak", 10, HealthStatus.HEALTHY) for i in range(10)]
+        for tree in trees:
+            forest.add_tree(tree)
+        # 保护区大小依次为 1, 2, 3, 4
+        for a, b in [(1, 2), (3, 4), (4, 5), (6, 7), (7, 8), (8, 9)]:
+            forest.add_path(TreePath(trees[a], trees[b], 1.0))
+        result = label_conservation_areas(forest)
+        self.assertEqual(result.top(2), [(3, 4), (2, 3)])
+        self.assertEqual(result.top(), [(3, 4), (2, 3), (1, 2), (0, 1)])
+        self.assertEqual(result.top(0), [])
+
+        top = top_conservation_areas(forest, k=1)
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0]['size'], 4)
+        self.assertEqual(top[0]['trees'], trees[6:])
+
+        above = top_conservation_areas(forest, k=None, min_size=3)
+        self.assertEqual([area['size'] for area in above], [4, 3])
+
+    def test_all_areas_use_member_index(self):
+        # 大量孤立的健康树：取出全部保护区时建立一次成员索引，而不是每个保护区扫描一遍
+        forest = ForestGraph()
+        trees = [TreeNode(i, "Oak", 10, HealthStatus.HEALTHY) for i in range(50)]
+        forest.bulk_insert(trees, [])
+        with mock.patch.object(ConservationLabels, 'index_members', autospec=True,
+                               side_effect=ConservationLabels.index_members) as index:
+            areas = top_conservation_areas(forest, k=None)
+            index.assert_called_once()
+        self.assertEqual([area['trees'] for area in areas], [[tree] for tree in trees])
+        with mock.patch.object(ConservationLabels, 'index_members') as index:
+            self.assertEqual(top_conservation_areas(forest, k=1)[0]['trees'], [trees[0]])
+            index.assert_not_called()
+
+    def test_top_ties_are_stable(self):
+        tree5 = TreeNode(5, "Birch", 10, HealthStatus.HEALTHY)
+        tree6 = TreeNode(6, "Birch", 10, HealthStatus.HEALTHY)
+        self.forest.add_tree(tree5)
+        self.forest.add_tree(tree6)
+        result = label_conservation_areas(self.forest)
+        self.assertEqual(result.top(2), [(0, 3), (1, 1)])
+
+    def test_long_chain_does_not_recurse(self):
+        forest = ForestGraph()
+        trees = [TreeNode(i, "Willow", 5, HealthStatus.HEALTHY) for i in range(5000)]
+        for tree in trees:
+            forest.add_tree(tree)
+        for a, b in zip(trees, trees[1:]):
+            forest.add_path(TreePath(a, b, 1.0))
+        forest.update_tree_health(trees[2500], HealthStatus.INFECTED)
+        result = label_conservation_areas(forest)
+        self.assertEqual(result.sizes.tolist(), [2500, 2499])
+        self.assertEqual(result.labels[2500], -1)
+        self.assertEqual(result.members(1)[0], trees[2501])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.conservation_areas import find_conservation_areas
+from forest_management.tasks.conservation_index import ConservationAreaIndex, get_conservation_index
+from forest_management.tasks.extra_features import get_largest_conservation_area
+
+class TestConservationAreaIndex(unittest.TestCase):
+    def setUp(self):
+        # 1 - 2 - 3 - 4 - 5 的链
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(i, "Oak", 20, HealthStatus.HEALTHY) for i in range(1, 6)]
+        for tree in self.trees:
+            self.forest.add_tree(tree)
+        self.paths = [TreePath(a, b, 1.0) for a, b in zip(self.trees, self.trees[1:])]
+        for path in self.paths:
+            self.forest.add_path(path)
+        self.index = ConservationAreaIndex(self.forest)
+
+    def area_sizes(self):
+        return sorted(self.index.sizes().values())
+
+    def test_initial_state(self):
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.members(self.index.largest()), self.trees)
+
+    def test_infection_splits_area(self):
+        self.forest.update_tree_health(self.trees[1], HealthStatus.INFECTED)
+        self.assertEqual(self.area_sizes(), [1, 3])
+        self.assertIsNone(self.index.area_of(self.trees[1]))
+        self.assertEqual(self.index.size_of(self.index.largest()), 3)
+
+    def test_top(self):
+        self.forest.update_tree_health(self.trees[1], HealthStatus.INFECTED)
+        top = self.index.top(2)
+        self.assertEqual([size for _, size in top], [3, 1])
+        self.assertEqual(self.index.top(5, min_size=2), top[:1])
+
+    def test_recovery_merges_areas(self):
+        self.forest.update_tree_health(self.trees[2], HealthStatus.AT_RISK)
+        self.assertEqual(self.area_sizes(), [2, 2])
+        self.forest.update_tree_health(self.trees[2], HealthStatus.HEALTHY)
+        self.assertEqual(self.area_sizes(), [5])
+
+    def test_path_changes(self):
+        self.forest.remove_path(self.paths[0])
+        self.assertEqual(self.area_sizes(), [1, 4])
+        self.forest.add_path(self.paths[0])
+        self.forest.add_path(TreePath(self.trees[0], self.trees[4], 2.0))
+        self.assertEqual(self.area_sizes(), [5])
+        # 存在环时删除路径不会分裂
+        self.forest.remove_path(self.paths[2])
+        self.assertEqual(self.area_sizes(), [5])
+        self.forest.remove_path(self.paths[0])
+        self.assertEqual(self.area_sizes(), [2, 3])
+
+    def test_tree_added_and_removed(self):
+        tree6 = TreeNode(6, "Pine", 5, HealthStatus.HEALTHY)
+        self.forest.add_tree(tree6)
+        self.assertEqual(self.area_sizes(), [1, 5])
+        self.forest.remove_tree(self.trees[2])
+        self.assertEqual(self.area_sizes(), [1, 2, 2])
+
+    def test_reset_rebuilds(self):
+        self.forest.reset()
+        self.assertEqual(len(self.index), 0)
+        self.assertIsNone(self.index.largest())
+
+    def test_matches_full_recomputation(self):
+        rng = random.Random(7)
+        forest = ForestGraph()
+        trees = [TreeNode(i, "Oak", 1, HealthStatus.HEALTHY) for i in range(60)]
+        for tree in trees:
+            forest.add_tree(tree)
+        for _ in range(90):
+            a, b = rng.sample(trees, 2)
+            try:
+                forest.add_path(TreePath(a, b, 1.0))
+            except ValueError:
+                pass
+        index = get_conservation_index(forest)
+        statuses = list(HealthStatus)
+        for _ in range(300):
+            op = rng.random()
+            if op < 0.6:
+                forest.update_tree_health(rng.choice(trees), rng.choice(statuses))
+            else:
+                tree = rng.choice(trees)
+                if op < 0.8 and forest.adjacency[tree]:
+                    forest.remove_path(rng.choice(forest.adjacency[tree]))
+                else:
+                    other = rng.choice(trees)
+                    if other != tree and all(other not in (p.tree1, p.tree2) for p in forest.adjacency[tree]):
+                        forest.add_path(TreePath(tree, other, 1.0))
+            expected = sorted(len(area) for area in find_conservation_areas(forest))
+            self.assertEqual(sorted(index.sizes().values()), expected)
+            if expected:
+                self.assertEqual(index.size_of(index.largest()), expected[-1])
+
+    def test_get_largest_conservation_area_uses_index(self):
+        self.assertIs(get_conservation_index(self.forest), self.index)
+        self.forest.update_tree_health(self.trees[3], HealthStatus.INFECTED)
+        result = get_largest_conservation_area(self.forest)
+        self.assertEqual(result['size'], 3)
+        self.assertEqual(result['trees'], self.trees[:3])
+        self.assertEqual(result['species_dist'], {"Oak": 3})
+
+    def test_listeners_not_copied(self):
+        import copy
+        clone = copy.deepcopy(self.forest)
+        self.assertEqual(clone.listeners, [])
+
+if __name__ == '__main__':
+    unittest.main()
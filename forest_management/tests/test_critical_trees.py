@@ -0,0 +1,83 @@
+import random
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.conservation_areas import find_conservation_areas
+from forest_management.tasks.critical_trees import find_critical_trees
+
+class TestCriticalTrees(unittest.TestCase):
+    def setUp(self):
+        # 三角形 1-2-3，通过 3-4 连接到链 4-5，另有感染树 6 连接 5
+        self.forest = ForestGraph()
+        self.trees = {i: TreeNode(i, "Oak", 20, HealthStatus.HEALTHY) for i in range(1, 7)}
+        self.trees[6].health_status = HealthStatus.INFECTED
+        for tree in self.trees.values():
+            self.forest.add_tree(tree)
+        t = self.trees
+        for a, b in [(1, 2), (2, 3), (1, 3), (4, 5), (5, 6)]:
+            self.forest.add_path(TreePath(t[a], t[b], 1.0))
+        self.bridge = TreePath(t[3], t[4], 2.0)
+        self.forest.add_path(self.bridge)
+
+    def test_articulation_trees(self):
+        result = find_critical_trees(self.forest)
+        found = {item['tree'].tree_id: item['pieces'] for item in result['articulation_trees']}
+        self.assertEqual(found, {3: [2, 2], 4: [3, 1]})
+        self.assertEqual(result['articulation_trees'][0]['tree'], self.trees[3])
+
+    def test_bridges(self):
+        result = find_critical_trees(self.forest)
+        bridges = {(b['path'].tree1.tree_id, b['path'].tree2.tree_id): b['pieces'] for b in result['bridges']}
+        self.assertEqual(bridges, {(3, 4): (3, 2), (4, 5): (4, 1)})
+        self.assertIs(result['bridges'][0]['path'], self.bridge)
+        self.assertEqual(result['bridges'][0]['impact'], 2)
+
+    def test_no_healthy_trees(self):
+        result = find_critical_trees(ForestGraph())
+        self.assertEqual(result, {'articulation_trees': [], 'bridges': []})
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        forest = ForestGraph()
+        trees = [TreeNode(i, "Pine", 1, rng.choice([HealthStatus.HEALTHY] * 4 + [HealthStatus.INFECTED]))
+                 for i in range(40)]
+        for tree in trees:
+            forest.add_tree(tree)
+        for _ in range(55):
+            a, b = rng.sample(trees, 2)
+            forest.add_path(TreePath(a, b, rng.choice([1.0, 2.0, 3.0])))
+        result = find_critical_trees(forest)
+
+        expected = {}
+        for tree in trees:
+            if tree.health_status != HealthStatus.HEALTHY:
+                continue
+            before = len(find_conservation_areas(forest))
+            forest.update_tree_health(tree, HealthStatus.INFECTED)
+            after = sorted((len(a) for a in find_conservation_areas(forest)), reverse=True)
+            forest.update_tree_health(tree, HealthStatus.HEALTHY)
+            if len(after) > before:
+                expected[tree.tree_id] = after
+        found = {item['tree'].tree_id for item in result['articulation_trees']}
+        self.assertEqual(found, set(expected))
+        for item in result['articulation_trees']:
+            for size in item['pieces']:
+                self.assertIn(size, expected[item['tree'].tree_id])
+
+        bridge_count = 0
+        seen = set()
+        for tree in trees:
+            for path in list(forest.adjacency[tree]):
+                if id(path) in seen:
+                    continue
+                seen.add(id(path))
+                if HealthStatus.INFECTED in (path.tree1.health_status, path.tree2.health_status):
+                    continue
+                before = len(find_conservation_areas(forest))
+                forest.remove_path(path)
+                if len(find_conservation_areas(forest)) > before:
+                    bridge_count += 1
+                forest.add_path(path)
+        self.assertEqual(len(result['bridges']), bridge_count)
+
+if __name__ == '__main__':
+    unittest.main()
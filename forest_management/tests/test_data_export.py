@@ -0,0 +1,112 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.utils.data_loader import load_forest_data
+from forest_management.utils.data_export import export_forest_data, iter_csv_bytes, iter_forest_trees, write_forest_csv
+
+def forest_summary(forest):
+    return {tree.tree_id: (tree.species, tree.age, tree.health_status,
+                           sorted((min(p.tree1.tree_id, p.tree2.tree_id), max(p.tree1.tree_id, p.tree2.tree_id),
+                                   p.distance) for p in paths))
+            for tree, paths in forest.adjacency.items()}
+
+class TestDataExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        n, m = 300, 900
+        self.tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        self.path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        pd.DataFrame({
+            'tree_id': np.arange(n),
+            'species': rng.choice(['Oak', 'Pine, Scots', '"Red" Maple'], n),
+            'age': rng.integers(1, 300, n),
+            'health_status': rng.choice(['HEALTHY', 'INFECTED', 'AT_RISK'], n),
+        }).to_csv(self.tree_file, index=False)
+        u = rng.integers(0, n, m)
+        pd.DataFrame({'tree_1': u, 'tree_2': (u + rng.integers(1, n, m)) % n,
+                      'distance': rng.uniform(0.1, 50, m)}).drop_duplicates().to_csv(self.path_file, index=False)
+        self.forest = load_forest_data(self.tree_file, self.path_file)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        for suffix in ('.csv', '.csv.gz'):
+            with self.subTest(suffix=suffix):
+                tree_out = os.path.join(self.tmpdir.name, 'out_trees' + suffix)
+                path_out = os.path.join(self.tmpdir.name, 'out_paths' + suffix)
+                counts = export_forest_data(self.forest, tree_out, path_out)
+                self.assertEqual(counts['trees'], len(self.forest.adjacency))
+                restored = load_forest_data(tree_out, path_out)
+                self.assertEqual(forest_summary(restored), forest_summary(self.forest))
+
+    def test_gzip_detected_from_name(self):
+        out = os.path.join(self.tmpdir.name, 'trees.csv.gz')
+        write_forest_csv(self.forest, 'trees', out)
+        with gzip.open(out, 'rt') as handle:
+            self.assertEqual(handle.readline().strip(), 'tree_id,species,age,health_status')
+        with self.assertRaises(ValueError):
+            write_forest_csv(self.forest, 'species', out)
+
+    def test_streamed_bytes(self):
+        plain = b''.join(iter_csv_bytes(self.forest, 'paths', batch_rows=7))
+        chunks = list(iter_csv_bytes(self.forest, 'paths', compress=True, batch_rows=7))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(gzip.decompress(b''.join(chunks)), plain)
+        paths = pd.read_csv(io.BytesIO(plain))
+        self.assertEqual(len(paths), sum(len(edges) for edges in self.forest.adjacency.values()) // 2)
+
+    def test_empty_forest(self):
+        self.assertEqual(b''.join(iter_csv_bytes(ForestGraph(), 'trees')),
+                         b'tree_id,species,age,health_status\r\n')
+
+    def test_tree_removed_during_export(self):
+        trees = list(self.forest.adjacency)[:3]
+        removed = trees[1]
+        stream = iter_csv_bytes(self.forest, 'paths', trees=trees, batch_rows=1)
+        header = next(stream)  # 生成器已开始执行，树的列表已固定
+        self.forest.remove_tree(removed)
+        paths = pd.read_csv(io.BytesIO(header + b''.join(stream)))
+        self.assertNotIn(removed, self.forest.adjacency)
+        self.assertEqual(len(self.forest.adjacency), 299)
+        self.assertNotIn(removed.tree_id, set(paths['tree_1']) | set(paths['tree_2']))
+        rows = pd.read_csv(io.BytesIO(b''.join(iter_csv_bytes(self.forest, 'trees', trees=trees))))
+        self.assertEqual(rows['tree_id'].tolist(), [trees[0].tree_id, trees[2].tree_id])
+
+    def test_chunked_trees_survive_changes(self):
+        trees = list(self.forest.adjacency)
+        stream = iter_forest_trees(self.forest, chunk_size=50)
+        seen = [next(stream) for _ in range(120)]
+        self.forest.remove_tree(trees[10])  # 已产出的树
+        self.forest.remove_tree(trees[160])  # 尚未复制的块中的树
+        added = TreeNode(1000, 'Oak', 1)
+        self.forest.add_tree(added)
+        seen += list(stream)
+        expected = trees[:120] + [tree for tree in trees[120:] if tree is not trees[160]] + [added]
+        self.assertEqual(seen, expected)
+        # 上一块的最后一棵树被删除时按数量继续
+        stream = iter_forest_trees(self.forest, chunk_size=50)
+        seen = [next(stream) for _ in range(50)]
+        self.forest.remove_tree(seen[-1])
+        seen += list(stream)
+        self.assertEqual(len(seen), len(self.forest.adjacency) + 1)
+        self.assertEqual(len(set(seen)), len(seen))
+
+class TestForestRepr(unittest.TestCase):
+    def test_repr_lists_each_path_once(self):
+        forest = ForestGraph()
+        a, b, c = TreeNode(1, 'Oak', 1), TreeNode(2, 'Oak', 1), TreeNode(3, 'Oak', 1, HealthStatus.INFECTED)
+        forest.bulk_insert([a, b, c], [TreePath(a, b, 1.0), TreePath(b, c, 2.0)])
+        text = repr(forest)
+        self.assertTrue(text.endswith("Edges:\nTreePath(1 <-> 2, Distance=1.0)\nTreePath(2 <-> 3, Distance=2.0)"))
+        self.assertEqual(text.count("TreeNode("), 3)
+        self.assertTrue(repr(ForestGraph()).endswith("Edges:\n"))
+
+if __name__ == '__main__':
+    unittest.main()
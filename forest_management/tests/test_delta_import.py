@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.utils.delta_import import apply_forest_delta, import_forest_delta, get_tree_id_index
+from forest_management.utils.sketches import get_forest_sketches
+from forest_management.tasks.conservation_index import get_conservation_index
+
+class TestDeltaImport(unittest.TestCase):
+    def setUp(self):
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(i, 'Oak', 10 * i) for i in range(1, 5)]
+        for tree in self.trees:
+            self.forest.add_tree(tree)
+        self.forest.add_path(TreePath(self.trees[0], self.trees[1], 1.0))
+        self.forest.add_path(TreePath(self.trees[1], self.trees[2], 2.0))
+
+    def tree(self, tree_id):
+        return get_tree_id_index(self.forest).get(tree_id)
+
+    def test_upsert_trees_and_paths(self):
+        trees = pd.DataFrame({
+            'tree_id': [2, 5, 3],
+            'species': ['Pine', 'Birch', 'Oak'],
+            'age': [20, 5, 30],
+            'health_status': ['INFECTED', 'HEALTHY', 'HEALTHY'],
+        })
+        paths = pd.DataFrame({'tree_1': [5, 3, 2], 'tree_2': [4, 2, 1], 'distance': [3.0, 9.0, 1.0]})
+        original = self.tree(2)
+        summary = apply_forest_delta(self.forest, trees, paths)
+        self.assertEqual(summary, {'trees_added': 1, 'trees_updated': 1, 'trees_removed': 0,
+                                   'paths_added': 1, 'paths_updated': 1, 'paths_removed': 0, 'unchanged': 2})
+        self.assertIs(self.tree(2), original)
+        self.assertEqual((original.species, original.health_status), ('Pine', HealthStatus.INFECTED))
+        self.assertEqual(self.forest.adjacency[self.tree(3)][0].distance, 9.0)
+        self.assertEqual(len(self.forest.adjacency[self.tree(5)]), 1)
+
+    def test_tombstones(self):
+        trees = pd.DataFrame({'tree_id': [1, 99], 'deleted': [1, 'yes']})
+        paths = pd.DataFrame({'tree_1': [3, 3], 'tree_2': [2, 4], 'distance': [None, None],
+                              'deleted': ['true', 'true']})
+        summary = apply_forest_delta(self.forest, trees, paths)
+        self.assertEqual(summary['trees_removed'], 1)
+        # 3-4 之间没有路径，99 号树不存在，这两个墓碑行被忽略
+        self.assertEqual(summary['paths_removed'], 1)
+        self.assertEqual(summary['unchanged'], 2)
+        self.assertIsNone(self.tree(1))
+        self.assertEqual(sum(len(paths) for paths in self.forest.adjacency.values()), 0)
+
+    def test_validation_is_atomic(self):
+        version = self.forest.version
+        trees = pd.DataFrame({'tree_id': [7], 'species': ['Oak'], 'age': [1], 'health_status': ['HEALTHY']})
+        paths = pd.DataFrame({'tree_1': [7, 1], 'tree_2': [1, 42], 'distance': [1.0, 1.0]})
+        with self.assertRaises(ValueError) as cm:
+            apply_forest_delta(self.forest, trees, paths)
+        self.assertIn("Tree ID 42 not found", str(cm.exception))
+        self.assertEqual(self.forest.version, version)
+        self.assertIsNone(self.tree(7))
+
+        with self.assertRaises(ValueError):
+            apply_forest_delta(self.forest, pd.DataFrame({
+                'tree_id': [1, 1], 'species': ['Oak'] * 2, 'age': [1, 2], 'health_status': ['HEALTHY'] * 2}))
+
+    def test_derived_state_kept_up_to_date(self):
+        index = get_conservation_index(self.forest)
+        sketches = get_forest_sketches(self.forest)
+        apply_forest_delta(self.forest, pd.DataFrame({
+            'tree_id': [2, 4], 'species': ['Oak', 'Oak'], 'age': [400, 40], 'health_status': ['INFECTED', 'HEALTHY']}))
+        self.assertEqual(index.size_of(index.area_of(self.tree(1))), 1)
+        self.assertIn(self.tree(2), [t for t in self.forest.adjacency if t.health_status == HealthStatus.INFECTED])
+        self.assertEqual(sketches.age_histogram.total, 4)
+        self.assertEqual(sketches.age.max, 400)
+
+    def test_import_from_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path_file = os.path.join(directory, 'paths.csv')
+            pd.DataFrame({'tree_1': [4], 'tree_2': [1], 'distance': [5.5]}).to_csv(path_file, index=False)
+            summary = import_forest_delta(self.forest, path_file_path=path_file)
+            self.assertEqual(summary['paths_added'], 1)
+            with self.assertRaises(ValueError) as cm:
+                import_forest_delta(self.forest, os.path.join(directory, 'missing.csv'))
+            self.assertIn("Failed to import forest delta", str(cm.exception))
+
+if __name__ == '__main__':
+    unittest.main()
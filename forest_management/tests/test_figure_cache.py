@@ -0,0 +1,78 @@
+import json
+import unittest
+from unittest import mock
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.visualization import figure_cache as figure_cache_module
+from forest_management.visualization.figure_cache import FigureCache, generate_figure_json
+from forest_management.visualization.interactive_visualize import generate_figure
+
+class TestFigureCache(unittest.TestCase):
+    def setUp(self):
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(i, 'Oak', 10 + i, HealthStatus.INFECTED if i == 0 else HealthStatus.HEALTHY)
+                      for i in range(5)]
+        for tree in self.trees:
+            tree.x, tree.y = float(tree.tree_id), 0.0
+        self.paths = [TreePath(self.trees[i], self.trees[i + 1], 1.0) for i in range(4)]
+        self.forest.bulk_insert(self.trees, self.paths)
+        self.cache = FigureCache()
+
+    def test_repeated_view_skips_plotly(self):
+        payload = generate_figure_json(self.forest, highlight_nodes=self.trees[:2], cache=self.cache)
+        self.assertEqual(json.loads(payload), json.loads(generate_figure(self.forest, self.trees[:2]).to_json()))
+        with mock.patch.object(figure_cache_module, 'generate_figure') as build:
+            # 高亮集合与顺序无关
+            again = generate_figure_json(self.forest, highlight_nodes=self.trees[1::-1], cache=self.cache)
+            build.assert_not_called()
+        self.assertIs(again, payload)
+        info = self.cache.info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (1, 1, 1))
+        self.assertEqual(info['bytes'], len(payload))
+        self.assertEqual(info['hit_rate'], 0.5)
+
+    def test_key_includes_highlights_color_and_version(self):
+        base = generate_figure_json(self.forest, cache=self.cache)
+        variants = [
+            generate_figure_json(self.forest, highlight_nodes=self.trees[:1], cache=self.cache),
+            generate_figure_json(self.forest, highlight_nodes=self.trees[:1], highlight_color='red', cache=self.cache),
+            generate_figure_json(self.forest, path_nodes=self.trees[:2], cache=self.cache),
+            generate_figure_json(self.forest, highlight_paths=self.paths[:1], cache=self.cache),
+        ]
+        self.assertEqual(len({base, *variants}), 5)
+        self.assertEqual(self.cache.info()['misses'], 5)
+        # 森林修改后旧图表失效
+        self.forest.remove_path(self.paths[-1])
+        changed = generate_figure_json(self.forest, cache=self.cache)
+        self.assertNotEqual(changed, base)
+        self.assertEqual(self.cache.info()['hits'], 0)
+        # 另一片相同内容的森林不会命中
+        other = ForestGraph()
+        self.assertNotEqual(generate_figure_json(other, cache=self.cache), changed)
+        self.assertEqual(self.cache.info()['hits'], 0)
+
+    def test_evicts_least_recently_used_by_size(self):
+        size = len(generate_figure_json(self.forest, cache=FigureCache()))
+        cache = FigureCache(max_bytes=int(size * 2.5))
+        first = generate_figure_json(self.forest, cache=cache)
+        generate_figure_json(self.forest, highlight_nodes=self.trees[:1], cache=cache)
+        generate_figure_json(self.forest, cache=cache)  # 访问后第一个图表变为最近使用
+        generate_figure_json(self.forest, highlight_nodes=self.trees[:2], cache=cache)
+        generate_figure_json(self.forest, path_nodes=self.trees[:1], cache=cache)
+        info = cache.info()
+        self.assertEqual(info['size'], 2)
+        self.assertLessEqual(info['bytes'], cache.max_bytes)
+        self.assertEqual(info['evictions'], 2)
+        hits = info['hits']
+        self.assertIs(generate_figure_json(self.forest, path_nodes=self.trees[:1], cache=cache),
+                      generate_figure_json(self.forest, path_nodes=self.trees[:1], cache=cache))
+        self.assertEqual(cache.info()['hits'], hits + 2)
+
+        # 超过上限的单个图表不缓存
+        tiny = FigureCache(max_bytes=10)
+        self.assertEqual(generate_figure_json(self.forest, cache=tiny), first)
+        self.assertEqual(tiny.info()['size'], 0)
+        tiny.clear()
+        self.assertEqual(tiny.info()['misses'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
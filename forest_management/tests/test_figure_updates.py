@@ -0,0 +1,157 @@
+import copy
+import json
+import threading
+import unittest
+from unittest import mock
+from dash import Patch
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.dashboard import figure_updates
+from forest_management.dashboard.figure_updates import IncrementalFigure
+from forest_management.visualization.figure_cache import FigureCache
+
+def apply_patch(figure, patch):
+    """按 dash 在浏览器中的方式把 Patch 的操作依次应用到图表 JSON 上"""
+    for operation in patch.to_plotly_json()['operations']:
+        *parents, last = operation['location']
+        target = figure
+        for key in parents:
+            target = target[key]
+        if operation['operation'] == 'Assign':
+            target[last] = operation['params']['value']
+        elif operation['operation'] == 'Delete':
+            del target[last]
+        elif operation['operation'] == 'Extend':
+            target[last].extend(operation['params']['value'])
+        else:
+            raise AssertionError(operation['operation'])
+    return figure
+
+def content(figure):
+    """图表中各轨迹的元素集合（与顺序无关），节点颜色还原为颜色名"""
+    result = {}
+    for trace in figure['data']:
+        if trace['name'].startswith('edges-'):
+            x, y = trace.get('x', []), trace.get('y', [])
+            rows = {(x[i], x[i + 1], y[i], y[i + 1]) for i in range(0, len(x), 3)}
+        elif trace['name'] == 'distances':
+            rows = set(zip(trace.get('x', []), trace.get('y', []), trace.get('text', [])))
+        else:
+            marker = trace['marker']
+            scale = {round(stop * marker['cmax']): color for stop, color in marker['colorscale']}
+            rows = set(zip(trace['x'], trace['y'], trace['text'], trace['hovertext'],
+                           [scale[code] for code in marker['color']], marker['size']))
+        result[trace['name']] = rows
+    return result
+
+class TestIncrementalFigure(unittest.TestCase):
+    def setUp(self):
+        self.forest = ForestGraph()
+        self.trees = []
+        for i in range(10):
+            tree = TreeNode(i, 'Oak', 10 + i)
+            tree.x, tree.y = float(i), float(i % 3)
+            self.trees.append(tree)
+        paths = [TreePath(self.trees[i], self.trees[i + 1], 1.0 + i) for i in range(9)]
+        self.forest.bulk_insert(self.trees, paths)
+        self.figure = IncrementalFigure(cache=FigureCache())
+        figure, self.revision = self.figure.render(self.forest)
+        self.client = copy.deepcopy(figure)  # 缓存的字典不能修改，“浏览器”使用副本
+
+    def update(self, **highlights):
+        """渲染一次并在“浏览器”中应用，返回发送的数据量（字节）"""
+        update, self.revision = self.figure.render(self.forest, self.revision, **highlights)
+        if isinstance(update, Patch):
+            payload = json.dumps(update.to_plotly_json())
+            self.client = apply_patch(self.client, update)
+        else:
+            payload = json.dumps(update)
+            self.client = copy.deepcopy(update)
+        expected = IncrementalFigure(cache=FigureCache()).render(self.forest, **highlights)[0]
+        self.assertEqual(content(self.client), content(expected))
+        return update, len(payload)
+
+    def test_first_render_is_full_figure_with_lists(self):
+        self.assertEqual(self.revision, 1)
+        gray = self.client['data'][0]
+        self.assertEqual(gray['x'][:3], [0.0, 1.0, None])
+        self.assertEqual(len(self.client['data'][-1]['x']), 10)
+
+    def test_add_tree_sends_small_patch(self):
+        full = len(json.dumps(self.client))
+        tree = TreeNode(100, 'Pine', 5, HealthStatus.INFECTED)
+        tree.x, tree.y = 20.0, 0.0
+        self.forest.add_tree(tree)
+        self.forest.add_path(TreePath(tree, self.trees[9], 4.0))
+        update, size = self.update()
+        self.assertIsInstance(update, Patch)
+        self.assertLess(size, full / 2)
+        self.assertEqual(self.revision, 2)
+
+    def test_remove_and_recolor(self):
+        self.forest.remove_tree(self.trees[4])
+        update, _ = self.update()
+        self.assertIsInstance(update, Patch)
+        self.trees[7].health_status = HealthStatus.INFECTED
+        self.forest.remove_path(next(iter(self.forest.adjacency[self.trees[0]])))
+        update, _ = self.update(highlight_nodes=self.trees[1:3], highlight_color='#123456')
+        self.assertIsInstance(update, Patch)
+        update, _ = self.update(path_nodes=self.trees[5:7], highlight_paths=[])
+        self.assertIsInstance(update, Patch)
+        update, _ = self.update()
+        self.assertIsInstance(update, Patch)
+
+    def test_out_of_sync_or_large_change_sends_full_figure(self):
+        update, _ = self.update()
+        self.assertIsInstance(update, Patch)
+        # 浏览器的修订号与服务器不一致（页面刷新）
+        self.revision = None
+        update, _ = self.update()
+        self.assertNotIsInstance(update, Patch)
+        self.figure.max_changes = 3
+        for i in range(10, 15):
+            self.forest.add_tree(TreeNode(i, 'Oak', 1))
+        update, _ = self.update()
+        self.assertNotIsInstance(update, Patch)
+
+    def test_each_client_diffs_against_its_own_model(self):
+        # 第二个页面在森林修改后打开，之后两个页面交替更新
+        self.forest.add_tree(TreeNode(100, 'Pine', 5))
+        update, other_revision = self.figure.render(self.forest)
+        other_client = copy.deepcopy(update)
+        self.forest.remove_tree(self.trees[2])
+        for highlights in ({}, {'highlight_nodes': self.trees[5:7]}):
+            update, _ = self.update(**highlights)
+            self.assertIsInstance(update, Patch)
+            patch, other_revision = self.figure.render(self.forest, other_revision, **highlights)
+            self.assertIsInstance(patch, Patch)
+            other_client = apply_patch(other_client, patch)
+            self.assertEqual(content(other_client), content(self.client))
+
+    def test_concurrent_renders_get_distinct_revisions(self):
+        revisions = []
+
+        def render():
+            for _ in range(20):
+                revisions.append(self.figure.render(self.forest, self.revision)[1])
+
+        threads = [threading.Thread(target=render) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(revisions), list(range(2, 82)))
+
+    def test_repeated_full_view_served_from_cache(self):
+        other = IncrementalFigure(cache=self.figure.cache)  # 另一个页面或刷新后的页面
+        with mock.patch.object(figure_updates, 'detail_view', side_effect=AssertionError("rebuilt")):
+            figure, _ = other.render(self.forest)
+        self.assertIs(figure, self.figure.render(self.forest)[0])
+        self.assertEqual(self.figure.cache.info()['hits'], 2)
+        # 命中缓存后仍然可以继续发送增量更新
+        self.forest.add_tree(TreeNode(100, 'Pine', 5))
+        update, _ = other.render(self.forest, other.revision)
+        self.assertIsInstance(update, Patch)
+        self.assertEqual(figure['data'][-1]['x'], self.client['data'][-1]['x'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+from forest_management.core.csr_snapshot import CSRSnapshot
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.extra_features import get_health_stats, get_species_distribution, get_average_age
+from forest_management.tasks.forest_statistics import compute_forest_statistics
+from forest_management.tasks.conservation_areas import find_conservation_areas
+
+class TestForestStatistics(unittest.TestCase):
+    def setUp(self):
+        self.forest = ForestGraph()
+        self.trees = [
+            TreeNode(1, "Oak", 10, HealthStatus.HEALTHY),
+            TreeNode(2, "Pine", 20, HealthStatus.HEALTHY),
+            TreeNode(3, "Oak", 30, HealthStatus.INFECTED),
+            TreeNode(4, "Oak", 40, HealthStatus.HEALTHY),
+            TreeNode(5, "Maple", 50, HealthStatus.AT_RISK),
+        ]
+        for tree in self.trees:
+            self.forest.add_tree(tree)
+        t = self.trees
+        self.forest.add_path(TreePath(t[0], t[1], 1.0))
+        self.forest.add_path(TreePath(t[1], t[2], 1.0))
+        self.forest.add_path(TreePath(t[2], t[3], 1.0))
+
+    def test_matches_existing_functions(self):
+        stats = compute_forest_statistics(self.forest)
+        self.assertEqual(stats['health'], get_health_stats(self.forest))
+        self.assertEqual(list(stats['species'].items()), list(get_species_distribution(self.forest).items()))
+        self.assertAlmostEqual(stats['average_age'], get_average_age(self.forest))
+
+    def test_crosstab(self):
+        crosstab = compute_forest_statistics(self.forest)['species_health_crosstab']
+        self.assertEqual(crosstab['Oak'], {'HEALTHY': 2, 'INFECTED': 1, 'AT_RISK': 0})
+        self.assertEqual(crosstab['Maple'], {'HEALTHY': 0, 'INFECTED': 0, 'AT_RISK': 1})
+
+    def test_age_quantiles_and_degrees(self):
+        stats = compute_forest_statistics(self.forest)
+        self.assertEqual(stats['age_quantiles'][0.5], 30.0)
+        self.assertEqual(stats['age_quantiles'][1.0], 50.0)
+        self.assertEqual(stats['degree_distribution'], {0: 1, 1: 2, 2: 2})
+
+    def test_area_summaries(self):
+        stats = compute_forest_statistics(self.forest)
+        self.assertEqual(stats['area_count'], 2)
+        largest = stats['areas'][0]
+        self.assertEqual(largest['size'], 2)
+        self.assertEqual(largest['average_age'], 15.0)
+        self.assertEqual(largest['dominant_species'], "Oak")
+
+    def test_reuses_shared_snapshot_and_labels(self):
+        find_conservation_areas(self.forest)
+        with mock.patch.object(CSRSnapshot, 'from_forest', side_effect=AssertionError("rebuilt")):
+            stats = compute_forest_statistics(self.forest)
+        self.assertEqual([area['size'] for area in stats['areas']], [2, 1])
+        self.assertEqual(stats['areas'][1]['dominant_species'], "Oak")
+        self.assertEqual(stats['areas'][1]['average_age'], 40.0)
+
+    def test_empty_forest(self):
+        stats = compute_forest_statistics(ForestGraph())
+        self.assertEqual(stats['health']['total_trees'], 0)
+        self.assertEqual(stats['species'], {})
+        self.assertEqual(stats['average_age'], 0.0)
+        self.assertEqual(stats['areas'], [])
+
+if __name__ == '__main__':
+    unittest.main()
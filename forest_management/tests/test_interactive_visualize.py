@@ -0,0 +1,116 @@
+import unittest
+import numpy as np
+import plotly.graph_objects as go
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.visualization.interactive_visualize import (generate_figure, generate_lod_figure,
+                                                                    viewport_from_relayout, EDGE_COLORS)
+
+def node_colors(trace):
+    """把节点轨迹的数值颜色编码还原为颜色名"""
+    scale = dict((round(stop * trace.marker.cmax), color) for stop, color in trace.marker.colorscale)
+    return [scale[code] for code in np.asarray(trace.marker.color).tolist()]
+
+class TestGenerateFigure(unittest.TestCase):
+    def setUp(self):
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(1, 'Oak', 10), TreeNode(2, 'Pine', 20, HealthStatus.INFECTED),
+                      TreeNode(3, 'Oak', 30, HealthStatus.AT_RISK), TreeNode(4, 'Birch', 40)]
+        for tree in self.trees:
+            # 带真实坐标的树木直接使用该坐标
+            tree.x, tree.y = tree.tree_id * 10, tree.age
+        a, b, c, d = self.trees
+        self.paths = [TreePath(a, b, 1.0), TreePath(b, c, 2.25), TreePath(c, d, 3.0)]
+        self.forest.bulk_insert(self.trees, self.paths)
+
+    def traces(self, fig):
+        return {trace.name: trace for trace in fig.data}
+
+    def test_constant_trace_count(self):
+        fig = generate_figure(self.forest)
+        self.assertEqual([trace.name for trace in fig.data],
+                         [f"edges-{color}" for color in EDGE_COLORS] + ['distances', 'trees'])
+        traces = self.traces(fig)
+        gray = traces['edges-gray']
+        self.assertEqual(len(gray.x), 9)
+        self.assertTrue(np.isnan(gray.x[2::3]).all())
+        self.assertEqual(list(gray.x[0::3]) + list(gray.x[1::3]), [10, 20, 30, 20, 30, 40])
+        self.assertEqual(list(traces['distances'].text), ['1.0', '2.2', '3.0'])
+        self.assertEqual(list(traces['distances'].x), [15, 25, 35])
+        nodes = traces['trees']
+        self.assertEqual(list(nodes.text), ['ID:1', 'ID:2', 'ID:3', 'ID:4'])
+        self.assertEqual(node_colors(nodes), ['green', 'red', 'orange', 'green'])
+        self.assertEqual(list(nodes.marker.size), [15, 20, 20, 15])
+        self.assertIsInstance(nodes, go.Scatter)
+
+    def test_highlights(self):
+        a, b, c, d = self.trees
+        fig = generate_figure(self.forest, highlight_nodes=[a, b], path_nodes=[d],
+                              highlight_paths=[TreePath(d, c, 3.0)], highlight_color='#123456')
+        traces = self.traces(fig)
+        self.assertEqual(list(traces['edges-red'].x[:2]), [10, 20])
+        self.assertEqual(list(traces['edges-blue'].x[:2]), [30, 40])
+        self.assertEqual(len(traces['edges-gray'].x), 3)
+        self.assertEqual(node_colors(traces['trees']), ['#123456', '#123456', 'orange', 'blue'])
+
+    def test_webgl_and_empty(self):
+        fig = generate_figure(self.forest, use_webgl=True)
+        self.assertTrue(all(isinstance(trace, go.Scattergl) for trace in fig.data))
+        fig = generate_figure(ForestGraph())
+        self.assertEqual(len(fig.data), 5)
+        self.assertEqual(len(fig.data[-1].x), 0)
+        fig.to_json()
+
+class TestLevelOfDetail(unittest.TestCase):
+    def setUp(self):
+        # 20 x 20 的网格，坐标即网格位置；前五行的树被感染
+        self.forest = ForestGraph()
+        self.trees = []
+        for i in range(400):
+            tree = TreeNode(i, 'Oak', 10, HealthStatus.INFECTED if i < 100 else HealthStatus.HEALTHY)
+            tree.x, tree.y = float(i % 20), float(i // 20)
+            self.trees.append(tree)
+        paths = [TreePath(self.trees[i], self.trees[i + 1], 1.0) for i in range(400) if (i + 1) % 20]
+        paths += [TreePath(self.trees[i], self.trees[i + 20], 1.0) for i in range(380)]
+        self.forest.bulk_insert(self.trees, paths)
+
+    def test_viewport_from_relayout(self):
+        self.assertEqual(viewport_from_relayout({'xaxis.range[0]': 5, 'xaxis.range[1]': 1,
+                                                 'yaxis.range[0]': 0, 'yaxis.range[1]': 2}), (1.0, 5.0, 0.0, 2.0))
+        self.assertEqual(viewport_from_relayout({'xaxis.range': [0, 3]}), (0.0, 3.0, -np.inf, np.inf))
+        self.assertIsNone(viewport_from_relayout({'xaxis.autorange': True, 'yaxis.autorange': True}))
+        self.assertIsNone(viewport_from_relayout({'dragmode': 'pan'}))
+
+    def test_small_view_matches_full_figure(self):
+        full = generate_figure(self.forest)
+        lod = generate_lod_figure(self.forest)
+        self.assertEqual([trace.name for trace in lod.data], [trace.name for trace in full.data])
+        self.assertEqual(len(lod.data[-1].x), 400)
+
+    def test_zoomed_out_clusters(self):
+        fig = generate_lod_figure(self.forest, max_nodes=50, max_edges=30, grid=4)
+        clusters = fig.data[-1]
+        self.assertEqual(clusters.name, 'clusters')
+        self.assertEqual(len(clusters.x), 16)
+        self.assertEqual(sum(int(n) for n in clusters.text), 400)
+        self.assertIn("Infected: 25", clusters.hovertext[0])
+        self.assertEqual(node_colors(clusters).count('red'), 4)
+        links = fig.data[0]
+        self.assertEqual(len(links.x) // 3, 24)  # 4 x 4 网格中相邻的簇对
+        fig = generate_lod_figure(self.forest, max_nodes=50, max_edges=10, grid=4)
+        self.assertEqual(len(fig.data[0].x) // 3, 10)
+
+    def test_zoomed_in_sends_visible_trees(self):
+        a, b = self.trees[0], self.trees[1]
+        fig = generate_lod_figure(self.forest, viewport=(-0.5, 2.5, -0.5, 1.5), max_nodes=50,
+                                  highlight_nodes=[a, b], highlight_color='#123456')
+        nodes = fig.data[-1]
+        self.assertEqual(list(nodes.text), ['ID:0', 'ID:1', 'ID:2', 'ID:20', 'ID:21', 'ID:22'])
+        # 一端在范围外的路径也会绘制
+        gray = fig.data[0]
+        self.assertEqual(len(gray.x) // 3 + len(fig.data[1].x) // 3, 12)
+        self.assertEqual(len(fig.data[1].x) // 3, 1)
+        self.assertEqual(list(fig.layout.xaxis.range), [-0.5, 2.5])
+        self.assertEqual(node_colors(nodes)[:2], ['#123456', '#123456'])
+
+if __name__ == '__main__':
+    unittest.main()
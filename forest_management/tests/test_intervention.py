@@ -0,0 +1,74 @@
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.intervention import optimize_interventions
+
+class TestIntervention(unittest.TestCase):
+    def setUp(self):
+        # 感染树 1 通过树 2 连接两条分支：2-3-4 和 2-5
+        self.forest = ForestGraph()
+        self.trees = {i: TreeNode(i, "Oak", 20, HealthStatus.HEALTHY) for i in range(1, 7)}
+        self.trees[1].health_status = HealthStatus.INFECTED
+        for tree in self.trees.values():
+            self.forest.add_tree(tree)
+        t = self.trees
+        self.path12 = TreePath(t[1], t[2], 1.0)
+        self.forest.add_path(self.path12)
+        self.forest.add_path(TreePath(t[2], t[3], 1.0))
+        self.forest.add_path(TreePath(t[3], t[4], 1.0))
+        self.forest.add_path(TreePath(t[2], t[5], 1.0))
+        self.forest.add_path(TreePath(t[1], t[6], 1.0))
+
+    def test_fell_choke_point(self):
+        result = optimize_interventions(self.forest, budget=1, horizon=10.0)
+        self.assertEqual(result['infected_before'], 6)
+        self.assertEqual(result['selected'], [self.trees[2]])
+        self.assertEqual(result['infected_after'], 2)
+        self.assertEqual(result['gains'], [4])
+
+    def test_cut_paths(self):
+        result = optimize_interventions(self.forest, budget=2, horizon=10.0, mode='paths')
+        self.assertEqual(result['selected'][0], self.path12)
+        self.assertEqual(result['infected_after'], 1)
+
+    def test_horizon_limits_reach(self):
+        result = optimize_interventions(self.forest, budget=1, horizon=1.0)
+        self.assertEqual(result['infected_before'], 3)
+        self.assertEqual(result['infected_after'], 2)
+
+    def test_stops_when_nothing_helps(self):
+        result = optimize_interventions(self.forest, budget=10, horizon=10.0)
+        self.assertEqual(result['infected_after'], 1)
+        self.assertEqual(len(result['selected']), 2)
+        self.assertTrue(result['stopped_early'])
+        self.assertFalse(optimize_interventions(self.forest, budget=1, horizon=10.0)['stopped_early'])
+
+    def test_lazy_evaluation_saves_simulations(self):
+        result = optimize_interventions(self.forest, budget=2, horizon=10.0)
+        # 1 次基线 + 5 个候选的初始评估，后续只重新评估少数候选
+        self.assertLess(result['evaluations'], 1 + 5 * 2)
+
+    def test_explicit_candidates(self):
+        result = optimize_interventions(self.forest, budget=1, horizon=10.0,
+                                        candidates=[self.trees[3], self.trees[5]])
+        self.assertEqual(result['selected'], [self.trees[3]])
+        self.assertEqual(result['infected_after'], 4)
+
+    def test_equal_path_candidates(self):
+        # 与森林中的路径相等但另行构建的对象
+        t = {i: TreeNode(i, "Oak", 20) for i in (1, 2, 6)}
+        result = optimize_interventions(self.forest, budget=1, horizon=10.0, mode='paths',
+                                        candidates=[TreePath(t[6], t[1], 1.0), TreePath(t[2], t[1], 1.0)])
+        self.assertIs(result['selected'][0], self.path12)
+        self.assertEqual(result['infected_after'], 2)
+        with self.assertRaises(ValueError):
+            optimize_interventions(self.forest, budget=1, horizon=10.0, mode='paths',
+                                   candidates=[TreePath(t[2], t[1], 2.0)])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            optimize_interventions(self.forest, budget=1, horizon=1.0, mode='roads')
+        with self.assertRaises(ValueError):
+            optimize_interventions(self.forest, budget=-1, horizon=1.0)
+
+if __name__ == '__main__':
+    unittest.main()
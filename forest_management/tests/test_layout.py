@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.visualization import layout
+from forest_management.visualization.layout import ForceLayout, get_forest_layout
+
+def grid_forest(side):
+    """side x side 的网格状森林"""
+    forest = ForestGraph()
+    trees = [TreeNode(i, 'Oak', 10) for i in range(side * side)]
+    paths = [TreePath(trees[i], trees[i + 1], 1.0) for i in range(len(trees)) if (i + 1) % side]
+    paths += [TreePath(trees[i], trees[i + side], 1.0) for i in range(len(trees) - side)]
+    forest.bulk_insert(trees, paths)
+    return forest, trees
+
+class TestForceLayout(unittest.TestCase):
+    def test_barnes_hut_matches_exact_repulsion(self):
+        pos = np.random.default_rng(1).normal(size=(500, 2))
+        approx = layout._repulsion(pos, np.arange(500), 1.0)
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist2 = (delta ** 2).sum(axis=2)
+        np.fill_diagonal(dist2, np.inf)
+        exact = (delta / dist2[:, :, None]).sum(axis=1)
+        error = np.linalg.norm(approx - exact, axis=1) / np.linalg.norm(exact, axis=1)
+        self.assertLess(np.median(error), 0.02)
+
+    def test_layout_separates_trees_and_keeps_neighbors_close(self):
+        forest, trees = grid_forest(10)
+        pos = get_forest_layout(forest).coordinates()
+        dist = np.sqrt(((pos[:, None, :] - pos[None, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(dist, np.inf)
+        self.assertGreater(dist.min(), 0.1)
+        edge_lengths = [dist[i, i + 1] for i in range(99) if (i + 1) % 10]
+        self.assertLess(np.mean(edge_lengths), np.mean(dist[np.isfinite(dist)]) / 3)
+        # 相同的森林得到相同的布局
+        again, _ = grid_forest(10)
+        np.testing.assert_array_equal(get_forest_layout(again).coordinates(), pos)
+
+    def test_cached_per_version_and_incremental(self):
+        forest, trees = grid_forest(10)
+        forest_layout = get_forest_layout(forest)
+        self.assertIs(get_forest_layout(forest), forest_layout)
+        before = forest_layout.coordinates()
+        positions = forest_layout.positions
+        forest_layout.update()
+        self.assertIs(forest_layout.positions, positions)
+
+        new_tree = TreeNode(1000, 'Pine', 5)
+        forest.add_tree(new_tree)
+        forest.add_path(TreePath(new_tree, trees[55], 1.0))
+        after = forest_layout.coordinates(trees)
+        moved = np.flatnonzero((after != before).any(axis=1)).tolist()
+        self.assertEqual(moved, [55])
+        x, y = forest_layout.positions[new_tree]
+        self.assertLess(np.hypot(x - after[55, 0], y - after[55, 1]), 3.0)
+
+        forest.remove_tree(trees[0])
+        self.assertEqual(len(forest_layout.coordinates()), 100)
+        self.assertNotIn(trees[0], forest_layout.positions)
+
+    def test_changes_that_move_nothing_skip_the_simulation(self):
+        forest, trees = grid_forest(6)
+        forest_layout = get_forest_layout(forest)
+        before = forest_layout.coordinates()
+        forest.update_tree_health(trees[3], HealthStatus.INFECTED)
+        forest.remove_path(next(iter(forest.adjacency[trees[7]])))
+        forest.remove_tree(trees[20])
+        with mock.patch.object(layout, '_simulate', side_effect=AssertionError("simulated")):
+            after = forest_layout.coordinates()
+        np.testing.assert_array_equal(after, np.delete(before, 20, axis=0))
+        self.assertEqual(forest_layout.version, forest.version)
+
+    def test_slots_follow_adjacency_order(self):
+        forest, trees = grid_forest(6)
+        forest_layout = get_forest_layout(forest)
+        forest_layout.rebuild_ratio = 1.0
+        forest_layout.update()
+        for i in range(30):
+            forest.remove_tree(trees[i])
+            if i % 3 == 0:
+                tree = TreeNode(100 + i, 'Pine', 1)
+                forest.add_tree(tree)
+                forest.add_path(TreePath(tree, trees[35], 1.0))
+            forest_layout.update()
+        expected = np.array([forest_layout.positions[tree] for tree in forest.adjacency])
+        np.testing.assert_array_equal(forest_layout.coordinates(), expected)
+        self.assertLess(len(forest_layout._trees), 2 * len(forest.adjacency) + 64 + 1)
+
+    def test_real_coordinates_are_pinned(self):
+        forest, trees = grid_forest(3)
+        for tree in trees[:4]:
+            tree.x, tree.y = tree.tree_id * 100.0, -tree.tree_id * 100.0
+        forest_layout = ForceLayout(forest)
+        pos = forest_layout.coordinates()
+        np.testing.assert_array_equal(pos[:4], [[i * 100.0, -i * 100.0] for i in range(4)])
+        self.assertTrue(np.isfinite(pos).all())
+
+        forest.reset()
+        self.assertEqual(forest_layout.coordinates().shape, (0, 2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from forest_management.utils import data_loader
+from forest_management.utils.data_loader import load_forest_data
+from forest_management.utils.parse_cache import ParseCache
+
+def forest_summary(forest):
+    return [(tree.tree_id, tree.species, tree.age, tree.health_status,
+             [(path.tree1.tree_id, path.tree2.tree_id, path.distance) for path in paths])
+            for tree, paths in forest.adjacency.items()]
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmpdir.name, 'cache'), max_bytes=10 * 1024 * 1024)
+        self.tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        self.path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        self.write_trees(['HEALTHY', 'INFECTED', 'AT_RISK'])
+        pd.DataFrame({'tree_1': [1, 3], 'tree_2': [2, 1], 'distance': [1.5, 0.1]}).to_csv(self.path_file, index=False)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_trees(self, health):
+        pd.DataFrame({'tree_id': [1, 2, 3], 'species': ['Oak', 'Pine', 'Oak'], 'age': [10, 20, 30],
+                      'health_status': health}).to_csv(self.tree_file, index=False)
+
+    def test_repeat_load_skips_parsing(self):
+        first = load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        with patch.object(data_loader, 'read_forest_csv', side_effect=AssertionError("parsed again")):
+            second = load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        self.assertEqual(forest_summary(second), forest_summary(first))
+        self.assertEqual(self.cache.info()['hits'], 1)
+
+        with patch.object(data_loader, 'read_forest_csv', wraps=data_loader.read_forest_csv) as reader:
+            load_forest_data(self.tree_file, self.path_file, use_cache=False, cache=self.cache)
+        self.assertEqual(reader.call_count, 2)
+
+    def test_cache_is_opt_in(self):
+        with patch.dict(os.environ, {'FOREST_PARSE_CACHE_DIR': ''}), \
+                patch.object(data_loader.parse_cache, 'key', side_effect=AssertionError("cache used")):
+            load_forest_data(self.tree_file, self.path_file)
+        with patch.dict(os.environ, {'FOREST_PARSE_CACHE_DIR': self.cache.cache_dir}), \
+                patch.object(data_loader, 'parse_cache', self.cache):
+            load_forest_data(self.tree_file, self.path_file)
+            load_forest_data(self.tree_file, self.path_file)
+        self.assertEqual((self.cache.info()['misses'], self.cache.info()['hits']), (1, 1))
+
+    def test_default_directory_resolved_at_use(self):
+        late = os.path.join(self.tmpdir.name, 'late')
+        cache = ParseCache()
+        with patch.dict(os.environ, {'FOREST_PARSE_CACHE_DIR': late}):
+            load_forest_data(self.tree_file, self.path_file, cache=cache)
+            self.assertEqual(cache.cache_dir, late)
+        self.assertEqual(len(os.listdir(late)), 1)
+
+    def test_changed_file_is_parsed_again(self):
+        load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        self.write_trees(['AT_RISK', 'INFECTED', 'AT_RISK'])
+        forest = load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        self.assertEqual(forest_summary(forest)[0][3].name, 'AT_RISK')
+        self.assertEqual(self.cache.info()['misses'], 2)
+
+    def test_errors_and_unsupported_data_are_not_cached(self):
+        pd.DataFrame({'tree_1': [1], 'tree_2': [9], 'distance': [1.0]}).to_csv(self.path_file, index=False)
+        with self.assertRaises(ValueError):
+            load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        with self.assertRaises(ValueError):
+            load_forest_data(os.path.join(self.tmpdir.name, 'missing.csv'), self.path_file, cache=self.cache)
+
+        pd.DataFrame({'tree_id': ['a'], 'species': ['Oak'], 'age': [1],
+                      'health_status': ['HEALTHY']}).to_csv(self.tree_file, index=False)
+        pd.DataFrame({'tree_1': [], 'tree_2': [], 'distance': []}).to_csv(self.path_file, index=False)
+        forest = load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        self.assertEqual([tree.tree_id for tree in forest.adjacency], ['a'])
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_lru_eviction_by_size(self):
+        load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        entry_size = self.cache.size()
+        self.cache.max_bytes = entry_size * 2
+        self.cache.clear()
+        keys = []
+        for i, health in enumerate([['HEALTHY'] * 3, ['INFECTED'] * 3, ['AT_RISK'] * 3]):
+            self.write_trees(health)
+            keys.append(self.cache.key(self.tree_file, self.path_file))
+            load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+            # 固定写入时间，避免文件系统时间精度影响淘汰顺序
+            os.utime(self.cache._entry_path(keys[-1]), ns=(i + 1, i + 1))
+            if i == 1:
+                # 访问第一个条目，使第二个条目成为最久未使用的
+                self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertLessEqual(self.cache.size(), entry_size * 2)
+        self.assertTrue(os.path.exists(self.cache._entry_path(keys[0])))
+        self.assertFalse(os.path.exists(self.cache._entry_path(keys[1])))
+        self.assertTrue(os.path.exists(self.cache._entry_path(keys[2])))
+        self.assertEqual(self.cache.info()['evictions'], 1)
+
+    def test_corrupt_entry_is_replaced(self):
+        load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        key = self.cache.key(self.tree_file, self.path_file)
+        with open(self.cache._entry_path(key), 'r+b') as handle:
+            handle.write(b'garbage!')
+        forest = load_forest_data(self.tree_file, self.path_file, cache=self.cache)
+        self.assertEqual(len(forest.adjacency), 3)
+        self.assertIsNotNone(self.cache.get(key))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.tasks.seed_criticality import rank_seed_criticality
+
+class TestSeedCriticality(unittest.TestCase):
+    def setUp(self):
+        # 1 - 2 - 3 - 4 的链，另有被感染树 5 连接 4 和孤立的 6
+        self.forest = ForestGraph()
+        self.trees = [TreeNode(i, "Oak", 10 * i, HealthStatus.HEALTHY) for i in range(1, 7)]
+        self.trees[4].health_status = HealthStatus.INFECTED
+        for tree in self.trees:
+            self.forest.add_tree(tree)
+        t1, t2, t3, t4, t5, t6 = self.trees
+        self.forest.add_path(TreePath(t1, t2, 1.0))
+        self.forest.add_path(TreePath(t2, t3, 1.0))
+        self.forest.add_path(TreePath(t3, t4, 2.0))
+        self.forest.add_path(TreePath(t4, t5, 1.0))
+        self.forest.add_path(TreePath(t5, t6, 1.0))
+
+    def test_exact_ranking(self):
+        ranking = rank_seed_criticality(self.forest, horizon=2.0, workers=1)
+        scores = {tree.tree_id: score for tree, score in ranking}
+        self.assertEqual(scores, {1: 3, 2: 3, 3: 4, 4: 2, 6: 1})
+        self.assertEqual([tree.tree_id for tree, _ in ranking], [3, 1, 2, 4, 6])
+
+    def test_does_not_pass_through_infected_trees(self):
+        ranking = rank_seed_criticality(self.forest, horizon=100.0, workers=1)
+        scores = {tree.tree_id: score for tree, score in ranking}
+        self.assertEqual(scores[6], 1)
+        self.assertEqual(scores[1], 4)
+
+    def test_speed_scales_horizon(self):
+        ranking = rank_seed_criticality(self.forest, horizon=1.0, speed=2.0, workers=1)
+        scores = {tree.tree_id: score for tree, score in ranking}
+        self.assertEqual(scores[1], 3)
+
+    def test_process_pool_matches_inline(self):
+        inline = rank_seed_criticality(self.forest, horizon=3.0, workers=1)
+        pooled = rank_seed_criticality(self.forest, horizon=3.0, workers=2)
+        self.assertEqual([(t.tree_id, s) for t, s in inline], [(t.tree_id, s) for t, s in pooled])
+
+    def test_sampled_estimates(self):
+        exact = rank_seed_criticality(self.forest, horizon=2.0, workers=1)
+        sampled = rank_seed_criticality(self.forest, horizon=2.0, sample_size=4, workers=1, seed=0)
+        self.assertEqual({t.tree_id for t, _ in sampled}, {t.tree_id for t, _ in exact})
+        # 每个样本目标至少命中自身，估计值总和为 命中总数 × 5 / 4
+        self.assertGreaterEqual(sum(score for _, score in sampled), 5.0)
+        repeat = rank_seed_criticality(self.forest, horizon=2.0, sample_size=4, workers=1, seed=0)
+        self.assertEqual([(t.tree_id, s) for t, s in sampled], [(t.tree_id, s) for t, s in repeat])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            rank_seed_criticality(self.forest, horizon=-1)
+        with self.assertRaises(ValueError):
+            rank_seed_criticality(self.forest, horizon=1, speed=0)
+        with self.assertRaises(ValueError):
+            rank_seed_criticality(self.forest, horizon=1, sample_size=0)
+
+    def test_empty_forest(self):
+        self.assertEqual(rank_seed_criticality(ForestGraph(), horizon=1.0), [])
+
+if __name__ == '__main__':
+    unittest.main()
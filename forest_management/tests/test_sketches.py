@@ -0,0 +1,131 @@
+import pickle
+import random
+import unittest
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.utils.sketches import KLLSketch, FixedHistogram, ForestSketches, get_forest_sketches
+
+class TestKLLSketch(unittest.TestCase):
+    def test_quantiles_within_error(self):
+        rng = random.Random(1)
+        values = [rng.random() * 100 for _ in range(20000)]
+        sketch = KLLSketch(k=200, seed=1)
+        for value in values:
+            sketch.update(value)
+        ordered = sorted(values)
+        for q in (0.1, 0.5, 0.95):
+            estimate = sketch.quantile(q)
+            rank = np.searchsorted(ordered, estimate) / len(values)
+            self.assertLess(abs(rank - q), 0.03)
+        self.assertEqual(sketch.quantile(0), ordered[0])
+        self.assertEqual(sketch.quantile(1), ordered[-1])
+        self.assertLess(sum(len(c) for c in sketch.compactors), 1000)
+
+    def test_merge(self):
+        left, right = KLLSketch(seed=2), KLLSketch(seed=3)
+        left.update_many(np.arange(0, 5000))
+        right.update_many(np.arange(5000, 10000))
+        merged = left.merge(right)
+        self.assertEqual(merged.count, 10000)
+        self.assertLess(abs(merged.quantile(0.5) - 5000), 300)
+
+    def test_empty(self):
+        self.assertTrue(np.isnan(KLLSketch().quantile(0.5)))
+        with self.assertRaises(ValueError):
+            KLLSketch().quantile(2)
+
+class TestFixedHistogram(unittest.TestCase):
+    def test_update_remove_merge(self):
+        hist = FixedHistogram(0, 10, bins=5)
+        hist.update([1, 3, 3, 9, 10, -1, 11])
+        self.assertEqual(hist.bin_counts.tolist(), [1, 2, 0, 0, 2])
+        self.assertEqual(hist.counts[0], 1)
+        self.assertEqual(hist.counts[-1], 1)
+        hist.remove(3)
+        self.assertEqual(hist.bin_counts.tolist(), [1, 1, 0, 0, 2])
+        other = FixedHistogram(0, 10, bins=5)
+        other.update(5)
+        self.assertEqual(hist.merge(other).total, 7)
+        with self.assertRaises(ValueError):
+            hist.merge(FixedHistogram(0, 20, bins=5))
+
+    def test_quantile(self):
+        hist = FixedHistogram(0, 100, bins=10)
+        hist.update(np.arange(100))
+        self.assertAlmostEqual(hist.quantile(0.5), 50.0, delta=1.0)
+
+class TestForestSketches(unittest.TestCase):
+    def setUp(self):
+        self.forest = ForestGraph()
+        self.oaks = [TreeNode(i, "Oak", 10 + i, HealthStatus.HEALTHY) for i in range(100)]
+        for tree in self.oaks:
+            self.forest.add_tree(tree)
+        for a, b in zip(self.oaks, self.oaks[1:]):
+            self.forest.add_path(TreePath(a, b, 5.0))
+
+    def test_maintained_on_forest_changes(self):
+        sketches = get_forest_sketches(self.forest)
+        self.assertIs(get_forest_sketches(self.forest), sketches)
+        self.assertEqual(sketches.age.count, 100)
+        self.assertEqual(sketches.distance_histogram.total, 99)
+        pine = TreeNode(1000, "Pine", 300, HealthStatus.HEALTHY)
+        self.forest.add_tree(pine)
+        self.forest.add_path(TreePath(pine, self.oaks[0], 20.0))
+        summary = sketches.age_summary()
+        self.assertEqual(summary["Pine"][0.5], 300)
+        self.assertAlmostEqual(summary["Oak"][0.5], 59, delta=2)
+        self.assertEqual(sketches.distance_histogram.total, 100)
+        self.forest.remove_tree(pine)
+        self.assertEqual(sketches.distance_histogram.total, 99)
+        self.assertEqual(sketches.age_histogram.total, 100)
+        self.forest.reset()
+        self.assertEqual(sketches.age.count, 0)
+
+    def test_removals_and_updates_are_reflected(self):
+        forest = ForestGraph()
+        oaks = [TreeNode(i, "Oak", i + 1, HealthStatus.HEALTHY) for i in range(100)]
+        pine = TreeNode(1000, "Pine", 7, HealthStatus.HEALTHY)
+        forest.bulk_insert(oaks + [pine], [TreePath(a, b, 1.0) for a, b in zip(oaks, oaks[1:])])
+        sketches = get_forest_sketches(forest)
+        self.assertEqual(sketches.age_summary()["Oak"][0.95], 95)
+
+        for tree in oaks[50:]:
+            forest.remove_tree(tree)
+        summary = sketches.age_summary()
+        self.assertAlmostEqual(summary["Oak"][0.5], 25, delta=1)
+        self.assertEqual(sketches.age.count, 51)
+        self.assertEqual(sketches.distance.count, 49)
+
+        for tree in oaks[:50]:
+            forest.update_tree_attributes(tree, "Oak", 1000)
+        self.assertEqual(sketches.age_summary()["Oak"], {0.5: 1000, 0.95: 1000})
+        self.assertEqual(sketches.age.count, 51)
+        self.assertEqual(sketches.age_histogram.total, 51)
+
+        # 树种改变或树木被删除后，没有树木的树种不再出现
+        forest.update_tree_attributes(pine, "Birch", 7)
+        self.assertEqual(list(sketches.age_summary()), ["Birch", "Oak"])
+        forest.remove_tree(pine)
+        self.assertEqual(list(sketches.age_summary()), ["Oak"])
+
+        path = next(iter(forest.adjacency[oaks[0]]))
+        forest.update_path_distance(path, 30.0)
+        self.assertEqual(sketches.distance.count, 49)
+        self.assertEqual(sketches.distance.max, 30.0)
+        forest.add_tree(TreeNode(2000, "Oak", 3000, HealthStatus.HEALTHY))
+        self.assertEqual(sketches.age.count, 51)
+        self.assertEqual(sketches.age_summary()["Oak"][0.95], 1000)
+        self.assertEqual(sketches.age.max, 3000)
+
+    def test_chunks_merge_like_single_pass(self):
+        chunks = [ForestSketches(), ForestSketches()]
+        chunks[0].update_trees(["Oak"] * 50, np.arange(50))
+        chunks[1].update_trees(["Oak"] * 50 + ["Pine"], np.append(np.arange(50, 100), 7))
+        chunks[1].update_paths([1.0, 2.0])
+        merged = pickle.loads(pickle.dumps(chunks[0])).merge(chunks[1])
+        self.assertEqual(merged.age_by_species["Oak"].count, 100)
+        self.assertEqual(merged.age_summary()["Pine"][0.95], 7)
+        self.assertEqual(merged.distance.count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.utils.data_loader import load_forest_data
+from forest_management.utils.snapshot_io import save_forest_snapshot, load_snapshot, load_forest_snapshot, _PREFIX
+from forest_management.tasks.conservation_areas import label_conservation_areas
+
+def forest_summary(forest):
+    return [(tree.tree_id, tree.species, tree.age, tree.health_status,
+             [(path.tree1.tree_id, path.tree2.tree_id, path.distance) for path in paths])
+            for tree, paths in forest.adjacency.items()]
+
+class TestSnapshotIO(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.tmpdir.name, 'forest.snap')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_against_csv_loader(self):
+        rng = np.random.default_rng(3)
+        n, m = 200, 600
+        tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        pd.DataFrame({
+            'tree_id': rng.permutation(n) + 10,
+            'species': rng.choice(['Oak', 'Pine', '白桦'], n),
+            'age': rng.integers(1, 200, n),
+            'health_status': rng.choice(['HEALTHY', 'INFECTED', 'AT_RISK'], n),
+        }).to_csv(tree_file, index=False)
+        u = rng.integers(10, n + 10, m)
+        pd.DataFrame({'tree_1': u, 'tree_2': (u - 10 + rng.integers(1, n, m)) % n + 10,
+                      'distance': rng.uniform(0.1, 50, m)}).to_csv(path_file, index=False)
+        forest = load_forest_data(tree_file, path_file)
+
+        save_forest_snapshot(forest, self.file)
+        restored = load_forest_snapshot(self.file)
+        self.assertEqual(forest_summary(restored), forest_summary(forest))
+
+        snapshot = load_snapshot(self.file)
+        self.assertIsInstance(snapshot.tree_ids.base, np.memmap)
+        self.assertIsInstance(snapshot.indices.base, np.memmap)
+        np.testing.assert_array_equal(label_conservation_areas(None, snapshot=snapshot).labels,
+                                      label_conservation_areas(forest).labels)
+
+    def test_empty_forest(self):
+        save_forest_snapshot(ForestGraph(), self.file)
+        self.assertEqual(len(load_forest_snapshot(self.file).adjacency), 0)
+
+    def test_float_ages_and_path_direction(self):
+        forest = ForestGraph()
+        a, b = TreeNode(1, 'Oak', 12.5), TreeNode(2, 'Oak', 3.0, HealthStatus.AT_RISK)
+        forest.bulk_insert([a, b], [TreePath(b, a, 7.25)])
+        save_forest_snapshot(forest, self.file)
+        self.assertEqual(forest_summary(load_forest_snapshot(self.file)), forest_summary(forest))
+
+    def test_corruption_detected(self):
+        forest = ForestGraph()
+        forest.bulk_insert([TreeNode(1, 'Oak', 1), TreeNode(2, 'Pine', 2)])
+        save_forest_snapshot(forest, self.file)
+        with open(self.file, 'r+b') as handle:
+            data_offset = _PREFIX.unpack(handle.read(_PREFIX.size))[-1]
+            handle.seek(data_offset)
+            first = handle.read(1)
+            handle.seek(data_offset)
+            handle.write(bytes([first[0] ^ 0xFF]))
+        load_snapshot(self.file)  # 默认不校验数据区
+        with self.assertRaises(ValueError):
+            load_forest_snapshot(self.file)
+
+        with open(self.file, 'r+b') as handle:
+            handle.write(b'NOTASNAP')
+        with self.assertRaises(ValueError):
+            load_snapshot(self.file)
+
+    def test_rejects_non_numeric_ids(self):
+        forest = ForestGraph()
+        forest.add_tree(TreeNode('a', 'Oak', 1))
+        with self.assertRaises(ValueError):
+            save_forest_snapshot(forest, self.file)
+
+if __name__ == '__main__':
+    unittest.main()
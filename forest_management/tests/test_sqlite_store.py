@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.utils.sqlite_store import SQLiteForestStore, open_persistent_forest
+
+def forest_summary(forest):
+    return [(tree.tree_id, tree.species, tree.age, tree.health_status,
+             [(path.tree1.tree_id, path.tree2.tree_id, path.distance) for path in paths])
+            for tree, paths in forest.adjacency.items()]
+
+class TestSQLiteForestStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = os.path.join(self.tmpdir.name, 'forest.db')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def build(self, forest):
+        trees = [TreeNode(i, 'Oak' if i % 2 else 'Pine', i * 10) for i in range(1, 6)]
+        for tree in trees:
+            forest.add_tree(tree)
+        forest.add_path(TreePath(trees[0], trees[1], 1.0))
+        forest.add_path(TreePath(trees[2], trees[0], 2.0))
+        forest.add_path(TreePath(trees[1], trees[2], 3.0))
+        forest.add_path(TreePath(trees[3], trees[4], 4.0))
+        forest.update_tree_health(trees[2], HealthStatus.INFECTED)
+        forest.update_tree_attributes(trees[3], 'Birch', 41)
+        forest.update_path_distance(forest.adjacency[trees[1]][1], 3.5)
+        forest.remove_path(forest.adjacency[trees[3]][0])
+        forest.remove_tree(trees[4])
+        return trees
+
+    def test_write_through_and_warm_start(self):
+        forest, store = open_persistent_forest(self.db)
+        self.build(forest)
+        # 直写模式下每次修改都已提交，另一个连接不需要等 close 就能读到
+        with sqlite3.connect(self.db) as other:
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM paths").fetchone()[0], 3)
+        store.close()
+
+        restored, store = open_persistent_forest(self.db)
+        self.assertEqual(forest_summary(restored), forest_summary(forest))
+        self.assertEqual(store.counts(), {'trees': 4, 'paths': 3})
+        store.close()
+
+    def test_batched_writes(self):
+        forest = ForestGraph()
+        store = SQLiteForestStore(self.db, batch_size=100)
+        store.attach(forest)
+        self.build(forest)
+        with sqlite3.connect(self.db) as other:
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM trees").fetchone()[0], 0)
+        store.flush()
+        with sqlite3.connect(self.db) as other:
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM trees").fetchone()[0], 4)
+        self.assertEqual(forest_summary(store.load_forest()), forest_summary(forest))
+        self.assertEqual(store._conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        store.close()
+
+    def test_indexed_queries(self):
+        forest, store = open_persistent_forest(self.db)
+        self.build(forest)
+        self.assertEqual([row['tree_id'] for row in store.trees_by_species('Oak')], [1, 3])
+        self.assertEqual([row['tree_id'] for row in store.trees_by_health(HealthStatus.INFECTED)], [3])
+        self.assertEqual(store.get_tree(4)['species'], 'Birch')
+        self.assertIsNone(store.get_tree(5))
+        self.assertEqual(store.neighbors(1), [(2, 1.0), (3, 2.0)])
+        self.assertEqual(store.neighbors(3), [(1, 2.0), (2, 3.5)])
+        plan = store._conn.execute("EXPLAIN QUERY PLAN SELECT * FROM paths WHERE tree_1 = 1").fetchall()
+        self.assertIn('paths_tree_1', str(plan))
+        store.close()
+
+    def test_reset_rewrites_tables(self):
+        forest, store = open_persistent_forest(self.db)
+        self.build(forest)
+        replacement = ForestGraph()
+        a, b = TreeNode(10, 'Oak', 1), TreeNode(11, 'Oak', 2)
+        replacement.bulk_insert([a, b], [TreePath(a, b, 9.0)])
+        forest.reset(replacement.adjacency)
+        self.assertEqual(store.counts(), {'trees': 2, 'paths': 1})
+        forest.reset()
+        self.assertEqual(store.counts(), {'trees': 0, 'paths': 0})
+        store.close()
+        self.assertNotIn(store, forest.listeners)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from forest_management.core.tree_node import HealthStatus
+from forest_management.utils.validation_report import validate_forest_data
+
+class TestValidationReport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        self.path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, trees, paths):
+        pd.DataFrame(trees).to_csv(self.tree_file, index=False)
+        pd.DataFrame(paths).to_csv(self.path_file, index=False)
+
+    def test_collects_all_errors(self):
+        self.write({
+            'tree_id': [1, 2, 3, 2, 4, 5],
+            'species': ['Oak'] * 6,
+            'age': [1, 2, 3, 4, 5, 6],
+            'health_status': ['HEALTHY', 'INFECTED', 'DEAD', 'HEALTHY', 'at risk', None],
+        }, {
+            'tree_1': [1, 1, 2, 1, 4, 'x', 2, 1],
+            'tree_2': [2, 3, 2, 4, 1, 2, 1, 9],
+            'distance': [1.0, 1.0, 1.0, 0.0, 2.0, 1.0, 1.0, 1.0],
+        })
+        report = validate_forest_data(self.tree_file, self.path_file)
+        self.assertFalse(report.is_valid)
+        df = report.to_dataframe()
+        self.assertEqual(list(df.columns), ['file', 'row', 'line', 'error_type', 'value', 'message'])
+        trees = df[df['file'] == 'trees']
+        self.assertEqual(list(zip(trees['row'], trees['error_type'])),
+                         [(2, 'invalid_health_status'), (5, 'invalid_health_status'), (3, 'duplicate_tree_id')])
+        self.assertEqual(trees['line'].tolist(), [4, 7, 5])
+        paths = df[df['file'] == 'paths'].sort_values('row')
+        self.assertEqual(paths['error_type'].tolist(),
+                         ['missing_endpoint', 'self_loop', 'non_positive_distance', 'invalid_value',
+                          'duplicate_path', 'missing_endpoint'])
+        self.assertEqual(report.missing_endpoint_ids, [3, 9])
+        self.assertEqual(report.duplicate_tree_ids, [2])
+        self.assertEqual(report.duplicate_paths, [(1, 2, 1.0)])
+        self.assertEqual(report.counts()['missing_endpoint'], 2)
+        self.assertIn("9 invalid rows", report.summary())
+        self.assertIsNone(report.forest)
+
+    def test_load_valid_subset(self):
+        self.write({
+            'tree_id': [1, 2, 3, 3],
+            'species': ['Oak', 'Pine', 'Oak', 'Birch'],
+            'age': [1, 2, 3, 4],
+            'health_status': ['HEALTHY', 'DEAD', 'INFECTED', 'HEALTHY'],
+        }, {'tree_1': [1, 1, 3], 'tree_2': [2, 3, 3], 'distance': [1.0, 2.0, 1.0]})
+        report = validate_forest_data(self.tree_file, self.path_file, load_valid=True)
+        forest = report.forest
+        trees = {tree.tree_id: tree for tree in forest.adjacency}
+        self.assertEqual(sorted(trees), [1, 3])
+        self.assertEqual(trees[3].health_status, HealthStatus.INFECTED)
+        self.assertEqual(sum(len(paths) for paths in forest.adjacency.values()), 2)
+        self.assertEqual(report.missing_endpoint_ids, [2])
+
+    def test_valid_and_missing_column(self):
+        self.write({'tree_id': [1], 'species': ['Oak'], 'age': [1], 'health_status': ['HEALTHY']},
+                   {'tree_1': [], 'tree_2': [], 'distance': []})
+        report = validate_forest_data(self.tree_file, self.path_file, load_valid=True)
+        self.assertTrue(report.is_valid)
+        self.assertEqual(len(report.forest.adjacency), 1)
+
+        self.write({'tree_id': [1], 'species': ['Oak'], 'health_status': ['HEALTHY']},
+                   {'tree_1': [1], 'tree_2': [1], 'distance': [1.0]})
+        report = validate_forest_data(self.tree_file, self.path_file, load_valid=True)
+        first = report.to_dataframe().iloc[0]
+        self.assertEqual((first['error_type'], first['value']), ('missing_column', 'age'))
+        self.assertTrue(pd.isna(first['row']))
+        self.assertEqual(len(report.forest.adjacency), 0)
+        self.assertEqual(report.missing_endpoint_ids, [1])
+
+    def test_lines_count_blank_lines_and_quoted_newlines(self):
+        with open(self.tree_file, 'w', newline='') as handle:
+            handle.write('tree_id,species,age,health_status\n'
+                         '\n'
+                         '1,"Oak,\nold growth",1,HEALTHY\n'
+                         '2,Pine,2,DEAD\n'
+                         '\n'
+                         '\n'
+                         '3,"""Red""\nMaple",3,HEALTHY\n'
+                         '3,Birch,4,HEALTHY\n')
+        pd.DataFrame({'tree_1': [1], 'tree_2': [2], 'distance': [1.0]}).to_csv(self.path_file, index=False)
+        errors = validate_forest_data(self.tree_file, self.path_file).to_dataframe()
+        trees = errors[errors['file'] == 'trees']
+        self.assertEqual(list(zip(trees['row'], trees['line'])), [(1, 5), (3, 10)])
+        self.assertEqual(errors[errors['file'] == 'paths']['line'].tolist(), [2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from forest_management.core.forest_graph import ForestGraph, ForestListener, TreeNode, TreePath, HealthStatus
+from forest_management.utils.data_loader import (load_forest_data, load_forest_data_chunked, estimate_chunk_rows,
+                                                 load_forest_data_parallel, split_csv_by_bytes)
+
+class TestVectorizedLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.trees = pd.DataFrame({
+            'tree_id': [1, 2, 3, 4],
+            'species': ['Oak', 'Pine', 'Maple', 'Oak'],
+            'age': [50, 30, 40, 20],
+            'health_status': ['healthy', 'at risk', 'INFECTED', 'Healthy'],
+        })
+        self.paths = pd.DataFrame({
+            'tree_1': [1, 2, 3],
+            'tree_2': [2, 3, 4],
+            'distance': [10.5, 15.2, 3.0],
+        })
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def load(self, trees=None, paths=None):
+        tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        (self.trees if trees is None else trees).to_csv(tree_file, index=False)
+        (self.paths if paths is None else paths).to_csv(path_file, index=False)
+        return load_forest_data(tree_file, path_file)
+
+    def test_values_and_types(self):
+        forest = self.load()
+        trees = {tree.tree_id: tree for tree in forest.adjacency}
+        self.assertEqual(list(trees), [1, 2, 3, 4])
+        self.assertEqual(trees[2].health_status, HealthStatus.AT_RISK)
+        self.assertEqual(trees[4].health_status, HealthStatus.HEALTHY)
+        self.assertIs(type(trees[1].tree_id), int)
+        self.assertIs(type(trees[1].age), int)
+        self.assertEqual(trees[3].species, 'Maple')
+        path = forest.adjacency[trees[1]][0]
+        self.assertEqual((path.tree2.tree_id, path.distance), (2, 10.5))
+        self.assertIs(type(path.distance), float)
+        self.assertEqual(sum(len(edges) for edges in forest.adjacency.values()), 6)
+
+    def test_duplicate_tree_id(self):
+        trees = pd.concat([self.trees, self.trees.iloc[[1]]], ignore_index=True)
+        with self.assertRaises(ValueError) as cm:
+            self.load(trees=trees)
+        self.assertIn("Error parsing tree row", str(cm.exception))
+        self.assertIn("树已存在于森林中", str(cm.exception))
+
+    def test_earliest_row_reported(self):
+        trees = self.trees.copy()
+        trees.loc[3, 'health_status'] = 'DEAD'
+        trees.loc[2, 'tree_id'] = 1
+        with self.assertRaises(ValueError) as cm:
+            self.load(trees=trees)
+        self.assertIn("树已存在于森林中", str(cm.exception))
+        self.assertNotIn("DEAD", str(cm.exception))
+
+    def test_path_errors(self):
+        cases = [
+            ({'tree_1': [1, 2], 'tree_2': [2, 2], 'distance': [1.0, 2.0]}, "路径不能连接同一棵树"),
+            ({'tree_1': [1, 2], 'tree_2': [2, 3], 'distance': [1.0, 0.0]}, "距离必须大于0"),
+            ({'tree_1': [1, 2], 'tree_2': [2, 1], 'distance': [1.0, 1.0]}, "路径已存在"),
+            ({'tree_1': [1, 'x'], 'tree_2': [2, 3], 'distance': [1.0, 1.0]}, "Error parsing path row"),
+            ({'tree_1': [1, 2], 'tree_2': [5, 7], 'distance': [1.0, 1.0]}, "Tree ID 5 not found"),
+        ]
+        for data, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaises(ValueError) as cm:
+                    self.load(paths=pd.DataFrame(data))
+                self.assertIn(message, str(cm.exception))
+
+    def test_parallel_paths_with_different_distance(self):
+        paths = pd.DataFrame({'tree_1': [1, 2], 'tree_2': [2, 1], 'distance': [1.0, 2.0]})
+        forest = self.load(paths=paths)
+        tree = next(iter(forest.adjacency))
+        self.assertEqual(len(forest.adjacency[tree]), 2)
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError) as cm:
+            self.load(trees=self.trees.drop(columns=['age']))
+        self.assertIn("'age'", str(cm.exception))
+
+def adjacency_summary(forest):
+    return {tree.tree_id: (tree.species, tree.age, tree.health_status,
+                           sorted((path.tree1.tree_id, path.tree2.tree_id, path.distance) for path in paths))
+            for tree, paths in forest.adjacency.items()}
+
+class TestChunkedLoader(TestVectorizedLoader):
+    def load(self, trees=None, paths=None, **kwargs):
+        tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        (self.trees if trees is None else trees).to_csv(tree_file, index=False)
+        (self.paths if paths is None else paths).to_csv(path_file, index=False)
+        kwargs.setdefault('chunk_rows', 1)
+        return load_forest_data_chunked(tree_file, path_file, **kwargs)
+
+    def test_matches_full_loader(self):
+        expected = adjacency_summary(TestVectorizedLoader.load(self))
+        for chunk_rows in (1, 2, 100):
+            with self.subTest(chunk_rows=chunk_rows):
+                self.assertEqual(adjacency_summary(self.load(chunk_rows=chunk_rows)), expected)
+
+    def test_progress(self):
+        calls = []
+        self.load(chunk_rows=2, progress=lambda *args: calls.append(args))
+        self.assertEqual([(stage, rows) for stage, rows, _ in calls],
+                         [('trees', 2), ('trees', 4), ('paths', 2), ('paths', 3)])
+        self.assertEqual(calls[-1][2], 1.0)
+
+    def test_memory_cap_sets_chunk_rows(self):
+        path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        pd.DataFrame({'tree_1': range(5000), 'tree_2': range(1, 5001),
+                      'distance': [1.0] * 5000}).to_csv(path_file, index=False)
+        small = estimate_chunk_rows(path_file, max_memory=10_000)
+        large = estimate_chunk_rows(path_file, max_memory=10_000_000)
+        self.assertLess(small, large)
+        self.assertLess(small, 1000)
+
+class TestParallelLoader(TestVectorizedLoader):
+    def load(self, trees=None, paths=None, workers=2):
+        tree_file = os.path.join(self.tmpdir.name, 'trees.csv')
+        path_file = os.path.join(self.tmpdir.name, 'paths.csv')
+        (self.trees if trees is None else trees).to_csv(tree_file, index=False)
+        (self.paths if paths is None else paths).to_csv(path_file, index=False)
+        return load_forest_data_parallel(tree_file, path_file, workers=workers)
+
+    def test_byte_range_shards_cover_file(self):
+        path_file = os.path.join(self.tmpdir.name, 'big.csv')
+        pd.DataFrame({'tree_1': range(1000), 'tree_2': range(1, 1001),
+                      'distance': [1.5] * 1000}).to_csv(path_file, index=False)
+        shards = split_csv_by_bytes(path_file, 7)
+        self.assertEqual(len(shards), 7)
+        for (_, _, end), (_, start, _) in zip(shards, shards[1:]):
+            self.assertEqual(end, start)
+        with open(path_file, 'rb') as handle:
+            data = handle.read()
+        for _, start, _ in shards:
+            self.assertEqual(data[start - 1:start], b'\n')
+        self.assertEqual(shards[-1][2], len(data))
+
+    def test_matches_full_loader(self):
+        expected = adjacency_summary(TestVectorizedLoader.load(self))
+        for workers in (1, 3, 8):
+            with self.subTest(workers=workers):
+                self.assertEqual(adjacency_summary(self.load(workers=workers)), expected)
+
+    def test_shard_file_lists(self):
+        tree_files, path_files = [], []
+        for i, (trees, paths) in enumerate([(self.trees.iloc[:2], self.paths.iloc[:1]),
+                                            (self.trees.iloc[2:], self.paths.iloc[1:])]):
+            tree_files.append(os.path.join(self.tmpdir.name, f'trees_{i}.csv'))
+            path_files.append(os.path.join(self.tmpdir.name, f'paths_{i}.csv'))
+            trees.to_csv(tree_files[-1], index=False)
+            paths.to_csv(path_files[-1], index=False)
+        forest = load_forest_data_parallel(tree_files, path_files, workers=2)
+        self.assertEqual(adjacency_summary(forest), adjacency_summary(TestVectorizedLoader.load(self)))
+
+        # 第二个分片中的路径引用了第一个分片中的树，重复的树ID跨分片也能检测到
+        self.trees.iloc[:1].to_csv(tree_files[1], index=False)
+        with self.assertRaises(ValueError) as cm:
+            load_forest_data_parallel(tree_files, path_files, workers=2)
+        self.assertIn("树已存在于森林中", str(cm.exception))
+
+class TestBulkInsert(unittest.TestCase):
+    def test_single_reset_notification(self):
+        events = []
+
+        class Recorder(ForestListener):
+            def on_tree_added(self, tree):
+                events.append('tree')
+
+            def on_reset(self):
+                events.append('reset')
+
+        forest = ForestGraph()
+        forest.add_listener(Recorder())
+        a, b = TreeNode(1, 'Oak', 1), TreeNode(2, 'Oak', 1)
+        forest.bulk_insert([a, b], [TreePath(a, b, 1.0)])
+        self.assertEqual(events, ['reset'])
+        self.assertEqual(forest.version, 1)
+        self.assertEqual(len(forest.adjacency[a]), 1)
+
+    def test_rejects_existing_tree(self):
+        forest = ForestGraph()
+        forest.add_tree(TreeNode(1, 'Oak', 1))
+        with self.assertRaises(ValueError):
+            forest.bulk_insert([TreeNode(1, 'Pine', 2)])
+
+    def test_invalid_batch_leaves_forest_unchanged(self):
+        forest = ForestGraph()
+        a, b, ghost = TreeNode(1, 'Oak', 1), TreeNode(2, 'Oak', 1), TreeNode(3, 'Oak', 1)
+        for paths in ([TreePath(a, b, 1.0), TreePath(a, ghost, 2.0)],
+                      [TreePath(a, b, 1.0), TreePath(b, a, 1.0)]):
+            with self.assertRaises(ValueError):
+                forest.bulk_insert([a, b], paths)
+            self.assertEqual((forest.adjacency, forest.version), ({}, 0))
+        # 修正后重试可以成功
+        forest.bulk_insert([a, b], [TreePath(a, b, 1.0)])
+        self.assertEqual(forest.version, 1)
+        with self.assertRaises(ValueError):
+            forest.bulk_insert([ghost], [TreePath(ghost, a, 3.0), TreePath(b, a, 1.0)])
+        self.assertNotIn(ghost, forest.adjacency)
+        self.assertEqual(forest.version, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import csv
+import gzip
+import io
+from itertools import islice
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.utils.data_loader import TREE_COLUMNS, PATH_COLUMNS
+
+# 流式输出时每次编码并产出的行数
+EXPORT_BATCH_ROWS = 10000
+
+
+def iter_forest_trees(forest: ForestGraph, chunk_size: int = EXPORT_BATCH_ROWS):
+    """按插入顺序逐块遍历森林中的树，每次只复制 chunk_size 棵树，内存占用与森林大小无关
+
+    导出期间森林中增删了树木时（字典迭代器失效），从上一块中仍在森林里的最后一棵树之后继续；
+    整块都已被删除时按已产出的数量跳过。导出期间新增的树也会被产出，已复制的块中随后被删除的树
+    仍会产出，由调用方跳过。
+    """
+    adjacency = forest.adjacency
+    iterator = iter(adjacency)
+    previous, count = [], 0
+    while True:
+        try:
+            # 在 C 代码中一次复制一块，不会与其他线程对森林的修改交错
+            chunk = list(islice(iterator, chunk_size))
+        except RuntimeError:
+            iterator = iter(adjacency)
+            try:
+                anchor = next((tree for tree in reversed(previous) if tree in adjacency), None)
+                if anchor is not None:
+                    for tree in iterator:
+                        if tree is anchor:
+                            break
+                else:
+                    for _ in islice(iterator, count):
+                        pass
+            except RuntimeError:
+                pass  # 重新定位期间森林再次被修改，下一轮重试
+            continue
+        if not chunk:
+            return
+        previous, count = chunk, count + len(chunk)
+        yield from chunk
+
+
+def iter_tree_rows(forest: ForestGraph, trees=None):
+    """逐行产出树木数据，列顺序与 TREE_COLUMNS 一致
+
+    Args:
+        forest: 森林图对象
+        trees: 要导出的树（默认为森林中的全部树，按插入顺序）；导出期间已被删除的树会跳过
+    """
+    adjacency = forest.adjacency
+    for tree in adjacency if trees is None else trees:
+        if tree in adjacency:
+            yield tree.tree_id, tree.species, tree.age, tree.health_status.name
+
+
+def iter_path_rows(forest: ForestGraph, trees=None):
+    """逐行产出路径数据，列顺序与 PATH_COLUMNS 一致，每条路径只产出一次"""
+    adjacency = forest.adjacency
+    for tree in adjacency if trees is None else trees:
+        # adjacency 是 defaultdict，不能用下标访问已被删除的树，否则会把它重新加回森林
+        for path in adjacency.get(tree, ()):
+            if path.tree1 == tree:
+                yield path.tree1.tree_id, path.tree2.tree_id, path.distance
+
+
+def _rows(forest: ForestGraph, kind: str, trees=None):
+    if kind == 'trees':
+        return TREE_COLUMNS, iter_tree_rows(forest, trees)
+    if kind == 'paths':
+        return PATH_COLUMNS, iter_path_rows(forest, trees)
+    raise ValueError(f"未知的导出类型: {kind}")
+
+
+def write_forest_csv(forest: ForestGraph, kind: str, file_path, compress: bool = None) -> int:
+    """把树木或路径逐行写入CSV文件，内存占用与森林大小无关
+
+    Args:
+        forest: 森林图对象
+        kind: 'trees' 或 'paths'
+        file_path: 输出文件路径
+        compress: 是否使用 gzip 压缩（默认根据文件名是否以 .gz 结尾决定）
+
+    Returns:
+        写入的数据行数
+    """
+    header, rows = _rows(forest, kind)
+    if compress is None:
+        compress = str(file_path).endswith('.gz')
+    opener = gzip.open if compress else open
+    count = 0
+    with opener(file_path, 'wt', newline='', encoding='utf-8') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def export_forest_data(forest: ForestGraph, tree_file_path, path_file_path, compress: bool = None) -> dict:
+    """导出森林为 load_forest_data 可读取的树木和路径CSV文件
+
+    Returns:
+        {'trees': 树木行数, 'paths': 路径行数}
+    """
+    return {
+        'trees': write_forest_csv(forest, 'trees', tree_file_path, compress),
+        'paths': write_forest_csv(forest, 'paths', path_file_path, compress),
+    }
+
+
+def iter_csv_bytes(forest: ForestGraph, kind: str, compress: bool = False, trees=None,
+                   batch_rows: int = EXPORT_BATCH_ROWS):
+    """以字节块的形式流式产出CSV内容，用于HTTP下载
+
+    每批 batch_rows 行编码一次；压缩时使用同一个 gzip 流，所有块拼接起来是一个完整的 .gz 文件。
+
+    Args:
+        forest: 森林图对象
+        kind: 'trees' 或 'paths'
+        compress: 是否使用 gzip 压缩
+        trees: 要导出的树（默认为森林中的全部树）
+        batch_rows: 每个块包含的行数
+    """
+    header, rows = _rows(forest, kind, trees)
+    text = io.StringIO()
+    writer = csv.writer(text)
+    sink = io.BytesIO()
+    compressor = gzip.GzipFile(fileobj=sink, mode='wb') if compress else None
+
+    def flush(final=False):
+        data = text.getvalue().encode('utf-8')
+        text.seek(0)
+        text.truncate()
+        if compressor is None:
+            return data
+        compressor.write(data)
+        if final:
+            compressor.close()
+        chunk = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return chunk
+
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_rows:
+            chunk = flush()
+            pending = 0
+            if chunk:
+                yield chunk
+    chunk = flush(final=True)
+    if chunk:
+        yield chunk
@@ -1,42 +1,390 @@
+import io
+import os
+import numpy as np
 import pandas as pd
 from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.utils.parallel import map_in_pool
+from forest_management.utils.parse_cache import ParseCache, parse_cache
 
-def load_forest_data(tree_file_path, path_file_path):
-    forest = ForestGraph()
-    
-    # 加载树木数据
+TREE_COLUMNS = ['tree_id', 'species', 'age', 'health_status']
+PATH_COLUMNS = ['tree_1', 'tree_2', 'distance']
+
+# 分块加载时每个数据块（含转换过程中的临时数组）允许占用的内存上限
+DEFAULT_CHUNK_MEMORY = 64 * 1024 * 1024
+# 估算每行内存占用时读取的样本行数，以及临时数组相对 DataFrame 本身的放大系数
+_SAMPLE_ROWS = 1000
+_WORKING_SET_FACTOR = 4
+
+# 健康状态字符串到 HealthStatus 的映射（已规范化为大写、下划线）
+_HEALTH_BY_NAME = {status.name: status for status in HealthStatus}
+
+
+def read_forest_csv(file_path, **kwargs) -> pd.DataFrame:
+    """读取森林CSV文件；浮点数按最短往返表示精确解析，导出后再导入的距离与原值完全相同"""
+    return pd.read_csv(file_path, float_precision='round_trip', **kwargs)
+
+
+def normalize_health(values: pd.Series) -> pd.Series:
+    """把健康状态列规范化为 HealthStatus 枚举值的编号，无法识别的值为 NaN"""
+    names = values.astype(str).str.upper().str.replace(" ", "_", regex=False)
+    return names.map({name: status.value for name, status in _HEALTH_BY_NAME.items()})
+
+
+def _missing_columns(df: pd.DataFrame, columns) -> list:
+    return [column for column in columns if column not in df.columns]
+
+
+def tree_checks(trees_df: pd.DataFrame, known_ids=None) -> list[tuple[str, np.ndarray, callable]]:
+    """按逐行加载时的检查顺序，对整张树木表做向量化校验
+
+    Args:
+        trees_df: 树木数据
+        known_ids: 之前已经加载的树ID的容器（用于分块加载时的跨块重复检测）
+
+    Returns:
+        [(错误类型, 出错行的布尔掩码, 根据行号生成错误信息的函数)]
+    """
+    n = len(trees_df)
+    missing = _missing_columns(trees_df, TREE_COLUMNS)
+    if missing:
+        return [('missing_column', np.ones(n, dtype=bool), lambda i: repr(missing[0]))]
+
+    health = normalize_health(trees_df['health_status'])
+    invalid_health = health.isna().to_numpy()
+    # 只在健康状态有效的行之间判重，与逐行加载时无效行不会被加入森林一致
+    ids = trees_df['tree_id']
+    valid = ~invalid_health
+    duplicate = np.zeros(n, dtype=bool)
+    duplicate[valid] = ids[valid].duplicated().to_numpy()
+    if known_ids:
+        duplicate |= valid & np.array([tree_id in known_ids for tree_id in ids.tolist()], dtype=bool)
+    return [
+        ('invalid_health_status', invalid_health,
+         lambda i: f"Invalid health status value: {trees_df['health_status'].iloc[i]}"),
+        ('duplicate_tree_id', duplicate, lambda i: "树已存在于森林中"),
+    ]
+
+
+def coerce_path_columns(paths_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """把路径表的端点转换为整数、距离转换为浮点数
+
+    Returns:
+        (tree_1, tree_2, distance, 无法转换的行掩码)
+    """
+    raw_1 = pd.to_numeric(paths_df['tree_1'], errors='coerce').to_numpy(dtype=np.float64)
+    raw_2 = pd.to_numeric(paths_df['tree_2'], errors='coerce').to_numpy(dtype=np.float64)
+    distance = pd.to_numeric(paths_df['distance'], errors='coerce').to_numpy(dtype=np.float64)
+    invalid = ~(np.isfinite(raw_1) & np.isfinite(raw_2) & np.isfinite(distance))
+    tree_1 = np.trunc(np.where(invalid, 0, raw_1)).astype(np.int64)
+    tree_2 = np.trunc(np.where(invalid, 0, raw_2)).astype(np.int64)
+    return tree_1, tree_2, distance, invalid
+
+
+def path_checks(paths_df: pd.DataFrame, tree_ids, forest: ForestGraph = None) -> list[tuple[str, np.ndarray, callable]]:
+    """按逐行加载时的检查顺序，对整张路径表做向量化校验
+
+    Args:
+        paths_df: 路径数据
+        tree_ids: 森林中已有的树ID（传入 pd.Index 可在多次调用间复用其哈希表）
+        forest: 已经插入了之前数据块的森林（用于分块加载时的跨块重复检测）
+
+    Returns:
+        [(错误类型, 出错行的布尔掩码, 根据行号生成错误信息的函数)]
+    """
+    n = len(paths_df)
+    missing = _missing_columns(paths_df, PATH_COLUMNS)
+    if missing:
+        return [('missing_column', np.ones(n, dtype=bool), lambda i: repr(missing[0]))]
+
+    tree_1, tree_2, distance, invalid = coerce_path_columns(paths_df)
+    tree_ids = tree_ids if isinstance(tree_ids, pd.Index) else pd.Index(tree_ids)
+    missing_1 = ~invalid & (tree_ids.get_indexer(tree_1) < 0)
+    missing_2 = ~invalid & ~missing_1 & (tree_ids.get_indexer(tree_2) < 0)
+    ok = ~(invalid | missing_1 | missing_2)
+    self_loop = ok & (tree_1 == tree_2)
+    ok &= ~self_loop
+    non_positive = ok & (distance <= 0)
+    ok &= ~non_positive
+
+    # 无向路径：端点排序后与距离一起作为键，只在前面检查都通过的行之间判重
+    low, high = np.minimum(tree_1, tree_2), np.maximum(tree_1, tree_2)
+    keys = pd.DataFrame({'low': low, 'high': high, 'distance': distance})
+    duplicate = np.zeros(n, dtype=bool)
+    duplicate[ok] = keys[ok].duplicated().to_numpy()
+    if forest is not None and forest.adjacency:
+        # TreeNode 按 tree_id 判等，用同ID的临时节点即可查到森林中的邻接表
+        rows = np.flatnonzero(ok & ~duplicate)
+        for i, a, b, d in zip(rows.tolist(), low[rows].tolist(), high[rows].tolist(), distance[rows].tolist()):
+            duplicate[i] = any(path.distance == d and (path.tree1.tree_id == b or path.tree2.tree_id == b)
+                               for path in forest.adjacency.get(TreeNode(a, None, None), ()))
+
+    return [
+        ('invalid_value', invalid,
+         lambda i: f"could not convert row values: {paths_df.iloc[i].to_dict()}"),
+        ('missing_endpoint', missing_1 | missing_2,
+         lambda i: f"Tree ID {tree_1[i] if missing_1[i] else tree_2[i]} not found in forest nodes, skipping path."),
+        ('self_loop', self_loop, lambda i: "路径不能连接同一棵树"),
+        ('non_positive_distance', non_positive, lambda i: "距离必须大于0"),
+        ('duplicate_path', duplicate, lambda i: "路径已存在"),
+    ]
+
+
+def first_error(checks) -> tuple:
+    """找出最早出错的行及该行按检查顺序的第一个错误
+
+    Returns:
+        (行号, 错误类型, 错误信息)，没有错误时返回 None
+    """
+    best = None
+    for error_type, mask, message in checks:
+        rows = np.flatnonzero(mask)
+        if len(rows) and (best is None or rows[0] < best[0]):
+            best = (int(rows[0]), error_type, message)
+    if best is None:
+        return None
+    row, error_type, message = best
+    return row, error_type, message(row)
+
+
+def build_trees(trees_df: pd.DataFrame) -> list[TreeNode]:
+    """由已校验的树木表批量创建 TreeNode"""
+    statuses = list(HealthStatus)
+    codes = normalize_health(trees_df['health_status']).astype(np.int64).tolist()
+    return [TreeNode(tree_id, species, age, statuses[code - 1])
+            for tree_id, species, age, code in zip(trees_df['tree_id'].tolist(),
+                                                   trees_df['species'].tolist(),
+                                                   trees_df['age'].tolist(), codes)]
+
+
+def build_paths(paths_df: pd.DataFrame, tree_by_id: dict) -> list[TreePath]:
+    """由已校验的路径表批量创建 TreePath"""
+    tree_1, tree_2, distance, _ = coerce_path_columns(paths_df)
+    return [TreePath(tree_by_id[a], tree_by_id[b], d)
+            for a, b, d in zip(tree_1.tolist(), tree_2.tolist(), distance.tolist())]
+
+
+def parse_trees(trees_df: pd.DataFrame, known_ids=None) -> list[TreeNode]:
+    """校验并创建树木，出错时以第一处错误抛出 ValueError"""
+    error = first_error(tree_checks(trees_df, known_ids))
+    if error:
+        row, _, message = error
+        raise ValueError(f"Error parsing tree row: {trees_df.iloc[row].to_dict()} - {message}")
+    return build_trees(trees_df)
+
+
+def parse_paths(paths_df: pd.DataFrame, tree_by_id: dict, forest: ForestGraph = None,
+                tree_ids: pd.Index = None) -> list[TreePath]:
+    """校验并创建路径，出错时以第一处错误抛出 ValueError"""
+    if tree_ids is None:
+        tree_ids = pd.Index(list(tree_by_id))
+    error = first_error(path_checks(paths_df, tree_ids, forest))
+    if error:
+        row, _, message = error
+        raise ValueError(f"Error parsing path row: {paths_df.iloc[row].to_dict()} - {message}")
+    return build_paths(paths_df, tree_by_id)
+
+
+def load_forest_data(tree_file_path, path_file_path, use_cache: bool = None, cache: ParseCache = None):
+    """从树木和路径CSV文件加载森林
+
+    校验、类型转换、重复检测和端点检查都以整列的向量化运算完成，
+    全部通过后一次性批量插入 ForestGraph。出错时报告文件中最早出错的一行。
+
+    启用解析缓存时，解析结果按文件内容哈希、大小和修改时间缓存在磁盘上，再次加载未改变的文件时
+    直接读取缓存的二进制快照，跳过解析和校验。计算键需要完整读取一遍两个文件，因此缓存默认关闭。
+
+    Args:
+        tree_file_path: 树木CSV文件路径
+        path_file_path: 路径CSV文件路径
+        use_cache: 是否使用解析缓存；默认（None）只在传入 cache 或设置了环境变量
+            FOREST_PARSE_CACHE_DIR 时使用
+        cache: 使用的解析缓存，默认为模块级的 parse_cache
+    """
+    if use_cache is None:
+        use_cache = cache is not None or bool(os.environ.get('FOREST_PARSE_CACHE_DIR'))
+    cache = cache if cache is not None else parse_cache
+    try:
+        key = cache.key(tree_file_path, path_file_path) if use_cache else None
+        if key is not None:
+            forest = cache.get(key)
+            if forest is not None:
+                return forest
+
+        trees_df = read_forest_csv(tree_file_path)
+        trees = parse_trees(trees_df)
+        tree_by_id = {tree.tree_id: tree for tree in trees}
+
+        paths_df = read_forest_csv(path_file_path)
+        paths = parse_paths(paths_df, tree_by_id)
+
+        forest = ForestGraph()
+        forest.bulk_insert(trees, paths, validated=True)
+    except Exception as e:
+        raise ValueError(f"Failed to load forest data: {str(e)}")
+
+    if key is not None:
+        cache.put(key, forest)
+    return forest
+
+
+def estimate_chunk_rows(file_path, max_memory: int = DEFAULT_CHUNK_MEMORY) -> int:
+    """根据样本行的内存占用估算每个数据块的行数，使数据块的处理内存不超过 max_memory"""
+    sample = read_forest_csv(file_path, nrows=_SAMPLE_ROWS)
+    if sample.empty:
+        return _SAMPLE_ROWS
+    row_bytes = sample.memory_usage(index=False, deep=True).sum() / len(sample) * _WORKING_SET_FACTOR
+    return max(1, int(max_memory // row_bytes))
+
+
+def _read_chunks(file_path, chunk_rows: int):
+    """逐块读取CSV，同时返回已读取的字节比例"""
+    total = os.path.getsize(file_path)
+    with open(file_path, 'rb') as handle:
+        for chunk in read_forest_csv(handle, chunksize=chunk_rows):
+            yield chunk, (handle.tell() / total if total else 1.0)
+
+
+def load_forest_data_chunked(tree_file_path, path_file_path, max_memory: int = DEFAULT_CHUNK_MEMORY,
+                             chunk_rows: int = None, progress=None) -> ForestGraph:
+    """分块流式加载森林，适用于超出内存的大型CSV文件
+
+    两个文件都按数据块读取，每块校验后立即插入森林，峰值内存为森林本身加上一个数据块。
+    校验规则和错误信息与 load_forest_data 相同：树ID和路径的重复检测跨数据块进行，
+    出错时报告文件中最早出错的一行。
+
+    Args:
+        tree_file_path: 树木CSV文件路径
+        path_file_path: 路径CSV文件路径
+        max_memory: 每个数据块允许使用的内存（字节），用于估算数据块行数
+        chunk_rows: 直接指定数据块行数（优先于 max_memory）
+        progress: 进度回调 progress(stage, rows, fraction)，stage 为 'trees' 或 'paths'，
+            rows 为该文件已加载的行数，fraction 为已读取的字节比例
+
+    Returns:
+        加载完成的森林
+    """
+    try:
+        forest = ForestGraph()
+        tree_by_id = {}
+        rows = 0
+        tree_rows = chunk_rows or estimate_chunk_rows(tree_file_path, max_memory)
+        for chunk, fraction in _read_chunks(tree_file_path, tree_rows):
+            trees = parse_trees(chunk, tree_by_id)
+            forest.bulk_insert(trees, validated=True)
+            tree_by_id.update((tree.tree_id, tree) for tree in trees)
+            rows += len(chunk)
+            if progress:
+                progress('trees', rows, fraction)
+
+        tree_ids = pd.Index(list(tree_by_id))
+        rows = 0
+        path_rows = chunk_rows or estimate_chunk_rows(path_file_path, max_memory)
+        for chunk, fraction in _read_chunks(path_file_path, path_rows):
+            paths = parse_paths(chunk, tree_by_id, forest, tree_ids)
+            forest.bulk_insert((), paths, validated=True)
+            rows += len(chunk)
+            if progress:
+                progress('paths', rows, fraction)
+    except Exception as e:
+        raise ValueError(f"Failed to load forest data: {str(e)}")
+
+    return forest
+
+
+def split_csv_by_bytes(file_path, num_shards: int) -> list[tuple]:
+    """把一个CSV文件按字节范围切分为若干分片，分片边界对齐到行首
+
+    假设字段中不包含换行符。
+
+    Returns:
+        [(文件路径, 起始字节, 结束字节)]，范围不含表头行
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as handle:
+        handle.readline()
+        body_start = handle.tell()
+        boundaries = [body_start]
+        step = max(1, (size - body_start) // max(1, num_shards))
+        for i in range(1, num_shards):
+            target = max(body_start + i * step, boundaries[-1])
+            if target >= size:
+                break
+            handle.seek(target - 1)
+            handle.readline()  # 前进到下一行的行首
+            position = handle.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return [(file_path, start, end) for start, end in zip(boundaries, boundaries[1:])]
+
+
+def _read_shard(shard) -> pd.DataFrame:
+    """在子进程中解析一个分片：整个文件路径，或 (文件路径, 起始字节, 结束字节)"""
+    if isinstance(shard, tuple):
+        file_path, start, end = shard
+        with open(file_path, 'rb') as handle:
+            header = handle.readline()
+            handle.seek(start)
+            body = handle.read(end - start)
+        return read_forest_csv(io.BytesIO(header + body))
+    return read_forest_csv(shard)
+
+
+def _concat_shards(frames: list) -> pd.DataFrame:
+    """按分片顺序合并，使列类型与整体读取一个文件时一致
+
+    pandas 对每个分片独立推断列类型；某列只要在一个分片中是文本，整体读取时
+    该列也会是文本，因此把其他分片中的这一列同样转为文本后再合并。
+    """
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    for column in frames[0].columns:
+        kinds = {frame[column].dtype.kind for frame in frames if column in frame and len(frame)}
+        if len(kinds) > 1 and kinds & {'O', 'T'}:
+            for frame in frames:
+                if column in frame and frame[column].dtype.kind in 'iufb':
+                    frame[column] = frame[column].astype(str).astype(object)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _shards(files, workers: int) -> list:
+    if isinstance(files, (str, os.PathLike)):
+        return split_csv_by_bytes(files, workers) if workers > 1 else [files]
+    return list(files)
+
+
+def load_forest_data_parallel(tree_files, path_files, workers: int = None) -> ForestGraph:
+    """在进程池中并行解析分片的CSV文件并合并为一个森林
+
+    tree_files / path_files 可以是分片文件的列表（每个分片带有自己的表头），
+    也可以是单个文件路径，此时按字节范围切分为 workers 个分片。解析在子进程中进行，
+    合并后的数据按分片顺序拼接，再统一做与 load_forest_data 相同的向量化校验，
+    因此跨分片的ID解析、重复检测和报告的出错行都与一次性读取所有行时完全一致。
+
+    Args:
+        tree_files: 树木CSV文件路径或分片文件路径列表
+        path_files: 路径CSV文件路径或分片文件路径列表
+        workers: 进程数（默认使用CPU核数）
+
+    Returns:
+        加载完成的森林
+    """
+    workers = workers or os.cpu_count() or 1
     try:
-        # 加载树木数据
-        trees_df = pd.read_csv(tree_file_path)
-        for _, row in trees_df.iterrows():
-            try:
-                # 解析tree_id, species, age, health_status
-                health_status_str = str(row['health_status']).upper().replace(" ", "_")
-                if health_status_str not in HealthStatus.__members__:
-                    raise ValueError(f"Invalid health status value: {row['health_status']}")
-                health_status = HealthStatus[health_status_str]
-                tree = TreeNode(row['tree_id'], row['species'], row['age'], health_status)
-                forest.add_tree(tree)
-            except Exception as e:
-                raise ValueError(f"Error parsing tree row: {row.to_dict()} - {str(e)}")  # 修改错误信息格式
-                
-        # 加载路径数据
-        paths_df = pd.read_csv(path_file_path)
-        for _, row in paths_df.iterrows():
-            try:
-                tree_id1 = int(row['tree_1'])  # 改为使用tree_1
-                tree_id2 = int(row['tree_2'])  # 改为使用tree_2
-                distance = float(row['distance'])
-                tree1 = next((tree for tree in forest.adjacency if tree.tree_id == tree_id1), None)
-                tree2 = next((tree for tree in forest.adjacency if tree.tree_id == tree_id2), None)
-                if tree1 is None or tree2 is None:
-                    raise ValueError(f"Tree ID {tree_id1 if tree1 is None else tree_id2} not found in forest nodes, skipping path.")
-                path = TreePath(tree1, tree2, distance)
-                forest.add_path(path)
-            except Exception as e:
-                raise ValueError(f"Error parsing path row: {row.to_dict()} - {str(e)}")
+        tree_shards = _shards(tree_files, workers)
+        path_shards = _shards(path_files, workers)
+        frames = map_in_pool(_read_shard, tree_shards + path_shards, workers)
+        trees_df = _concat_shards(frames[:len(tree_shards)])
+        paths_df = _concat_shards(frames[len(tree_shards):])
 
+        trees = parse_trees(trees_df)
+        tree_by_id = {tree.tree_id: tree for tree in trees}
+        paths = parse_paths(paths_df, tree_by_id)
+
+        forest = ForestGraph()
+        forest.bulk_insert(trees, paths, validated=True)
     except Exception as e:
         raise ValueError(f"Failed to load forest data: {str(e)}")
-        
+
     return forest
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+from forest_management.core.forest_graph import ForestGraph, ForestListener, TreeNode, TreePath, HealthStatus
+from forest_management.utils.data_loader import (TREE_COLUMNS, PATH_COLUMNS, normalize_health,
+                                                 coerce_path_columns, first_error, read_forest_csv)
+
+# 增量文件中标记删除（墓碑行）的可选列
+TOMBSTONE_COLUMN = 'deleted'
+_TRUE_VALUES = {'1', 'TRUE', 'YES', 'Y', 'T'}
+
+
+class TreeIdIndex(ForestListener):
+    """树ID到 TreeNode 对象的索引，随森林的修改增量维护"""
+
+    def __init__(self, forest: ForestGraph):
+        self.forest = forest
+        self.on_reset()
+
+    def get(self, tree_id):
+        return self.trees.get(tree_id)
+
+    def on_tree_added(self, tree):
+        self.trees[tree.tree_id] = tree
+
+    def on_tree_removed(self, tree, paths):
+        self.trees.pop(tree.tree_id, None)
+
+    def on_reset(self):
+        self.trees = {tree.tree_id: tree for tree in self.forest.adjacency}
+
+
+def get_tree_id_index(forest: ForestGraph) -> TreeIdIndex:
+    """获取森林上已注册的树ID索引，不存在时创建并注册"""
+    for listener in forest.listeners:
+        if isinstance(listener, TreeIdIndex):
+            return listener
+    index = TreeIdIndex(forest)
+    forest.add_listener(index)
+    return index
+
+
+def _tombstones(df: pd.DataFrame) -> np.ndarray:
+    if TOMBSTONE_COLUMN not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    flags = df[TOMBSTONE_COLUMN]
+    return (flags.notna() & flags.astype(str).str.strip().str.upper().isin(_TRUE_VALUES)).to_numpy()
+
+
+def _check_columns(df: pd.DataFrame, columns, key_columns):
+    """非空的增量文件必须包含键列；只有墓碑行时可以省略其余列"""
+    required = columns if not _tombstones(df).all() else key_columns
+    for column in required:
+        if column not in df.columns:
+            raise KeyError(column)
+
+
+def _delta_tree_checks(trees_df: pd.DataFrame, deleted: np.ndarray) -> list:
+    health = normalize_health(trees_df['health_status']) if 'health_status' in trees_df else None
+    invalid_health = np.zeros(len(trees_df), dtype=bool)
+    if health is not None:
+        invalid_health = ~deleted & health.isna().to_numpy()
+    duplicate = trees_df['tree_id'].duplicated().to_numpy().copy()
+    return [
+        ('invalid_health_status', invalid_health,
+         lambda i: f"Invalid health status value: {trees_df['health_status'].iloc[i]}"),
+        ('duplicate_tree_id', duplicate & ~invalid_health, lambda i: "同一棵树在增量文件中出现多次"),
+    ]
+
+
+def _coerce_delta_paths(paths_df: pd.DataFrame, deleted: np.ndarray) -> tuple:
+    """与 coerce_path_columns 相同，但墓碑行不需要距离"""
+    if 'distance' not in paths_df:
+        paths_df = paths_df.assign(distance=1.0)
+    return coerce_path_columns(paths_df.assign(distance=paths_df['distance'].where(~deleted, 1.0)))
+
+
+def _delta_path_checks(paths_df: pd.DataFrame, deleted: np.ndarray, exists) -> list:
+    tree_1, tree_2, distance, invalid = _coerce_delta_paths(paths_df, deleted)
+    missing_1 = ~invalid & ~np.array([exists(tree_id) for tree_id in tree_1.tolist()], dtype=bool)
+    missing_2 = ~invalid & ~missing_1 & ~np.array([exists(tree_id) for tree_id in tree_2.tolist()], dtype=bool)
+    ok = ~(invalid | missing_1 | missing_2)
+    self_loop = ok & (tree_1 == tree_2)
+    ok &= ~self_loop
+    non_positive = ok & ~deleted & (distance <= 0)
+    ok &= ~non_positive
+    pairs = pd.DataFrame({'low': np.minimum(tree_1, tree_2), 'high': np.maximum(tree_1, tree_2)})
+    duplicate = np.zeros(len(paths_df), dtype=bool)
+    duplicate[ok] = pairs[ok].duplicated().to_numpy()
+    return [
+        ('invalid_value', invalid,
+         lambda i: f"could not convert row values: {paths_df.iloc[i].to_dict()}"),
+        ('missing_endpoint', missing_1 | missing_2,
+         lambda i: f"Tree ID {tree_1[i] if missing_1[i] else tree_2[i]} not found in forest nodes, skipping path."),
+        ('self_loop', self_loop, lambda i: "路径不能连接同一棵树"),
+        ('non_positive_distance', non_positive, lambda i: "距离必须大于0"),
+        ('duplicate_path', duplicate, lambda i: "同一对树之间的路径在增量文件中出现多次"),
+    ]
+
+
+def _find_path(forest: ForestGraph, tree_a, tree_b):
+    """两棵树之间的路径（存在平行路径时返回第一条）"""
+    for path in forest.adjacency[tree_a]:
+        if path.tree1 == tree_b or path.tree2 == tree_b:
+            return path
+    return None
+
+
+def apply_forest_delta(forest: ForestGraph, trees_df: pd.DataFrame = None, paths_df: pd.DataFrame = None) -> dict:
+    """把增量数据应用到现有森林上，只修改发生变化的树木和路径
+
+    树木按 tree_id 插入或更新；路径按端点对（无向）插入或更新距离。
+    可选的 deleted 列为真（1/true/yes）的行是墓碑行：删除对应的树（连同其路径）
+    或两棵树之间的路径，要删除的对象不存在时忽略。
+    所有行先整体校验，全部通过后才开始修改森林；处理顺序为树木的插入和更新、
+    路径的变更、最后删除树木。
+
+    Args:
+        forest: 要修改的森林
+        trees_df: 树木增量数据（列与树木CSV相同）
+        paths_df: 路径增量数据（列与路径CSV相同）
+
+    Returns:
+        各类变更的数量统计
+    """
+    trees_df = pd.DataFrame(columns=TREE_COLUMNS) if trees_df is None else trees_df
+    paths_df = pd.DataFrame(columns=PATH_COLUMNS) if paths_df is None else paths_df
+    index = get_tree_id_index(forest)
+    summary = dict.fromkeys(['trees_added', 'trees_updated', 'trees_removed',
+                             'paths_added', 'paths_updated', 'paths_removed', 'unchanged'], 0)
+
+    # 校验树木
+    _check_columns(trees_df, TREE_COLUMNS, ['tree_id'])
+    tree_deleted = _tombstones(trees_df)
+    error = first_error(_delta_tree_checks(trees_df, tree_deleted))
+    if error:
+        row, _, message = error
+        raise ValueError(f"Error parsing tree row: {trees_df.iloc[row].to_dict()} - {message}")
+
+    # 校验路径：端点可以是森林中已有的树，也可以是本次新增的树
+    _check_columns(paths_df, PATH_COLUMNS, ['tree_1', 'tree_2'])
+    path_deleted = _tombstones(paths_df)
+    tree_ids = trees_df['tree_id'].tolist()
+    upserted = {tree_id for tree_id, deleted in zip(tree_ids, tree_deleted.tolist()) if not deleted}
+    error = first_error(_delta_path_checks(paths_df, path_deleted,
+                                           lambda tree_id: tree_id in upserted or tree_id in index.trees))
+    if error:
+        row, _, message = error
+        raise ValueError(f"Error parsing path row: {paths_df.iloc[row].to_dict()} - {message}")
+
+    # 插入或更新树木
+    statuses = {status.value: status for status in HealthStatus}
+    live = ~tree_deleted
+    if live.any():
+        rows = trees_df[live]
+        codes = normalize_health(rows['health_status']).astype(np.int64).tolist()
+        for tree_id, species, age, code in zip(rows['tree_id'].tolist(), rows['species'].tolist(),
+                                               rows['age'].tolist(), codes):
+            tree = index.get(tree_id)
+            if tree is None:
+                forest.add_tree(TreeNode(tree_id, species, age, statuses[code]))
+                summary['trees_added'] += 1
+                continue
+            changed = (tree.species, tree.age, tree.health_status) != (species, age, statuses[code])
+            forest.update_tree_attributes(tree, species, age)
+            forest.update_tree_health(tree, statuses[code])
+            summary['trees_updated' if changed else 'unchanged'] += 1
+
+    # 路径变更
+    if len(paths_df):
+        tree_1, tree_2, distance, _ = _coerce_delta_paths(paths_df, path_deleted)
+        for id_a, id_b, distance, deleted in zip(tree_1.tolist(), tree_2.tolist(),
+                                                 distance.tolist(), path_deleted.tolist()):
+            tree_a, tree_b = index.get(id_a), index.get(id_b)
+            path = _find_path(forest, tree_a, tree_b)
+            if deleted:
+                removed = False
+                while path is not None:
+                    forest.remove_path(path)
+                    summary['paths_removed'] += 1
+                    removed = True
+                    path = _find_path(forest, tree_a, tree_b)
+                summary['unchanged'] += not removed
+            elif path is None:
+                forest.add_path(TreePath(tree_a, tree_b, distance))
+                summary['paths_added'] += 1
+            elif path.distance != distance:
+                forest.update_path_distance(path, distance)
+                summary['paths_updated'] += 1
+            else:
+                summary['unchanged'] += 1
+
+    # 删除树木
+    for tree_id in trees_df['tree_id'][tree_deleted].tolist():
+        tree = index.get(tree_id)
+        if tree is None:
+            summary['unchanged'] += 1
+            continue
+        forest.remove_tree(tree)
+        summary['trees_removed'] += 1
+
+    return summary
+
+
+def import_forest_delta(forest: ForestGraph, tree_file_path=None, path_file_path=None) -> dict:
+    """从树木和路径增量CSV文件更新森林，两个文件都是可选的
+
+    Returns:
+        apply_forest_delta 返回的变更统计
+    """
+    try:
+        trees_df = read_forest_csv(tree_file_path) if tree_file_path else None
+        paths_df = read_forest_csv(path_file_path) if path_file_path else None
+        return apply_forest_delta(forest, trees_df, paths_df)
+    except Exception as e:
+        raise ValueError(f"Failed to import forest delta: {str(e)}")
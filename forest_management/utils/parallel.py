@@ -0,0 +1,72 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 子进程中的只读快照，由进程池初始化函数设置
+_worker_snapshot = None
+
+
+def _init_worker(snapshot):
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _run_chunk(task):
+    func, chunk = task
+    return func(_worker_snapshot, chunk)
+
+
+def _run_item(task):
+    func, item = task
+    return func(item)
+
+
+def split_chunks(items, num_chunks: int) -> list[list]:
+    """把序列尽量平均地切分为 num_chunks 份（去掉空块）"""
+    items = list(items)
+    num_chunks = max(1, min(num_chunks, len(items)))
+    size, extra = divmod(len(items), num_chunks)
+    chunks, start = [], 0
+    for i in range(num_chunks):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def map_over_snapshot(func, snapshot, chunks, workers: int = None) -> list:
+    """在进程池中对每个数据块执行 func(snapshot, chunk)
+
+    快照在每个子进程中只传输一次（通过进程池初始化函数），而不是随每个任务传输。
+    workers 为 1 或只有一个数据块时直接在当前进程执行。
+
+    Args:
+        func: 模块级函数，签名为 func(snapshot, chunk)
+        snapshot: 只读的 CSRSnapshot
+        chunks: 数据块列表
+        workers: 进程数（默认使用CPU核数）
+
+    Returns:
+        与 chunks 顺序一致的结果列表
+    """
+    chunks = list(chunks)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        return [func(snapshot, chunk) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             initializer=_init_worker,
+                             initargs=(snapshot,)) as executor:
+        return list(executor.map(_run_chunk, [(func, chunk) for chunk in chunks]))
+
+
+def map_in_pool(func, items, workers: int = None) -> list:
+    """在进程池中对每一项执行 func(item)，返回顺序与 items 一致
+
+    workers 为 1 或只有一项时直接在当前进程执行。func 必须是模块级函数。
+    """
+    items = list(items)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(_run_item, [(func, item) for item in items]))
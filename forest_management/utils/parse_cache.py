@@ -0,0 +1,156 @@
+import hashlib
+import os
+import tempfile
+import threading
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.utils.snapshot_io import FORMAT_VERSION, save_forest_snapshot, load_forest_snapshot
+
+DEFAULT_MAX_BYTES = int(os.environ.get('FOREST_PARSE_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+_HASH_BLOCK = 1024 * 1024
+_SUFFIX = '.snap'
+
+
+def default_cache_dir() -> str:
+    """默认的缓存目录：每次调用时读取环境变量 FOREST_PARSE_CACHE_DIR，未设置时为临时目录下的 forest_parse_cache"""
+    return os.environ.get('FOREST_PARSE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'forest_parse_cache')
+
+
+def _file_key(file_path) -> tuple:
+    """文件的 (内容哈希, 大小, 修改时间)"""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as handle:
+        for block in iter(lambda: handle.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest(), stat.st_size, stat.st_mtime_ns
+
+
+class ParseCache:
+    """CSV 解析结果的磁盘缓存
+
+    键由两个CSV文件的内容哈希、大小和修改时间组成，值是以二进制快照格式保存的森林。
+    缓存目录的总大小超过 max_bytes 时按最近使用时间淘汰最旧的条目；命中时会更新
+    条目文件的修改时间作为使用时间。快照格式只支持数值型的树ID和年龄，
+    无法保存的森林不会被缓存。未指定 cache_dir 时每次访问都按 default_cache_dir() 确定目录，
+    导入模块之后才设置的环境变量同样生效。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 0:
+            raise ValueError("缓存大小上限不能为负数")
+        self._cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir if self._cache_dir is not None else default_cache_dir()
+
+    def key(self, tree_file_path, path_file_path) -> str:
+        digest = hashlib.blake2b(repr((FORMAT_VERSION, _file_key(tree_file_path),
+                                       _file_key(path_file_path))).encode('utf-8'), digest_size=20)
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def get(self, key: str):
+        """返回缓存的森林，未命中时返回 None；损坏的条目会被删除"""
+        entry = self._entry_path(key)
+        try:
+            forest = load_forest_snapshot(entry)
+            os.utime(entry)
+        except FileNotFoundError:
+            forest = None
+        except (OSError, ValueError, KeyError):
+            forest = None
+            self._remove(entry)
+        with self._lock:
+            if forest is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return forest
+
+    def put(self, key: str, forest: ForestGraph) -> bool:
+        """保存森林并按大小上限淘汰旧条目，返回是否成功写入"""
+        entry = self._entry_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            save_forest_snapshot(forest, entry)
+        except (OSError, ValueError):
+            self._remove(f"{entry}.tmp")
+            return False
+        self.evict(keep=entry)
+        return os.path.exists(entry)
+
+    def _entries(self) -> list[tuple]:
+        """[(使用时间, 大小, 路径)]，从最旧到最新"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            entry = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        entries.sort()
+        return entries
+
+    def evict(self, keep=None):
+        """删除最久未使用的条目，直到总大小不超过上限
+
+        Args:
+            keep: 优先保留的条目（刚写入的条目），只有它本身超过上限时才会被删除
+        """
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries, key=lambda item: item[2] == keep):
+                if total <= self.max_bytes:
+                    break
+                if self._remove(entry):
+                    self.evictions += 1
+                total -= size
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        with self._lock:
+            for _, _, entry in self._entries():
+                self._remove(entry)
+            self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def _remove(entry) -> bool:
+        try:
+            os.remove(entry)
+            return True
+        except OSError:
+            return False
+
+    def info(self) -> dict:
+        """缓存的命中、未命中、淘汰次数和当前占用的磁盘空间"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'bytes': self.size(),
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+parse_cache = ParseCache()
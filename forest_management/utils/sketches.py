@@ -0,0 +1,338 @@
+import math
+import random
+from collections import defaultdict
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph, ForestListener
+
+
+class KLLSketch:
+    """KLL 流式分位数草图
+
+    以 O(k) 的内存近似任意长度数据流的分位数，秩误差约为 O(1/k)。
+    草图之间可以合并，因此各分片、各加载块可以分别构建后再合并。
+    只支持插入，不支持删除。
+    """
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.compactors = [[]]
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._rng = random.Random(seed)
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self):
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items = sorted(self.compactors[level])
+                # 奇数个元素时保留最后一个，其余随机保留一半并提升到上一层（权重翻倍）
+                keep = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.random() < 0.5
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = keep
+                self._size = sum(len(c) for c in self.compactors)
+                if self._size < self._max_size:
+                    break
+
+    def update(self, value):
+        """插入一个值"""
+        value = float(value)
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self._size >= self._max_size:
+            self._compress()
+
+    def update_many(self, values):
+        """批量插入"""
+        for value in np.asarray(values, dtype=np.float64).tolist():
+            self.update(value)
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """把另一个草图合并到当前草图中"""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """近似的 q 分位数（q 在 0 到 1 之间，空草图返回 nan）"""
+        if not 0 <= q <= 1:
+            raise ValueError("分位数必须在0到1之间")
+        if not self.count:
+            return math.nan
+        if q == 0:
+            return self.min
+        if q == 1:
+            return self.max
+        weighted = sorted((value, 1 << level)
+                          for level, items in enumerate(self.compactors) for value in items)
+        target = q * sum(weight for _, weight in weighted)
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return weighted[-1][0]
+
+    def __len__(self):
+        return self.count
+
+
+class FixedHistogram:
+    """固定分箱直方图
+
+    区间 [low, high] 均分为 bins 个箱，另有下溢和上溢两个计数。
+    支持插入、删除和合并（要求分箱相同）。
+    """
+
+    def __init__(self, low: float, high: float, bins: int = 50):
+        if high <= low:
+            raise ValueError("直方图上界必须大于下界")
+        self.edges = np.linspace(low, high, bins + 1)
+        # counts[0] 为下溢，counts[-1] 为上溢
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+
+    def _bin_index(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        index = np.searchsorted(self.edges, values, side='right')
+        # 上界本身归入最后一个箱
+        index[values == self.edges[-1]] = len(self.edges) - 1
+        return index
+
+    def update(self, values, weight: int = 1):
+        """插入一个或一批值"""
+        np.add.at(self.counts, self._bin_index(np.atleast_1d(values)), weight)
+
+    def remove(self, values):
+        """删除一个或一批此前插入过的值"""
+        self.update(values, -1)
+
+    def merge(self, other: "FixedHistogram") -> "FixedHistogram":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("只能合并分箱相同的直方图")
+        self.counts += other.counts
+        return self
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def bin_counts(self) -> np.ndarray:
+        """各分箱的计数（不含下溢和上溢）"""
+        return self.counts[1:-1]
+
+    def quantile(self, q: float) -> float:
+        """在箱内线性插值得到的近似分位数"""
+        total = self.total
+        if not total:
+            return math.nan
+        cumulative = np.cumsum(self.counts)
+        target = q * total
+        index = int(np.searchsorted(cumulative, target, side='left'))
+        if index == 0:
+            return float(self.edges[0])
+        if index == len(self.counts) - 1:
+            return float(self.edges[-1])
+        before = cumulative[index - 1]
+        fraction = (target - before) / self.counts[index] if self.counts[index] else 0.0
+        left, right = self.edges[index - 1], self.edges[index]
+        return float(left + (right - left) * fraction)
+
+
+class ForestSketches(ForestListener):
+    """随森林变化维护的年龄、距离统计草图
+
+    - 每个树种以及全部树木的年龄 KLL 分位数草图；
+    - 年龄和路径距离的固定分箱直方图。
+    直方图支持删除，随每次修改同步增减。分位数草图只支持插入：删除树或路径、修改年龄、树种或距离后，
+    受影响的草图被标记为过期，下次查询时从森林重新构建（没有树木的树种随之消失）。
+    """
+
+    def __init__(self, age_range=(0, 500), distance_range=(0, 1000), bins: int = 50, k: int = 200):
+        self._params = dict(age_range=age_range, distance_range=distance_range, bins=bins, k=k)
+        self.forest = None  # 注册到森林后用于在 reset 时以及过期的草图重建
+        self.k = k
+        self._age = KLLSketch(k)
+        self._age_by_species = defaultdict(lambda: KLLSketch(self.k))
+        self._distance = KLLSketch(k)
+        self.age_histogram = FixedHistogram(*age_range, bins)
+        self.distance_histogram = FixedHistogram(*distance_range, bins)
+        self._stale_age = False
+        self._stale_species = set()
+        self._stale_distance = False
+
+    @classmethod
+    def from_forest(cls, forest: ForestGraph, **kwargs) -> "ForestSketches":
+        """扫描一次现有森林构建草图"""
+        sketches = cls(**kwargs)
+        for tree, edges in forest.adjacency.items():
+            sketches.on_tree_added(tree)
+            for path in edges:
+                if path.tree1 == tree:
+                    sketches.on_path_added(path)
+        return sketches
+
+    def _refresh(self):
+        """从森林重新构建过期的分位数草图"""
+        if self.forest is None or not (self._stale_age or self._stale_species or self._stale_distance):
+            return
+        if self._stale_age or self._stale_species:
+            ages, by_species = [], defaultdict(list)
+            for tree in self.forest.adjacency:
+                ages.append(tree.age)
+                if tree.species in self._stale_species:
+                    by_species[tree.species].append(tree.age)
+            if self._stale_age:
+                self._age = KLLSketch(self.k)
+                self._age.update_many(ages)
+            for name in self._stale_species:
+                self._age_by_species.pop(name, None)
+                if by_species[name]:
+                    self._age_by_species[name].update_many(by_species[name])
+        if self._stale_distance:
+            self._distance = KLLSketch(self.k)
+            self._distance.update_many([path.distance for tree, edges in self.forest.adjacency.items()
+                                        for path in edges if path.tree1 == tree])
+        self._stale_age = self._stale_distance = False
+        self._stale_species = set()
+
+    @property
+    def age(self) -> KLLSketch:
+        self._refresh()
+        return self._age
+
+    @property
+    def age_by_species(self) -> dict:
+        self._refresh()
+        return self._age_by_species
+
+    @property
+    def distance(self) -> KLLSketch:
+        self._refresh()
+        return self._distance
+
+    def update_trees(self, species, ages):
+        """批量记录树木（例如加载器的一个数据块）"""
+        ages = np.asarray(ages, dtype=np.float64)
+        species = np.asarray(species)
+        self.age.update_many(ages)
+        self.age_histogram.update(ages)
+        for name in dict.fromkeys(species.tolist()):
+            self.age_by_species[name].update_many(ages[species == name])
+
+    def update_paths(self, distances):
+        """批量记录路径距离"""
+        distances = np.asarray(distances, dtype=np.float64)
+        self.distance.update_many(distances)
+        self.distance_histogram.update(distances)
+
+    def merge(self, other: "ForestSketches") -> "ForestSketches":
+        """合并另一个分片的草图"""
+        self.age.merge(other.age)
+        self.distance.merge(other.distance)
+        self.age_histogram.merge(other.age_histogram)
+        self.distance_histogram.merge(other.distance_histogram)
+        for name, sketch in other.age_by_species.items():
+            self.age_by_species[name].merge(sketch)
+        return self
+
+    def age_summary(self, quantiles=(0.5, 0.95)) -> dict:
+        """{树种: {分位数: 年龄}}，按树种名称排序"""
+        return {name: {q: sketch.quantile(q) for q in quantiles}
+                for name, sketch in sorted(self.age_by_species.items(), key=lambda x: str(x[0]))
+                if sketch.count}
+
+    def on_tree_added(self, tree):
+        # 过期的草图重建时会包含这棵树，不再单独插入
+        if not self._stale_age:
+            self._age.update(tree.age)
+        if tree.species not in self._stale_species:
+            self._age_by_species[tree.species].update(tree.age)
+        self.age_histogram.update(tree.age)
+
+    def _mark_stale(self, species=(), distance: bool = False):
+        """标记过期的年龄（以及给定树种、距离）草图；未关联森林时无法重建，保持原样"""
+        if self.forest is None:
+            return
+        self._stale_age = self._stale_age or bool(species)
+        self._stale_species.update(species)
+        self._stale_distance = self._stale_distance or distance
+
+    def on_tree_removed(self, tree, paths):
+        self.age_histogram.remove(tree.age)
+        self.distance_histogram.remove([path.distance for path in paths])
+        self._mark_stale((tree.species,), distance=bool(paths))
+
+    def on_tree_updated(self, tree, old_species, old_age):
+        self.age_histogram.remove(old_age)
+        self.age_histogram.update(tree.age)
+        self._mark_stale((old_species, tree.species))
+
+    def on_path_added(self, path):
+        if not self._stale_distance:
+            self._distance.update(path.distance)
+        self.distance_histogram.update(path.distance)
+
+    def on_path_removed(self, path):
+        self.distance_histogram.remove(path.distance)
+        self._mark_stale(distance=True)
+
+    def on_path_distance_changed(self, path, old_distance):
+        self.distance_histogram.remove(old_distance)
+        self.distance_histogram.update(path.distance)
+        self._mark_stale(distance=True)
+
+    def on_reset(self):
+        if self.forest is not None:
+            forest = self.forest
+            self.__dict__.update(ForestSketches.from_forest(forest, **self._params).__dict__)
+            self.forest = forest
+
+    def __getstate__(self):
+        # defaultdict 的 lambda 工厂无法序列化，转换为普通字典；序列化后不再关联森林，先重建过期的草图
+        self._refresh()
+        state = self.__dict__.copy()
+        state['_age_by_species'] = dict(self._age_by_species)
+        state['forest'] = None
+        return state
+
+    def __setstate__(self, state):
+        species = state.pop('_age_by_species')
+        self.__dict__.update(state)
+        self._age_by_species = defaultdict(lambda: KLLSketch(self.k), species)
+
+
+def get_forest_sketches(forest: ForestGraph) -> ForestSketches:
+    """获取森林上已注册的统计草图，不存在时扫描一次森林创建并注册"""
+    for listener in forest.listeners:
+        if isinstance(listener, ForestSketches):
+            return listener
+    sketches = ForestSketches.from_forest(forest)
+    sketches.forest = forest
+    forest.add_listener(sketches)
+    return sketches
@@ -0,0 +1,184 @@
+import json
+import os
+import struct
+import zlib
+from collections import defaultdict
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph, TreeNode, TreePath, HealthStatus
+from forest_management.core.csr_snapshot import CSRSnapshot
+
+# 文件布局：固定长度的前缀 | JSON 头 | 按 ALIGNMENT 对齐的各列数组
+# 前缀依次为魔数、格式版本、JSON 头的 CRC32、JSON 头长度、数据区起始偏移
+MAGIC = b'FORESTSN'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct('<8sIIQQ')
+
+# 写入顺序；tree_ids 和 ages 的类型取决于数据，其余列的类型固定
+ARRAY_COLUMNS = ('tree_ids', 'species_codes', 'ages', 'health',
+                 'edge_u', 'edge_v', 'edge_weight', 'indptr', 'indices', 'edge_ids', 'weights')
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _forest_columns(forest: ForestGraph) -> tuple[dict, list]:
+    """把森林转换为列数组和树种字典
+
+    CSR 区间内的顺序与每棵树邻接表中的路径顺序一致，加载时可以原样恢复邻接表。
+    """
+    snapshot = CSRSnapshot.from_forest(forest)
+    edge_index = {id(path): k for k, path in enumerate(snapshot.paths)}
+    node_index = {tree: i for i, tree in enumerate(snapshot.nodes)}
+    indptr = np.zeros(snapshot.num_nodes + 1, dtype=np.int64)
+    np.cumsum([len(forest.adjacency[tree]) for tree in snapshot.nodes], out=indptr[1:])
+    edge_ids = np.fromiter((edge_index[id(path)] for tree in snapshot.nodes for path in forest.adjacency[tree]),
+                           dtype=np.int64, count=int(indptr[-1]))
+    indices = np.fromiter((node_index[path.tree2 if path.tree1 == tree else path.tree1]
+                           for tree in snapshot.nodes for path in forest.adjacency[tree]),
+                          dtype=np.int64, count=int(indptr[-1]))
+
+    columns = {
+        'tree_ids': snapshot.tree_ids,
+        'species_codes': snapshot.species_codes,
+        'ages': snapshot.ages,
+        'health': snapshot.health,
+        'edge_u': snapshot.edge_u,
+        'edge_v': snapshot.edge_v,
+        'edge_weight': snapshot.edge_weight,
+        'indptr': indptr,
+        'indices': indices,
+        'edge_ids': edge_ids,
+        'weights': snapshot.edge_weight[edge_ids],
+    }
+    for name in ('tree_ids', 'ages'):
+        if columns[name].dtype.kind not in 'iuf':
+            raise ValueError(f"快照格式只支持数值型的 {name}")
+    return columns, snapshot.species_names
+
+
+def save_forest_snapshot(forest: ForestGraph, file_path):
+    """把森林保存为二进制快照文件
+
+    节点属性按列存储，树种保存为字典加编码，路径同时保存为边列表和CSR数组。
+    每列记录 CRC32 校验和；先写入临时文件再替换，写入中断不会损坏已有快照。
+
+    Args:
+        forest: 森林图对象
+        file_path: 快照文件路径
+    """
+    columns, species_names = _forest_columns(forest)
+    arrays = {}
+    offset = 0
+    for name in ARRAY_COLUMNS:
+        data = np.ascontiguousarray(columns[name])
+        arrays[name] = {
+            'dtype': data.dtype.str,
+            'offset': offset,
+            'length': len(data),
+            'crc32': zlib.crc32(data.tobytes()),
+        }
+        offset = _align(offset + data.nbytes)
+    header = json.dumps({
+        'num_nodes': len(columns['tree_ids']),
+        'num_edges': len(columns['edge_u']),
+        'species': species_names,
+        'arrays': arrays,
+    }).encode('utf-8')
+    data_offset = _align(_PREFIX.size + len(header))
+
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'wb') as handle:
+        handle.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, zlib.crc32(header), len(header), data_offset))
+        handle.write(header)
+        for name in ARRAY_COLUMNS:
+            handle.seek(data_offset + arrays[name]['offset'])
+            handle.write(np.ascontiguousarray(columns[name]).tobytes())
+        handle.truncate(data_offset + offset)
+    os.replace(temp_path, file_path)
+
+
+def _read_header(file_path) -> tuple[dict, int]:
+    with open(file_path, 'rb') as handle:
+        prefix = handle.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError("快照文件不完整")
+        magic, version, header_crc, header_len, data_offset = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError("不是森林快照文件")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"不支持的快照格式版本: {version}")
+        header = handle.read(header_len)
+    if len(header) != header_len or zlib.crc32(header) != header_crc:
+        raise ValueError("快照文件头校验失败")
+    return json.loads(header.decode('utf-8')), data_offset
+
+
+def load_snapshot(file_path, mmap: bool = True, verify: bool = False) -> CSRSnapshot:
+    """以内存映射方式打开快照文件，返回 CSRSnapshot
+
+    打开时只读取文件头，各列数组在被访问时才按页读入，因此打开大型森林几乎是瞬时的。
+    返回的快照不包含 TreeNode / TreePath 对象，可直接用于基于快照的分析函数。
+
+    Args:
+        file_path: 快照文件路径
+        mmap: 是否使用内存映射（False 时把数组完整读入内存）
+        verify: 是否校验每列的 CRC32（需要读取整个文件）
+    """
+    header, data_offset = _read_header(file_path)
+    file_size = os.path.getsize(file_path)
+    columns = {}
+    for name in ARRAY_COLUMNS:
+        info = header['arrays'][name]
+        dtype = np.dtype(info['dtype'])
+        start = data_offset + info['offset']
+        if start + info['length'] * dtype.itemsize > file_size:
+            raise ValueError("快照文件不完整")
+        if info['length'] == 0:
+            data = np.empty(0, dtype=dtype)
+        elif mmap:
+            data = np.memmap(file_path, dtype=dtype, mode='r', offset=start, shape=(info['length'],))
+        else:
+            data = np.fromfile(file_path, dtype=dtype, count=info['length'], offset=start)
+        if verify and zlib.crc32(np.ascontiguousarray(data).tobytes()) != info['crc32']:
+            raise ValueError(f"快照数据校验失败: {name}")
+        columns[name] = data
+
+    return CSRSnapshot(
+        tree_ids=columns['tree_ids'],
+        species_codes=columns['species_codes'],
+        species_names=header['species'],
+        ages=columns['ages'],
+        health=columns['health'],
+        edge_u=columns['edge_u'],
+        edge_v=columns['edge_v'],
+        edge_weight=columns['edge_weight'],
+        csr=(columns['indptr'], columns['indices'], columns['edge_ids'], columns['weights']),
+    )
+
+
+def load_forest_snapshot(file_path, verify: bool = True) -> ForestGraph:
+    """从快照文件恢复完整的森林
+
+    树木顺序、每棵树邻接表中的路径顺序以及路径的端点方向都与保存时一致。
+    """
+    snapshot = load_snapshot(file_path, verify=verify)
+    statuses = {status.value: status for status in HealthStatus}
+    species_names = snapshot.species_names
+    nodes = [TreeNode(tree_id, species_names[code], age, statuses[health])
+             for tree_id, code, age, health in zip(snapshot.tree_ids.tolist(), snapshot.species_codes.tolist(),
+                                                   snapshot.ages.tolist(), snapshot.health.tolist())]
+    paths = [TreePath(nodes[u], nodes[v], weight)
+             for u, v, weight in zip(snapshot.edge_u.tolist(), snapshot.edge_v.tolist(),
+                                     snapshot.edge_weight.tolist())]
+
+    adjacency = defaultdict(list)
+    indptr = snapshot.indptr.tolist()
+    edge_ids = snapshot.edge_ids.tolist()
+    for i, tree in enumerate(nodes):
+        adjacency[tree] = [paths[k] for k in edge_ids[indptr[i]:indptr[i + 1]]]
+
+    forest = ForestGraph()
+    forest.reset(adjacency)
+    return forest
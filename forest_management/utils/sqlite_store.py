@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+from forest_management.core.forest_graph import ForestGraph, ForestListener, TreeNode, TreePath, HealthStatus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trees (
+    seq INTEGER PRIMARY KEY,
+    tree_id UNIQUE NOT NULL,
+    species,
+    age,
+    health TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trees_species ON trees (species);
+CREATE INDEX IF NOT EXISTS trees_health ON trees (health);
+CREATE TABLE IF NOT EXISTS paths (
+    seq INTEGER PRIMARY KEY,
+    tree_1 NOT NULL,
+    tree_2 NOT NULL,
+    distance REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS paths_tree_1 ON paths (tree_1);
+CREATE INDEX IF NOT EXISTS paths_tree_2 ON paths (tree_2);
+"""
+
+_INSERT_TREE = "INSERT INTO trees (tree_id, species, age, health) VALUES (?, ?, ?, ?)"
+_INSERT_PATH = "INSERT INTO paths (tree_1, tree_2, distance) VALUES (?, ?, ?)"
+# 路径是无向的，按两种端点顺序匹配；平行路径只删除/更新其中一条
+_MATCH_PATH = ("seq = (SELECT seq FROM paths WHERE distance = ? AND "
+               "((tree_1 = ? AND tree_2 = ?) OR (tree_1 = ? AND tree_2 = ?)) LIMIT 1)")
+
+
+def _tree_row(tree) -> tuple:
+    return tree.tree_id, tree.species, tree.age, tree.health_status.name
+
+
+def _path_row(path) -> tuple:
+    return path.tree1.tree_id, path.tree2.tree_id, path.distance
+
+
+def _path_match(path, distance) -> tuple:
+    a, b = path.tree1.tree_id, path.tree2.tree_id
+    return distance, a, b, b, a
+
+
+class SQLiteForestStore(ForestListener):
+    """基于 SQLite（WAL 模式）的森林持久化存储
+
+    注册为森林的监听器后，森林的每次修改都会写入数据库：batch_size 为 1 时逐条提交（直写），
+    更大时累积到 batch_size 条操作再在一个事务中提交，调用 flush() 或 close() 时提交剩余操作。
+    树按种类和健康状态、路径按两个端点建有索引，查询不需要把整个森林加载到内存。
+
+    数据库只能由一个森林写入；同一进程中的多个线程可以共享同一个存储对象。
+    """
+
+    def __init__(self, db_path, batch_size: int = 1):
+        if batch_size < 1:
+            raise ValueError("批量大小必须大于0")
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.forest = None
+        self._pending = []
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---- 写入 ----
+
+    def _write(self, sql: str, params: tuple):
+        with self._lock:
+            self._pending.append((sql, params))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """在一个事务中提交所有待写入的操作"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            self._conn.execute("BEGIN")
+            try:
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def save_forest(self, forest: ForestGraph):
+        """用森林的当前内容整体替换数据库中的数据"""
+        with self._lock:
+            self._pending = []
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM trees")
+                self._conn.execute("DELETE FROM paths")
+                self._conn.executemany(_INSERT_TREE, (_tree_row(tree) for tree in forest.adjacency))
+                self._conn.executemany(_INSERT_PATH, (_path_row(path) for tree, paths in forest.adjacency.items()
+                                                      for path in paths if path.tree1 == tree))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def attach(self, forest: ForestGraph):
+        """注册为森林的监听器，之后森林的修改会同步写入数据库"""
+        self.forest = forest
+        forest.add_listener(self)
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self.forest is not None and self in self.forest.listeners:
+                self.forest.remove_listener(self)
+            self._conn.close()
+
+    # ---- 监听森林变更 ----
+
+    def on_tree_added(self, tree):
+        self._write(_INSERT_TREE, _tree_row(tree))
+
+    def on_tree_removed(self, tree, paths):
+        self._write("DELETE FROM paths WHERE tree_1 = ? OR tree_2 = ?", (tree.tree_id, tree.tree_id))
+        self._write("DELETE FROM trees WHERE tree_id = ?", (tree.tree_id,))
+
+    def on_path_added(self, path):
+        self._write(_INSERT_PATH, _path_row(path))
+
+    def on_path_removed(self, path):
+        self._write("DELETE FROM paths WHERE " + _MATCH_PATH, _path_match(path, path.distance))
+
+    def on_health_changed(self, tree, old_status):
+        self._write("UPDATE trees SET health = ? WHERE tree_id = ?", (tree.health_status.name, tree.tree_id))
+
+    def on_tree_updated(self, tree, old_species, old_age):
+        self._write("UPDATE trees SET species = ?, age = ? WHERE tree_id = ?", (tree.species, tree.age, tree.tree_id))
+
+    def on_path_distance_changed(self, path, old_distance):
+        self._write("UPDATE paths SET distance = ? WHERE " + _MATCH_PATH,
+                    (path.distance,) + _path_match(path, old_distance))
+
+    def on_reset(self):
+        if self.forest is not None:
+            self.save_forest(self.forest)
+
+    # ---- 读取 ----
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            self.flush()
+            return self._conn.execute(sql, params).fetchall()
+
+    def load_forest(self) -> ForestGraph:
+        """从数据库恢复森林（热启动）
+
+        树按加入顺序恢复；路径按加入顺序追加到两端的邻接表，通过 add_tree / add_path
+        逐步构建的森林可以完全按原顺序恢复。
+        """
+        statuses = HealthStatus.__members__
+        trees = [TreeNode(tree_id, species, age, statuses[health])
+                 for tree_id, species, age, health in
+                 self._query("SELECT tree_id, species, age, health FROM trees ORDER BY seq")]
+        by_id = {tree.tree_id: tree for tree in trees}
+        paths = [TreePath(by_id[a], by_id[b], distance)
+                 for a, b, distance in self._query("SELECT tree_1, tree_2, distance FROM paths ORDER BY seq")]
+        forest = ForestGraph()
+        forest.bulk_insert(trees, paths, validated=True)
+        return forest
+
+    def _tree_dicts(self, where: str, params: tuple) -> list[dict]:
+        rows = self._query(f"SELECT tree_id, species, age, health FROM trees WHERE {where} ORDER BY seq", params)
+        return [{'tree_id': tree_id, 'species': species, 'age': age, 'health_status': HealthStatus[health]}
+                for tree_id, species, age, health in rows]
+
+    def get_tree(self, tree_id) -> dict:
+        """按ID查询一棵树（不存在时返回 None）"""
+        rows = self._tree_dicts("tree_id = ?", (tree_id,))
+        return rows[0] if rows else None
+
+    def trees_by_species(self, species) -> list[dict]:
+        return self._tree_dicts("species = ?", (species,))
+
+    def trees_by_health(self, health_status: HealthStatus) -> list[dict]:
+        return self._tree_dicts("health = ?", (health_status.name,))
+
+    def neighbors(self, tree_id) -> list[tuple]:
+        """与指定树相连的 (树ID, 距离)，按路径加入顺序"""
+        return self._query(
+            "SELECT other, distance FROM ("
+            "SELECT tree_2 AS other, distance, seq FROM paths WHERE tree_1 = ? "
+            "UNION ALL SELECT tree_1, distance, seq FROM paths WHERE tree_2 = ?) ORDER BY seq",
+            (tree_id, tree_id))
+
+    def counts(self) -> dict:
+        """{'trees': 树木数量, 'paths': 路径数量}"""
+        (trees,), = self._query("SELECT COUNT(*) FROM trees")
+        (paths,), = self._query("SELECT COUNT(*) FROM paths")
+        return {'trees': trees, 'paths': paths}
+
+
+def open_persistent_forest(db_path, batch_size: int = 1) -> tuple[ForestGraph, SQLiteForestStore]:
+    """打开（或新建）数据库，恢复其中的森林并开始同步写入
+
+    Returns:
+        (森林, 存储对象)
+    """
+    store = SQLiteForestStore(db_path, batch_size)
+    forest = store.load_forest()
+    store.attach(forest)
+    return forest, store
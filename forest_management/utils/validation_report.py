@@ -0,0 +1,180 @@
+import csv
+import gzip
+import numpy as np
+import pandas as pd
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.utils.data_loader import (read_forest_csv, tree_checks, path_checks, coerce_path_columns,
+                                                 build_trees, build_paths)
+
+REPORT_COLUMNS = ['file', 'row', 'line', 'error_type', 'value', 'message']
+
+
+class ValidationReport:
+    """一次校验得到的全部错误
+
+    每个出错的行只记录按检查顺序的第一个错误。row 为数据行号（从0开始，不含表头），
+    line 为该行在文件中开始的物理行号（从1开始，计入空行和带引号字段中的换行）；
+    缺少列的错误针对整个文件，row 和 line 为空。
+    """
+
+    def __init__(self, errors: pd.DataFrame, tree_rows: int, path_rows: int, forest: ForestGraph = None):
+        self.errors = errors
+        self.tree_rows = tree_rows
+        self.path_rows = path_rows
+        self.forest = forest  # 只加载有效行时得到的森林
+
+    def __len__(self):
+        return len(self.errors)
+
+    @property
+    def is_valid(self) -> bool:
+        return len(self.errors) == 0
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return self.errors.copy()
+
+    def _values(self, error_type: str) -> list:
+        return self.errors.loc[self.errors['error_type'] == error_type, 'value'].tolist()
+
+    @property
+    def missing_endpoint_ids(self) -> list:
+        """路径引用了但不存在（或无效）的树ID，去重并排序"""
+        return sorted(set(self._values('missing_endpoint')))
+
+    @property
+    def duplicate_tree_ids(self) -> list:
+        return sorted(set(self._values('duplicate_tree_id')), key=str)
+
+    @property
+    def duplicate_paths(self) -> list:
+        """重复路径的 (较小ID, 较大ID, 距离)"""
+        return sorted(set(self._values('duplicate_path')))
+
+    def counts(self) -> dict:
+        """{错误类型: 出错行数}"""
+        return self.errors['error_type'].value_counts().to_dict()
+
+    def summary(self) -> str:
+        if self.is_valid:
+            return f"{self.tree_rows} tree rows and {self.path_rows} path rows are valid"
+        parts = ", ".join(f"{error_type}: {count}" for error_type, count in self.counts().items())
+        return f"{len(self.errors)} invalid rows ({parts})"
+
+
+def _error_frames(file_label: str, checks, values) -> tuple[list, np.ndarray]:
+    """把各项检查的掩码汇总为错误表，同时返回所有出错行的掩码"""
+    frames = []
+    failed = np.zeros(len(checks[0][1]), dtype=bool)
+    for error_type, mask, message in checks:
+        failed |= mask
+        if error_type == 'missing_column':
+            frames.append(pd.DataFrame({'file': [file_label], 'row': [pd.NA], 'line': [pd.NA],
+                                        'error_type': [error_type], 'value': [message(0).strip("'")],
+                                        'message': [message(0)]}))
+            continue
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            continue
+        frames.append(pd.DataFrame({
+            'file': file_label,
+            'row': rows,
+            'line': pd.NA,
+            'error_type': error_type,
+            'value': values(error_type, rows),
+            'message': [message(i) for i in rows.tolist()],
+        }))
+    return frames, failed
+
+
+def _line_numbers(file_path, rows: np.ndarray) -> np.ndarray:
+    """数据行在文件中开始的物理行号
+
+    按 CSV 规则逐条读取记录：带引号字段中的换行属于同一条记录，空行与 pandas 一样被跳过但计入行号。
+    只读到所需的最后一行为止。
+    """
+    wanted = int(rows.max()) + 2  # 表头和前 max(rows)+1 个数据行
+    starts = []
+    opener = gzip.open if str(file_path).endswith('.gz') else open
+    with opener(file_path, 'rt', newline='', encoding='utf-8-sig') as handle:
+        reader = csv.reader(handle)
+        previous = 0
+        for record in reader:
+            start, previous = previous + 1, reader.line_num
+            if record:
+                starts.append(start)
+                if len(starts) == wanted:
+                    break
+    return np.asarray(starts[1:], dtype=np.int64)[rows]
+
+
+def _tree_values(trees_df: pd.DataFrame):
+    def values(error_type, rows):
+        column = 'health_status' if error_type == 'invalid_health_status' else 'tree_id'
+        return trees_df[column].iloc[rows].tolist()
+    return values
+
+
+def _path_values(paths_df: pd.DataFrame, tree_ids: pd.Index):
+    tree_1, tree_2, distance, _ = coerce_path_columns(paths_df)
+
+    def values(error_type, rows):
+        if error_type == 'missing_endpoint':
+            missing_1 = tree_ids.get_indexer(tree_1[rows]) < 0
+            return np.where(missing_1, tree_1[rows], tree_2[rows]).tolist()
+        if error_type == 'self_loop':
+            return tree_1[rows].tolist()
+        if error_type == 'non_positive_distance':
+            return distance[rows].tolist()
+        if error_type == 'duplicate_path':
+            return list(zip(np.minimum(tree_1, tree_2)[rows].tolist(), np.maximum(tree_1, tree_2)[rows].tolist(),
+                            distance[rows].tolist()))
+        return [None] * len(rows)
+    return values
+
+
+def validate_forest_data(tree_file_path, path_file_path, load_valid: bool = False) -> ValidationReport:
+    """一次性校验树木和路径CSV文件，收集所有错误而不是在第一处错误时停止
+
+    检查项与 load_forest_data 相同，且都是整列的向量化运算。路径的端点只与通过校验的树匹配，
+    因此引用了无效树的路径会报告为 missing_endpoint。
+
+    Args:
+        tree_file_path: 树木CSV文件路径
+        path_file_path: 路径CSV文件路径
+        load_valid: 是否同时把所有有效行加载为森林（保存在报告的 forest 属性中）
+
+    Returns:
+        ValidationReport
+    """
+    trees_df = read_forest_csv(tree_file_path)
+    paths_df = read_forest_csv(path_file_path)
+
+    # 缺少列时所有行都被标记为出错，有效子集为空
+    checks = tree_checks(trees_df)
+    tree_frames, tree_failed = _error_frames('trees', checks, _tree_values(trees_df))
+    valid_trees = trees_df[~tree_failed]
+    tree_ids = pd.Index(valid_trees['tree_id'].tolist() if len(valid_trees) else [])
+
+    checks = path_checks(paths_df, tree_ids)
+    path_values = _path_values(paths_df, tree_ids) if checks[0][0] != 'missing_column' else None
+    path_frames, path_failed = _error_frames('paths', checks, path_values)
+
+    frames = tree_frames + path_frames
+    errors = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=REPORT_COLUMNS)
+    errors['row'] = errors['row'].astype('Int64')
+    errors['line'] = errors['line'].astype('Int64')
+    for file_label, file_path in (('trees', tree_file_path), ('paths', path_file_path)):
+        located = (errors['file'] == file_label) & errors['row'].notna()
+        if located.any():
+            errors.loc[located, 'line'] = _line_numbers(file_path, errors.loc[located, 'row'].to_numpy(np.int64))
+
+    forest = None
+    if load_valid:
+        forest = ForestGraph()
+        trees = build_trees(valid_trees) if len(valid_trees) else []
+        tree_by_id = {tree.tree_id: tree for tree in trees}
+        valid_paths = paths_df[~path_failed]
+        paths = build_paths(valid_paths, tree_by_id) if len(valid_paths) else []
+        forest.bulk_insert(trees, paths, validated=True)
+
+    return ValidationReport(errors, len(trees_df), len(paths_df), forest)
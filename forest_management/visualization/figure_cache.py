@@ -0,0 +1,129 @@
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph
+from forest_management.visualization.interactive_visualize import generate_figure
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 缓存的图表总大小上限
+
+
+def figure_key(forest: ForestGraph, highlight_nodes=None, path_nodes=None, highlight_paths=None,
+               highlight_color: str = '#90ee90', *extra) -> tuple:
+    """图表缓存的键：森林、森林的变更计数器、高亮的树木和路径（与顺序无关）、高亮色和其余参数"""
+    return (
+        id(forest), forest.version,
+        frozenset(tree.tree_id for tree in highlight_nodes or ()),
+        frozenset(tree.tree_id for tree in path_nodes or ()),
+        frozenset((min(path.tree1.tree_id, path.tree2.tree_id), max(path.tree1.tree_id, path.tree2.tree_id),
+                   path.distance) for path in highlight_paths or ()),
+        highlight_color,
+    ) + extra
+
+
+def approximate_size(value) -> int:
+    """估算图表数据（字典、列表、字符串、数值和数组的嵌套结构）序列化后的字节数"""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return sum(approximate_size(key) + approximate_size(item) for key, item in value.items()) + 2
+    if isinstance(value, (list, tuple)):
+        return sum(approximate_size(item) for item in value) + 2
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes) * 4 // 3 + 40  # 按 base64 编码估算
+    return 8
+
+
+class FigureCache:
+    """按内存大小淘汰的图表缓存
+
+    缓存已经序列化的图表（JSON 字符串）或 Dash 回调直接返回的图表字典，重复的视图直接返回缓存的
+    对象，不再经过 plotly 构建和序列化。键中包含森林的变更计数器，森林发生任何修改后旧图表自然失效；
+    总大小超过 max_bytes 时淘汰最久未使用的图表，单个超过上限的图表不缓存。
+    缓存的对象会被多次返回，调用方不应修改它们。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, forest):
+        with self._lock:
+            entry = self._entries.get(key)
+            # id 可能被回收后复用，用弱引用确认仍是同一片森林
+            if entry is not None and entry[0]() is forest:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, forest, value, size: int = None):
+        """缓存 value，size 为其大小（默认为字符串长度）"""
+        size = len(value) if size is None else size
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (weakref.ref(forest), value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_build(self, key, forest, build, size=len):
+        """返回缓存的对象，未命中时调用 build() 生成并以 size(对象) 为大小缓存"""
+        value = self.get(key, forest)
+        if value is None:
+            value = build()
+            self.put(key, forest, value, size(value))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> dict:
+        """缓存的命中、未命中、淘汰次数、当前条目数和占用大小"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+figure_cache = FigureCache()
+
+
+def generate_figure_json(forest: ForestGraph, highlight_nodes=None, path_nodes=None, highlight_paths=None,
+                         highlight_color: str = '#90ee90', use_webgl: bool = None,
+                         cache: FigureCache = None) -> str:
+    """带缓存的 generate_figure，返回序列化后的图表 JSON
+
+    Args:
+        forest, highlight_nodes, path_nodes, highlight_paths, highlight_color, use_webgl: 同 generate_figure
+        cache: 使用的缓存，默认为模块级的 figure_cache
+
+    Returns:
+        图表的 JSON 字符串
+    """
+    cache = cache if cache is not None else figure_cache
+    key = figure_key(forest, highlight_nodes, path_nodes, highlight_paths, highlight_color, 'figure', use_webgl)
+    return cache.get_or_build(key, forest, lambda: generate_figure(
+        forest, highlight_nodes, path_nodes, highlight_paths, highlight_color, use_webgl).to_json())
@@ -2,102 +2,443 @@ import plotly.graph_objects as go
 import numpy as np
 from forest_management.core.forest_graph import ForestGraph
 from forest_management.core.tree_node import TreeNode
+from forest_management.visualization.layout import get_forest_layout
 from typing import Optional, List
 
-def generate_figure(
-    forest: ForestGraph,
-    highlight_nodes: Optional[List[TreeNode]] = None,
-    path_nodes: Optional[List[TreeNode]] = None,
-    highlight_paths: Optional[List] = None,
-    highlight_color: str = '#90ee90'  # 新增参数，默认浅绿色
-) -> go.Figure:
-    """生成交互式森林可视化图表
-    
-    Args:
-        forest: 森林图对象
-        highlight_nodes: 需要高亮显示的节点列表
-        path_nodes: 路径上的节点列表
-        highlight_paths: 需要高亮显示的路径列表
-        highlight_color: 高亮节点的颜色 (默认: '#90ee90'浅绿色)
-    
-    Returns:
-        plotly Figure对象
+# 边按颜色分组绘制，每种颜色一条轨迹；后绘制的颜色显示在上层
+EDGE_COLORS = ('gray', 'red', 'blue')
+NODE_COLORS = ('green', 'red', 'orange')  # 按 HealthStatus.value - 1 索引
+# 树木数量超过该值时默认使用 WebGL 渲染
+WEBGL_NODE_THRESHOLD = 2000
+# 细节层次：可见树木不超过 LOD_MAX_NODES 时逐棵绘制，否则按 LOD_GRID x LOD_GRID 网格聚合为簇；
+# 绘制的边不超过 LOD_MAX_EDGES 条，因此图表的数据量与森林规模无关
+LOD_MAX_NODES = 2000
+LOD_MAX_EDGES = 4000
+LOD_GRID = 40
+
+
+def _segments(pos: np.ndarray, u: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """把多条线段拼接为一条折线的坐标，线段之间以空值断开
+
+    空值使用 NaN 而不是 None：plotly.js 同样把 NaN 视为断点，而浮点数组可以按二进制编码传输。
+    """
+    x = np.full(len(u) * 3, np.nan)
+    y = np.full(len(u) * 3, np.nan)
+    x[0::3], x[1::3] = pos[u, 0], pos[v, 0]
+    y[0::3], y[1::3] = pos[u, 1], pos[v, 1]
+    return x, y
+
+
+def _discrete_colors(colors: list) -> dict:
+    """把逐点的颜色名转换为数值编码加分段色阶
+
+    plotly 会逐个校验颜色字符串，数千个点时很慢；数值数组的校验是整体完成的。
+    每种颜色的编码恰好落在色阶的一个刻度上，显示的颜色与直接指定颜色名相同。
     """
-    # 为每棵树分配位置（按tree_id和age生成示例坐标）
-    pos = {tree: np.array([tree.tree_id * 10, tree.age], dtype=float) for tree in forest.adjacency}
-    
-    # 统计连接度（每棵树的边数）
-    degree_map = {tree: len(forest.adjacency[tree]) for tree in forest.adjacency}
+    palette = list(dict.fromkeys(colors)) or ['gray']
+    codes = {color: i for i, color in enumerate(palette)}
+    top = max(len(palette) - 1, 1)
+    scale = [[i / top, color] for i, color in enumerate(palette)]
+    if len(palette) == 1:
+        scale.append([1.0, palette[0]])
+    return dict(color=np.fromiter((codes[color] for color in colors), dtype=np.int8, count=len(colors)),
+                colorscale=scale, cmin=0, cmax=top, showscale=False)
+
+
+def node_palette(highlight_color: str) -> list:
+    """节点颜色的固定调色板：三种健康状态、路径节点的蓝色和高亮色，编码为其下标"""
+    return list(NODE_COLORS) + ['blue', highlight_color]
+
+
+def color_codes(palette: list) -> dict:
+    codes = {}
+    for i, color in enumerate(palette):
+        codes.setdefault(color, i)
+    return codes
+
+
+def palette_scale(palette: list) -> list:
+    top = len(palette) - 1
+    return [[i / top, color] for i, color in enumerate(palette)]
+
 
-    fig = go.Figure()
+def _edge_groups(forest: ForestGraph, index: dict, highlight_nodes: set, highlight_paths: set,
+                 visible: np.ndarray = None, max_edges: int = None) -> dict:
+    """按颜色收集要绘制的边 {颜色: (起点下标, 终点下标, 距离标签, 边的键)}
 
-    # ✅ 绘制边（遍历邻接表）
+    同一对树之间只绘制第一条路径，边的键为排序后的两端ID。给定 visible 时只保留至少一端可见的边；
+    超过 max_edges 时按蓝、红、灰的顺序保留，高亮的边优先。
+    """
     seen = set()
-    for edges in forest.adjacency.values():
-        for path in edges:
-            eid = tuple(sorted([path.tree1.tree_id, path.tree2.tree_id]))
+    edges = {color: ([], [], [], []) for color in EDGE_COLORS}
+    for edge_list in forest.adjacency.values():
+        for path in edge_list:
+            tree1, tree2 = path.tree1, path.tree2
+            eid = (tree1.tree_id, tree2.tree_id) if tree1.tree_id <= tree2.tree_id else (tree2.tree_id, tree1.tree_id)
             if eid in seen:
                 continue
             seen.add(eid)
-            tree1, tree2 = path.tree1, path.tree2
-            x0, y0 = pos[tree1]
-            x1, y1 = pos[tree2]
-            mid_x, mid_y = (x0 + x1) / 2, (y0 + y1) / 2
+            u, v = index[tree1], index[tree2]
+            if visible is not None and not (visible[u] or visible[v]):
+                continue
 
             # 设置边颜色
             color = 'gray'
-            if highlight_paths and path in highlight_paths:
+            if path in highlight_paths:
                 color = 'blue'
-            elif highlight_nodes and tree1 in highlight_nodes and tree2 in highlight_nodes:
+            elif tree1 in highlight_nodes and tree2 in highlight_nodes:
                 color = 'red'
+            group = edges[color]
+            group[0].append(u)
+            group[1].append(v)
+            group[2].append(f"{path.distance:.1f}")
+            group[3].append(eid)
 
-            fig.add_trace(go.Scatter(
-                x=[x0, x1],
-                y=[y0, y1],
-                mode='lines',
-                line=dict(color=color, width=3),
-                hoverinfo='none'
-            ))
-
-            # 添加距离标签
-            fig.add_trace(go.Scatter(
-                x=[mid_x],
-                y=[mid_y],
-                mode='text',
-                text=[f"{path.distance:.1f}"],
-                textposition="middle center",
-                showlegend=False,
-                hoverinfo='none',
-                textfont=dict(color='black', size=12)
-            ))
-
-    # ✅ 绘制节点
-    for tree in forest.adjacency:
+    if max_edges is not None:
+        remaining = max_edges
+        for color in reversed(EDGE_COLORS):
+            edges[color] = tuple(column[:remaining] for column in edges[color])
+            remaining -= len(edges[color][0])
+    return edges
+
+
+def build_detail_model(forest: ForestGraph, trees: list, pos: np.ndarray, highlight_nodes: set, path_nodes: set,
+                       highlight_paths: set, highlight_color: str, visible: np.ndarray = None,
+                       max_edges: int = None) -> dict:
+    """逐棵绘制时图表内容的模型 {轨迹名: {键: 行}}
+
+    轨迹顺序与图表一致。边轨迹的键为边的键，行为 (x0, x1, y0, y1)；距离标签的行为 (x, y, 文本)；
+    节点轨迹的键为 TreeNode，行为 (x, y, 文本, 悬停文本, 颜色, 大小)。
+    同一个键在前后两个模型中的位置关系用于计算增量更新。
+    """
+    index = {tree: i for i, tree in enumerate(trees)}
+    coords = pos.tolist()
+    edges = _edge_groups(forest, index, highlight_nodes, highlight_paths, visible, max_edges)
+    model = {}
+    for color in EDGE_COLORS:
+        u, v, _, keys = edges[color]
+        model[f"edges-{color}"] = {key: (coords[a][0], coords[b][0], coords[a][1], coords[b][1])
+                                   for key, a, b in zip(keys, u, v)}
+
+    # 距离标签位于边的中点，按边轨迹的顺序排列
+    model['distances'] = {
+        key: ((coords[a][0] + coords[b][0]) / 2, (coords[a][1] + coords[b][1]) / 2, label)
+        for color in EDGE_COLORS for a, b, label, key in zip(*edges[color])
+    }
+
+    nodes = {}
+    for i, tree in enumerate(trees):
+        if visible is not None and not visible[i]:
+            continue
         # 设置节点颜色
-        color = ['green', 'red', 'orange'][tree.health_status.value - 1]
-        if highlight_nodes and tree in highlight_nodes:
+        color = NODE_COLORS[tree.health_status.value - 1]
+        if tree in highlight_nodes:
             color = highlight_color  # 使用传入的高亮色
-        if path_nodes and tree in path_nodes:
+        if tree in path_nodes:
             color = 'blue'
 
         # 设置节点大小和显示信息
-        degree = degree_map.get(tree, 0)
-        size = 10 + degree * 5
-
-        fig.add_trace(go.Scatter(
-            x=[pos[tree][0]], y=[pos[tree][1]],
-            mode='markers+text',
-            marker=dict(size=size, color=color),
-            text=[f"ID:{tree.tree_id}"], 
-            textposition="top center",
-            hovertext=f"Species: {tree.species}\nAge: {tree.age}\nStatus: {tree.health_status.name}\nDegree: {degree}",
-            hoverinfo="text"
+        degree = len(forest.adjacency[tree])
+        hovertext = f"Species: {tree.species}\nAge: {tree.age}\nStatus: {tree.health_status.name}\nDegree: {degree}"
+        nodes[tree] = (coords[i][0], coords[i][1], f"ID:{tree.tree_id}", hovertext, color, 10 + degree * 5)
+    model['trees'] = nodes
+    return model
+
+
+def trace_columns(name: str, rows, codes: dict) -> dict:
+    """把模型中一条轨迹的若干行展开为各数据列 {属性路径: 值列表}
+
+    边轨迹每行占3个位置（两个端点加一个断点 None），其余轨迹每行占1个位置。
+    """
+    rows = list(rows)
+    if name.startswith('edges-'):
+        return {
+            ('x',): [value for row in rows for value in (row[0], row[1], None)],
+            ('y',): [value for row in rows for value in (row[2], row[3], None)],
+        }
+    if name == 'distances':
+        return {('x',): [row[0] for row in rows], ('y',): [row[1] for row in rows], ('text',): [row[2] for row in rows]}
+    return {
+        ('x',): [row[0] for row in rows],
+        ('y',): [row[1] for row in rows],
+        ('text',): [row[2] for row in rows],
+        ('hovertext',): [row[3] for row in rows],
+        ('marker', 'color'): [codes[row[4]] for row in rows],
+        ('marker', 'size'): [row[5] for row in rows],
+    }
+
+
+def model_traces(model: dict, scatter, highlight_color: str, patchable: bool = False) -> list:
+    """按模型生成图表轨迹
+
+    patchable 为 True 时数据列保持为列表（断点为 None），浏览器端可以对其追加、修改和删除元素；
+    否则数值列转换为浮点数组（断点为 NaN），序列化时按二进制编码。
+    """
+    palette = node_palette(highlight_color)
+    codes = color_codes(palette)
+
+    def column(values, numeric=True):
+        return values if patchable or not numeric else np.asarray(values, dtype=float)
+
+    traces = []
+    for color in EDGE_COLORS:
+        name = f"edges-{color}"
+        columns = trace_columns(name, model[name].values(), codes)
+        traces.append(scatter(
+            x=column(columns[('x',)]),
+            y=column(columns[('y',)]),
+            mode='lines',
+            line=dict(color=color, width=3),
+            hoverinfo='none',
+            name=name
         ))
 
+    # 添加距离标签（位于边的中点）
+    columns = trace_columns('distances', model['distances'].values(), codes)
+    traces.append(scatter(
+        x=column(columns[('x',)]),
+        y=column(columns[('y',)]),
+        mode='text',
+        text=columns[('text',)],
+        textposition="middle center",
+        showlegend=False,
+        hoverinfo='none',
+        textfont=dict(color='black', size=12),
+        name="distances"
+    ))
+
+    # 节点颜色以固定调色板的编码表示：plotly 逐个校验颜色字符串，数千个点时很慢
+    columns = trace_columns('trees', model['trees'].values(), codes)
+    traces.append(scatter(
+        x=column(columns[('x',)]),
+        y=column(columns[('y',)]),
+        mode='markers+text',
+        marker=dict(size=column(columns[('marker', 'size')]), color=column(columns[('marker', 'color')]),
+                    colorscale=palette_scale(palette), cmin=0, cmax=len(palette) - 1, showscale=False),
+        text=columns[('text',)],
+        textposition="top center",
+        hovertext=columns[('hovertext',)],
+        hoverinfo="text",
+        name="trees"
+    ))
+    return traces
+
+
+def _finish_layout(fig: go.Figure, title: str, viewport: tuple = None) -> go.Figure:
     fig.update_layout(
-        title="Interactive Forest Graph",
+        title=title,
         showlegend=False,
         hovermode='closest',
-        margin=dict(l=20, r=20, t=40, b=20)
+        margin=dict(l=20, r=20, t=40, b=20),
+        uirevision='forest-graph'  # 重新绘制时保留用户的缩放和平移
     )
+    if viewport is not None:
+        x0, x1, y0, y1 = viewport
+        if np.isfinite([x0, x1]).all():
+            fig.update_xaxes(range=[x0, x1])
+        if np.isfinite([y0, y1]).all():
+            fig.update_yaxes(range=[y0, y1])
     return fig
+
+
+def generate_figure(
+    forest: ForestGraph,
+    highlight_nodes: Optional[List[TreeNode]] = None,
+    path_nodes: Optional[List[TreeNode]] = None,
+    highlight_paths: Optional[List] = None,
+    highlight_color: str = '#90ee90',  # 新增参数，默认浅绿色
+    use_webgl: Optional[bool] = None
+) -> go.Figure:
+    """生成交互式森林可视化图表
+
+    所有边按颜色合并为少数几条轨迹（线段之间以空值断开），距离标签和节点各为一条轨迹，
+    轨迹数量与森林规模无关。轨迹顺序固定为：各颜色的边、距离标签、节点。
+
+    Args:
+        forest: 森林图对象
+        highlight_nodes: 需要高亮显示的节点列表
+        path_nodes: 路径上的节点列表
+        highlight_paths: 需要高亮显示的路径列表
+        highlight_color: 高亮节点的颜色 (默认: '#90ee90'浅绿色)
+        use_webgl: 是否使用 WebGL (Scattergl) 渲染，默认在树木数量超过 WEBGL_NODE_THRESHOLD 时使用
+
+    Returns:
+        plotly Figure对象
+    """
+    highlight_nodes = set(highlight_nodes or ())
+    path_nodes = set(path_nodes or ())
+    highlight_paths = set(highlight_paths or ())
+
+    trees = list(forest.adjacency)
+    pos = get_forest_layout(forest).coordinates()  # 力导向布局，按森林版本缓存
+    if use_webgl is None:
+        use_webgl = len(trees) > WEBGL_NODE_THRESHOLD
+
+    model = build_detail_model(forest, trees, pos, highlight_nodes, path_nodes, highlight_paths, highlight_color)
+    return model_figure(model, highlight_color, use_webgl=use_webgl)
+
+
+def viewport_from_relayout(relayout_data: dict):
+    """从 dcc.Graph 的 relayoutData 中取出可见范围 (x0, x1, y0, y1)
+
+    只缩放了一个坐标轴时另一个方向不受限制（为正负无穷）；双击恢复自动范围时返回 None。
+    """
+    if not relayout_data or relayout_data.get('xaxis.autorange') or relayout_data.get('yaxis.autorange'):
+        return None
+    bounds = []
+    for axis in ('xaxis', 'yaxis'):
+        low, high = relayout_data.get(f'{axis}.range[0]'), relayout_data.get(f'{axis}.range[1]')
+        if low is None and f'{axis}.range' in relayout_data:
+            low, high = relayout_data[f'{axis}.range']
+        bounds += [-np.inf, np.inf] if low is None or high is None else sorted([float(low), float(high)])
+    return None if np.isinf(bounds).all() else tuple(bounds)
+
+
+def _cluster_figure(forest: ForestGraph, trees: list, pos: np.ndarray, visible: np.ndarray, scatter,
+                    highlight_nodes: set, path_nodes: set, highlight_color: str, grid: int,
+                    max_edges: int) -> tuple[go.Figure, int]:
+    """把可见的树木按网格聚合为簇，簇之间的路径合并为一条线，返回 (图表, 簇数量)"""
+    members = np.flatnonzero(visible)
+    low, high = pos[members].min(axis=0), pos[members].max(axis=0)
+    cell = np.maximum((high - low) / grid, 1e-9)
+    cells = np.minimum(((pos - low) / cell).astype(np.int64), grid - 1)
+    keys = np.full(len(trees), -1, dtype=np.int64)
+    keys[members] = cells[members, 0] * grid + cells[members, 1]
+    _, cluster, counts = np.unique(keys[members], return_inverse=True, return_counts=True)
+    owner = np.full(len(trees), -1, dtype=np.int64)
+    owner[members] = cluster
+    num = len(counts)
+
+    centroid = np.stack([np.bincount(cluster, pos[members, 0]), np.bincount(cluster, pos[members, 1])], axis=1)
+    centroid /= counts[:, None]
+    status = np.array([trees[i].health_status.value - 1 for i in members.tolist()], dtype=np.int64)
+    mix = np.bincount(cluster * 3 + status, minlength=num * 3).reshape(num, 3)
+    marked = np.zeros(num, dtype=bool)
+    on_path = np.zeros(num, dtype=bool)
+    for i, c in zip(members.tolist(), cluster.tolist()):
+        marked[c] |= trees[i] in highlight_nodes
+        on_path[c] |= trees[i] in path_nodes
+
+    colors = [('blue' if on_path[c] else highlight_color if marked[c] else NODE_COLORS[int(mix[c].argmax())])
+              for c in range(num)]
+    hovertext = [f"Trees: {n}\nHealthy: {h}\nInfected: {i}\nAt risk: {a}"
+                 for n, (h, i, a) in zip(counts.tolist(), mix.tolist())]
+
+    # 簇之间的连接：两端都可见且属于不同簇的路径按簇对计数，保留数量最多的 max_edges 对
+    index = {tree: i for i, tree in enumerate(trees)}
+    ends = np.asarray([(index[path.tree1], index[path.tree2]) for tree, paths in forest.adjacency.items()
+                       for path in paths if path.tree1 == tree], dtype=np.int64).reshape(-1, 2)
+    cu, cv = owner[ends[:, 0]], owner[ends[:, 1]]
+    between = (cu >= 0) & (cv >= 0) & (cu != cv)
+    pairs = np.sort(np.stack([cu[between], cv[between]], axis=1), axis=1)
+    links, link_counts = np.unique(pairs, axis=0, return_counts=True) if len(pairs) else (pairs, np.empty(0))
+    links = links[np.argsort(-link_counts, kind='stable')[:max_edges]]
+
+    x, y = _segments(centroid, links[:, 0], links[:, 1])
+    empty = np.empty(0)
+    data = [scatter(x=x, y=y, mode='lines', line=dict(color='gray', width=1), hoverinfo='none',
+                    name="edges-gray")]
+    data += [scatter(x=empty, y=empty, mode='lines', line=dict(color=color, width=3), hoverinfo='none',
+                     name=f"edges-{color}") for color in EDGE_COLORS[1:]]
+    data.append(scatter(x=empty, y=empty, mode='text', text=[], hoverinfo='none', name="distances"))
+    data.append(scatter(
+        x=centroid[:, 0], y=centroid[:, 1],
+        mode='markers+text',
+        marker=dict(size=np.minimum(10 + 6 * np.log2(counts), 60), opacity=0.8, **_discrete_colors(colors)),
+        text=[str(n) for n in counts.tolist()],
+        textposition="middle center",
+        hovertext=hovertext,
+        hoverinfo="text",
+        name="clusters"
+    ))
+    return go.Figure(data=data), num
+
+
+def _visible(pos: np.ndarray, viewport: tuple) -> np.ndarray:
+    if viewport is None:
+        return np.ones(len(pos), dtype=bool)
+    x0, x1, y0, y1 = viewport
+    return (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+
+
+def detail_view(
+    forest: ForestGraph,
+    viewport: tuple = None,
+    highlight_nodes: Optional[List[TreeNode]] = None,
+    path_nodes: Optional[List[TreeNode]] = None,
+    highlight_paths: Optional[List] = None,
+    highlight_color: str = '#90ee90',
+    max_nodes: int = LOD_MAX_NODES,
+    max_edges: int = LOD_MAX_EDGES
+) -> tuple[Optional[dict], bool]:
+    """generate_lod_figure 逐棵绘制时的图表模型，返回 (模型, 是否使用 WebGL)
+
+    可见的树木超过 max_nodes、需要按簇聚合时模型为 None。参数同 generate_lod_figure。
+    """
+    highlight_nodes = set(highlight_nodes or ())
+    path_nodes = set(path_nodes or ())
+    highlight_paths = set(highlight_paths or ())
+
+    trees = list(forest.adjacency)
+    pos = get_forest_layout(forest).coordinates()
+    visible = _visible(pos, viewport)
+    shown = int(visible.sum())
+    use_webgl = shown > WEBGL_NODE_THRESHOLD
+    if shown > max_nodes:
+        return None, use_webgl
+    model = build_detail_model(forest, trees, pos, highlight_nodes, path_nodes, highlight_paths, highlight_color,
+                               visible=None if viewport is None else visible, max_edges=max_edges)
+    return model, use_webgl
+
+
+def model_figure(model: dict, highlight_color: str = '#90ee90', viewport: tuple = None, use_webgl: bool = False,
+                 patchable: bool = False) -> go.Figure:
+    """由 build_detail_model / detail_view 的模型生成完整的图表"""
+    scatter = go.Scattergl if use_webgl else go.Scatter
+    fig = go.Figure(data=model_traces(model, scatter, highlight_color, patchable))
+    return _finish_layout(fig, "Interactive Forest Graph", viewport)
+
+
+def generate_lod_figure(
+    forest: ForestGraph,
+    viewport: tuple = None,
+    highlight_nodes: Optional[List[TreeNode]] = None,
+    path_nodes: Optional[List[TreeNode]] = None,
+    highlight_paths: Optional[List] = None,
+    highlight_color: str = '#90ee90',
+    max_nodes: int = LOD_MAX_NODES,
+    max_edges: int = LOD_MAX_EDGES,
+    grid: int = LOD_GRID,
+    patchable: bool = False
+) -> go.Figure:
+    """按可见范围生成细节层次不同的森林图表
+
+    只绘制 viewport 范围内的树木：数量不超过 max_nodes 时逐棵绘制（与 generate_figure 相同的轨迹结构，
+    包括一端在范围外的路径），否则按网格聚合为簇，每个簇显示树木数量和健康状况构成，颜色为数量最多的
+    健康状态（含高亮树木的簇使用高亮色）。节点数不超过 max(max_nodes, grid^2)、边数不超过 max_edges。
+
+    Args:
+        forest: 森林图对象
+        viewport: 可见范围 (x0, x1, y0, y1)，None 表示整个森林
+        highlight_nodes, path_nodes, highlight_paths, highlight_color: 同 generate_figure
+        max_nodes: 逐棵绘制的最大树木数量
+        max_edges: 最多绘制的边数
+        grid: 聚合时每个方向的网格单元数
+        patchable: 逐棵绘制时数据列是否保持为列表，以便之后用 dash.Patch 增量更新
+
+    Returns:
+        plotly Figure对象
+    """
+    model, use_webgl = detail_view(forest, viewport, highlight_nodes, path_nodes, highlight_paths, highlight_color,
+                                   max_nodes, max_edges)
+    if model is not None:
+        return model_figure(model, highlight_color, viewport, use_webgl, patchable)
+
+    trees = list(forest.adjacency)
+    pos = get_forest_layout(forest).coordinates()
+    visible = _visible(pos, viewport)
+    scatter = go.Scattergl if use_webgl else go.Scatter
+    fig, clusters = _cluster_figure(forest, trees, pos, visible, scatter, set(highlight_nodes or ()),
+                                    set(path_nodes or ()), highlight_color, grid, max_edges)
+    return _finish_layout(fig, f"Interactive Forest Graph ({int(visible.sum())} trees in {clusters} clusters, "
+                               f"zoom in for detail)", viewport)
@@ -0,0 +1,345 @@
+import numpy as np
+from forest_management.core.forest_graph import ForestGraph, ForestListener
+
+# Barnes-Hut 近似：单元边长与距离之比小于 THETA 时，把整个单元当作位于质心的一个点
+THETA = 1.0
+MAX_DEPTH = 16  # 四叉树的最大深度，每个坐标轴最多 2^16 个单元
+
+
+def real_position(tree):
+    """树木自带的真实坐标 (x, y)，没有时返回 None"""
+    x, y = getattr(tree, 'x', None), getattr(tree, 'y', None)
+    if x is None or y is None:
+        return None
+    try:
+        x, y = float(x), float(y)
+    except (TypeError, ValueError):
+        return None
+    return (x, y) if np.isfinite(x) and np.isfinite(y) else None
+
+
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    """在16位整数的各位之间插入0，用于交织出 Morton 编码"""
+    values = values.astype(np.uint64) & np.uint64(0xFFFF)
+    for shift, mask in ((8, 0x00FF00FF), (4, 0x0F0F0F0F), (2, 0x33333333), (1, 0x55555555)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+class _QuadTree:
+    """按 Morton 编码排序构建的四叉树，每层记录非空单元的编码、点数和坐标和"""
+
+    def __init__(self, pos: np.ndarray):
+        self.origin = pos.min(axis=0)
+        self.size = max(float(np.ptp(pos, axis=0).max()), 1e-9) * (1 + 1e-9)
+        cells = ((pos - self.origin) / self.size * (1 << MAX_DEPTH)).astype(np.int64)
+        cells = np.minimum(cells, (1 << MAX_DEPTH) - 1)
+        self.codes = (_spread_bits(cells[:, 0]) << np.uint64(1)) | _spread_bits(cells[:, 1])
+        order = np.argsort(self.codes, kind='stable')
+        sorted_codes, sorted_pos = self.codes[order], pos[order]
+        self.levels = []
+        for level in range(MAX_DEPTH + 1):
+            level_codes = sorted_codes >> np.uint64(2 * (MAX_DEPTH - level))
+            starts = np.flatnonzero(np.r_[True, level_codes[1:] != level_codes[:-1]])
+            self.levels.append((
+                level_codes[starts],
+                np.diff(np.r_[starts, len(sorted_codes)]).astype(float),
+                np.add.reduceat(sorted_pos, starts, axis=0),
+            ))
+
+    def cell_of(self, points: np.ndarray, level: int) -> np.ndarray:
+        return self.codes[points] >> np.uint64(2 * (MAX_DEPTH - level))
+
+
+def _repulsion(pos: np.ndarray, query: np.ndarray, k: float) -> np.ndarray:
+    """query 中各点受到的斥力 k^2 / d 之和（Barnes-Hut 近似），(len(query), 2) 数组
+
+    从根单元开始逐层向下：足够远的单元按质心一次计算，太近的单元展开为其子单元，
+    只含一个点的单元精确计算；最深一层仍与查询点同处一个单元的点按去掉自身后的质心计算。
+    """
+    tree = _QuadTree(pos)
+    min_dist2 = (0.01 * k) ** 2
+    disp = np.zeros((len(query), 2))
+    owner = np.arange(len(query))  # 每个 (查询点, 单元) 对中的查询点
+    cell = np.zeros(len(query), dtype=np.int64)  # 单元在当前层非空单元中的位置
+
+    for level in range(MAX_DEPTH + 1):
+        codes, mass, sums = tree.levels[level]
+        m = mass[cell]
+        inside = tree.cell_of(query[owner], level) == codes[cell]
+        point = pos[query[owner]]
+        # 查询点所在的单元去掉查询点自身
+        m_other = m - inside
+        center = (sums[cell] - inside[:, None] * point) / np.maximum(m_other, 1)[:, None]
+        delta = point - center
+        dist2 = np.maximum((delta ** 2).sum(axis=1), min_dist2)
+        width = tree.size / (1 << level)
+        accept = (m_other > 0) & ~inside & ((m == 1) | (width * width < THETA * THETA * dist2))
+        if level == MAX_DEPTH:
+            accept = m_other > 0
+        weight = np.where(accept, m_other * k * k / dist2, 0.0)
+        disp[:, 0] += np.bincount(owner, delta[:, 0] * weight, minlength=len(query))
+        disp[:, 1] += np.bincount(owner, delta[:, 1] * weight, minlength=len(query))
+
+        expand = ~accept & (m_other > 0)
+        if level == MAX_DEPTH or not expand.any():
+            break
+        # 展开为下一层中编码在 [4c, 4c + 4) 范围内的非空子单元
+        owner, parent = owner[expand], codes[cell[expand]]
+        child_codes = tree.levels[level + 1][0]
+        start = np.searchsorted(child_codes, parent << np.uint64(2))
+        counts = np.searchsorted(child_codes, (parent << np.uint64(2)) + np.uint64(4)) - start
+        owner = np.repeat(owner, counts)
+        cell = np.repeat(start, counts) + np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return disp
+
+
+def _simulate(pos: np.ndarray, edge_u: np.ndarray, edge_v: np.ndarray, movable: np.ndarray,
+              k: float, iterations: int, temperature: float) -> np.ndarray:
+    """Fruchterman-Reingold 力导向迭代（斥力使用 Barnes-Hut 近似），只移动 movable 中的点
+
+    Args:
+        pos: (n, 2) 初始坐标，原地更新
+        edge_u, edge_v: 边的两个端点下标
+        movable: 可以移动的点的下标
+        k: 理想边长
+        iterations: 迭代次数
+        temperature: 初始的单步最大位移，逐步线性降到0
+    """
+    if not len(movable) or iterations <= 0:
+        return pos
+    slot = np.full(len(pos), -1, dtype=np.int64)
+    slot[movable] = np.arange(len(movable))
+    # 只有至少一端可移动的边需要计算引力
+    active = (slot[edge_u] >= 0) | (slot[edge_v] >= 0)
+    edge_u, edge_v = edge_u[active], edge_v[active]
+
+    for step in range(iterations):
+        disp = _repulsion(pos, movable, k)
+
+        # 引力 d^2 / k，沿边作用于两个端点
+        delta = pos[edge_u] - pos[edge_v]
+        force = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        for ends, sign in ((edge_u, -1.0), (edge_v, 1.0)):
+            moving = slot[ends] >= 0
+            disp[:, 0] += sign * np.bincount(slot[ends][moving], force[moving, 0], minlength=len(movable))
+            disp[:, 1] += sign * np.bincount(slot[ends][moving], force[moving, 1], minlength=len(movable))
+
+        # 位移长度不超过当前温度
+        t = temperature * (1 - step / iterations)
+        length = np.sqrt((disp ** 2).sum(axis=1))
+        scale = np.minimum(length, t) / np.maximum(length, 1e-12)
+        pos[movable] += disp * scale[:, None]
+    return pos
+
+
+class ForceLayout(ForestListener):
+    """森林的力导向布局，按森林版本缓存并增量更新
+
+    树木带有真实坐标（x、y 属性）时直接使用并保持固定，其余树木由力导向算法放置。
+    少量树木或路径加入后只移动新树和新路径的端点，其余位置保持不变；变化的树木超过
+    rebuild_ratio 或森林被整体替换时重新计算整个布局。布局结果对同样的森林是确定的。
+
+    树木的坐标和边的端点以数组形式保存在各次更新之间，并根据监听到的事件追加或标记删除，
+    只有整体重建时才遍历整个森林。删除树木或路径、健康状态等不影响位置的修改不会移动任何树。
+    未注册为森林的监听器时无法得知变化，森林版本改变后总是整体重建（get_forest_layout 会注册）。
+    """
+
+    def __init__(self, forest: ForestGraph, iterations: int = 50, incremental_iterations: int = 20,
+                 rebuild_ratio: float = 0.2, seed: int = 0):
+        self.forest = forest
+        self.iterations = iterations
+        self.incremental_iterations = incremental_iterations
+        self.rebuild_ratio = rebuild_ratio
+        self.seed = seed
+        self.version = None  # 布局对应的森林版本
+        self.on_reset()
+
+    def on_tree_added(self, tree):
+        self._new_trees[tree] = None
+        self._dirty.add(tree)
+
+    def on_tree_removed(self, tree, paths):
+        for path in paths:
+            self.on_path_removed(path)
+        self.positions.pop(tree, None)
+        self._dirty.discard(tree)
+        if tree in self._new_trees:
+            del self._new_trees[tree]
+            return
+        slot = self._slot.pop(tree, None)
+        if slot is not None:
+            self._trees[slot] = None
+            self._alive[slot] = False
+
+    def on_path_added(self, path):
+        self._new_paths[path] = None
+        self._dirty.update((path.tree1, path.tree2))
+
+    def on_path_removed(self, path):
+        if path in self._new_paths:
+            del self._new_paths[path]
+            return
+        edge = self._edge_of.pop(path, None)
+        if edge is not None:
+            self._edge_alive[edge] = False
+
+    def on_reset(self):
+        self.positions = {}  # {TreeNode: (x, y)}
+        self._dirty = set()
+        self._stale = True
+        # 按槽位保存的树木、坐标和是否固定；被删除的树木留下空槽位，槽位顺序与邻接表顺序一致
+        self._trees = []
+        self._slot = {}
+        self._pos = np.zeros((0, 2))
+        self._pinned = np.zeros(0, dtype=bool)
+        self._alive = np.zeros(0, dtype=bool)
+        # 边的两个端点的槽位
+        self._edge_of = {}
+        self._edge_u = np.zeros(0, dtype=np.int64)
+        self._edge_v = np.zeros(0, dtype=np.int64)
+        self._edge_alive = np.zeros(0, dtype=bool)
+        # 上次更新之后新增、尚未分配槽位的树木和路径
+        self._new_trees = {}
+        self._new_paths = {}
+
+    def _ideal_length(self, pinned: np.ndarray, pos: np.ndarray) -> float:
+        """理想边长：有真实坐标时按其范围估算，否则为1"""
+        n = len(pos)
+        if pinned.any() and n > 1:
+            extent = np.ptp(pos[pinned], axis=0).max()
+            if extent > 0:
+                return float(extent / np.sqrt(n))
+        return 1.0
+
+    def _append_trees(self, trees: list):
+        """为新树分配槽位，带真实坐标的树直接固定在其坐标上"""
+        real = [real_position(tree) for tree in trees]
+        start = len(self._trees)
+        self._slot.update((tree, start + i) for i, tree in enumerate(trees))
+        self._trees.extend(trees)
+        pinned = np.array([p is not None for p in real], dtype=bool)
+        pos = np.zeros((len(trees), 2))
+        if pinned.any():
+            pos[pinned] = [p for p in real if p is not None]
+        self._pos = np.concatenate([self._pos, pos])
+        self._pinned = np.concatenate([self._pinned, pinned])
+        self._alive = np.concatenate([self._alive, np.ones(len(trees), dtype=bool)])
+
+    def _append_paths(self, paths: list):
+        slot = self._slot
+        start = len(self._edge_u)
+        self._edge_of.update((path, start + i) for i, path in enumerate(paths))
+        ends = np.array([(slot[path.tree1], slot[path.tree2]) for path in paths], dtype=np.int64).reshape(-1, 2)
+        self._edge_u = np.concatenate([self._edge_u, ends[:, 0]])
+        self._edge_v = np.concatenate([self._edge_v, ends[:, 1]])
+        self._edge_alive = np.concatenate([self._edge_alive, np.ones(len(paths), dtype=bool)])
+
+    def _compact(self):
+        """去掉被删除的树和边留下的空槽位"""
+        live = np.flatnonzero(self._alive)
+        remap = np.full(len(self._trees), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        self._trees = [self._trees[i] for i in live.tolist()]
+        self._slot = {tree: i for i, tree in enumerate(self._trees)}
+        self._pos, self._pinned = self._pos[live], self._pinned[live]
+        self._alive = np.ones(len(live), dtype=bool)
+        edges = np.flatnonzero(self._edge_alive)
+        position = np.full(len(self._edge_u), -1, dtype=np.int64)
+        position[edges] = np.arange(len(edges))
+        self._edge_of = {path: int(position[edge]) for path, edge in self._edge_of.items()}
+        self._edge_u, self._edge_v = remap[self._edge_u[edges]], remap[self._edge_v[edges]]
+        self._edge_alive = np.ones(len(edges), dtype=bool)
+
+    def _rebuild(self):
+        """遍历整个森林重新计算布局"""
+        trees = list(self.forest.adjacency)
+        self.on_reset()
+        self._append_trees(trees)
+        self._append_paths([path for tree, paths in self.forest.adjacency.items()
+                            for path in paths if path.tree1 == tree])
+        n = len(trees)
+        pos, pinned = self._pos, self._pinned
+        rng = np.random.default_rng([self.seed, n])
+        k = self._ideal_length(pinned, pos)
+        free = np.flatnonzero(~pinned)
+        side = k * np.sqrt(max(n, 1))
+        center = pos[pinned].mean(axis=0) if pinned.any() else np.zeros(2)
+        pos[free] = center + rng.uniform(-side / 2, side / 2, (len(free), 2))
+        _simulate(pos, self._edge_u, self._edge_v, free, k, self.iterations, side / 10)
+        self.positions = {tree: (float(x), float(y)) for tree, (x, y) in zip(trees, pos.tolist())}
+
+    def update(self):
+        """使布局与森林的当前版本一致"""
+        if self.version == self.forest.version and not self._stale:
+            return
+        if not any(listener is self for listener in self.forest.listeners):
+            self._stale = True
+        if self._stale or len(self._dirty) > self.rebuild_ratio * max(len(self.positions), 1):
+            self._rebuild()
+        elif self._dirty:
+            self._place(self._dirty)
+        self._dirty = set()
+        self._stale = False
+        self.version = self.forest.version
+
+    def _place(self, dirty: set):
+        """只移动新树和新路径的端点，其余树的位置保持不变"""
+        self._append_trees(list(self._new_trees))
+        self._append_paths(list(self._new_paths))
+        self._new_trees, self._new_paths = {}, {}
+        if len(self._trees) > 2 * int(self._alive.sum()) + 64:
+            self._compact()
+
+        live = np.flatnonzero(self._alive)
+        remap = np.full(len(self._trees), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        n = len(live)
+        pos, pinned = self._pos[live], self._pinned[live]
+        edges = self._edge_alive
+        edge_u, edge_v = remap[self._edge_u[edges]], remap[self._edge_v[edges]]
+        rng = np.random.default_rng([self.seed, n])
+        k = self._ideal_length(pinned, pos)
+
+        changed = np.zeros(n, dtype=bool)
+        changed[remap[[self._slot[tree] for tree in dirty]]] = True
+        anchored = ~changed | pinned
+        moving = np.flatnonzero(changed & ~pinned)
+        # 新树从已放置的邻居的重心附近开始，没有邻居时放在整个布局的中心附近
+        center = pos[anchored].mean(axis=0) if anchored.any() else np.zeros(2)
+        trees = self._trees
+        for i in moving.tolist():
+            tree = trees[live[i]]
+            neighbors = [remap[self._slot[path.tree2 if path.tree1 == tree else path.tree1]]
+                         for path in self.forest.adjacency[tree]]
+            neighbors = [j for j in neighbors if anchored[j]]
+            base = pos[neighbors].mean(axis=0) if neighbors else center
+            pos[i] = base + rng.uniform(-k / 2, k / 2, 2)
+        _simulate(pos, edge_u, edge_v, moving, k, self.incremental_iterations, k)
+
+        self._pos[live[moving]] = pos[moving]
+        for i, (x, y) in zip(moving.tolist(), pos[moving].tolist()):
+            self.positions[trees[live[i]]] = (float(x), float(y))
+        for i in np.flatnonzero(changed & pinned).tolist():
+            x, y = pos[i]
+            self.positions[trees[live[i]]] = (float(x), float(y))
+
+    def coordinates(self, trees=None) -> np.ndarray:
+        """指定树木（默认为森林中的全部树木，按邻接表顺序）的坐标，(n, 2) 数组"""
+        self.update()
+        if trees is None:
+            # 槽位顺序与邻接表顺序一致，数量不一致说明森林被绕过 ForestGraph 方法修改过
+            if len(self._slot) == len(self.forest.adjacency):
+                return self._pos[self._alive]
+            trees = self.forest.adjacency
+        return np.array([self.positions[tree] for tree in trees], dtype=float).reshape(-1, 2)
+
+
+def get_forest_layout(forest: ForestGraph) -> ForceLayout:
+    """获取森林上已注册的布局，不存在时创建并注册"""
+    for listener in forest.listeners:
+        if isinstance(listener, ForceLayout):
+            return listener
+    layout = ForceLayout(forest)
+    forest.add_listener(layout)
+    return layout